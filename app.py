@@ -1,103 +1,879 @@
 import os
-from flask import Flask, request, jsonify, render_template
+import sys
+import time
+
+# Process start reference for the startup timing breakdown
+PROCESS_START = time.perf_counter()
+STARTUP_TIMINGS = {}
+
+# Pre-fork serving (python app.py serve) runs SERVE_WORKERS processes with WORKER_THREADS
+# torch/BLAS threads each. BLAS and OpenMP pools size themselves when numpy and torch
+# load, so the limits are exported before anything imports them.
+SERVE_PREFORK = __name__ == "__main__" and sys.argv[1:2] == ["serve"]
+SERVE_WORKERS = max(1, int(os.environ.get("SERVE_WORKERS", os.cpu_count() or 1)))
+WORKER_THREADS = max(1, int(os.environ.get("WORKER_THREADS", 0)) or (os.cpu_count() or 1) // SERVE_WORKERS)
+if SERVE_PREFORK:
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS"):
+        os.environ.setdefault(variable, str(WORKER_THREADS))
+    # The Rust tokenizer pool does not survive fork either
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+from flask import Flask, Response, request, jsonify, render_template, stream_with_context, g
 from flask_cors import CORS
+from werkzeug.datastructures import FileStorage
 import logging
-from langchain_community.vectorstores import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_core.runnables import RunnablePassthrough, RunnableLambda
-from operator import itemgetter
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
-from langgraph.graph import StateGraph, END
-from typing import TypedDict, Any
+from typing import TypedDict, Any, Optional
+import dataclasses
+from dataclasses import dataclass
+from contextlib import contextmanager
+from collections import OrderedDict, deque
 import io
 import re
+import zipfile
+import codecs
+import threading
+import hashlib
+import zlib
+import sqlite3
+import signal
+import multiprocessing
+import concurrent.futures
+import heapq
+import json
+import functools
+import inspect
+import shutil
+import tempfile
+import queue
+import random
+import uuid
+import gzip
+import gc
+import socket
+import hmac
+import cProfile
+import pstats
+import tracemalloc
 
-# Import libraries with detailed PyMuPDF debugging
-try:
-    # First, let's see what happens when we try to import fitz
-    print("Attempting to import fitz (PyMuPDF)...")
-    import sys
-    print(f"Python path: {sys.path[:3]}...")  # Show first 3 paths
-    
-    # Check if PyMuPDF is actually installed
-    import pkg_resources
-    try:
-        pkg_resources.get_distribution('PyMuPDF')
-        print("✓ PyMuPDF package is installed")
-    except pkg_resources.DistributionNotFound:
-        print("✗ PyMuPDF package not found in installed packages")
-    
-    # Try the actual import with detailed error info
-    import fitz
-    PDF_AVAILABLE = True
-    print("✓ PyMuPDF (fitz) imported successfully")
-    print(f"PyMuPDF version: {fitz.version}")
-    
-except ImportError as e:
-    PDF_AVAILABLE = False
-    print(f"✗ PyMuPDF import failed: {e}")
-    print(f"Error type: {type(e)}")
-    
-    # Let's try to understand what's going on
-    try:
-        import importlib.util
-        spec = importlib.util.find_spec("fitz")
-        if spec is None:
-            print("  - 'fitz' module spec not found")
-        else:
-            print(f"  - 'fitz' module found at: {spec.origin}")
-    except Exception as spec_error:
-        print(f"  - Could not check module spec: {spec_error}")
-    
-    # Check for conflicting packages
-    try:
-        installed_packages = [d.project_name.lower() for d in pkg_resources.working_set]
-        conflicting = [pkg for pkg in installed_packages if 'fitz' in pkg and pkg != 'pymupdf']
-        if conflicting:
-            print(f"  - WARNING: Potentially conflicting packages found: {conflicting}")
-    except:
-        pass
-
-except Exception as e:
-    PDF_AVAILABLE = False
-    print(f"✗ Unexpected error importing PyMuPDF: {e}")
-    print(f"Error type: {type(e)}")
-
-try:
-    import docx2txt
-    DOCX_AVAILABLE = True
-    print("✓ docx2txt imported successfully")
-except ImportError as e:
-    DOCX_AVAILABLE = False
-    print(f"✗ docx2txt import failed: {e}")
-
-try:
-    from docx import Document
-    PYTHON_DOCX_AVAILABLE = True
-    print("✓ python-docx imported successfully")
-except ImportError as e:
-    PYTHON_DOCX_AVAILABLE = False
-    print(f"✗ python-docx import failed: {e}")
+# Heavy libraries (langchain, langgraph, torch via sentence-transformers) are imported
+# on first use inside get_embeddings, get_app_graph, get_chain and get_resume_index.
+
+# Record how long a startup phase takes
+@contextmanager
+def startup_phase(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STARTUP_TIMINGS[name] = round(time.perf_counter() - start, 4)
+
+STARTUP_TIMINGS["imports"] = round(time.perf_counter() - PROCESS_START, 4)
+
+# Import document parsers
+with startup_phase("parsers"):
+    try:
+        import fitz
+        PDF_AVAILABLE = True
+        print("✓ PyMuPDF (fitz) imported successfully")
+        print(f"PyMuPDF version: {fitz.version}")
+        
+    except ImportError as e:
+        PDF_AVAILABLE = False
+        print(f"✗ PyMuPDF import failed: {e}")
+        print(f"Error type: {type(e)}")
+        
+        # Let's try to understand what's going on (only on the failure path)
+        try:
+            import importlib.util
+            import importlib.metadata
+            spec = importlib.util.find_spec("fitz")
+            if spec is None:
+                print("  - 'fitz' module spec not found")
+            else:
+                print(f"  - 'fitz' module found at: {spec.origin}")
+            
+            # Check for conflicting packages
+            installed_packages = [(d.metadata["Name"] or "").lower() for d in importlib.metadata.distributions()]
+            conflicting = [pkg for pkg in installed_packages if 'fitz' in pkg and pkg != 'pymupdf']
+            if conflicting:
+                print(f"  - WARNING: Potentially conflicting packages found: {conflicting}")
+        except Exception as spec_error:
+            print(f"  - Could not check module spec: {spec_error}")
+
+    except Exception as e:
+        PDF_AVAILABLE = False
+        print(f"✗ Unexpected error importing PyMuPDF: {e}")
+        print(f"Error type: {type(e)}")
+
+    try:
+        import docx2txt
+        DOCX_AVAILABLE = True
+        print("✓ docx2txt imported successfully")
+    except ImportError as e:
+        DOCX_AVAILABLE = False
+        print(f"✗ docx2txt import failed: {e}")
+
+    try:
+        from docx import Document
+        PYTHON_DOCX_AVAILABLE = True
+        print("✓ python-docx imported successfully")
+    except ImportError as e:
+        PYTHON_DOCX_AVAILABLE = False
+        print(f"✗ python-docx import failed: {e}")
+
+# Optional response encoders - MessagePack result payloads and brotli compression
+with startup_phase("encoders"):
+    try:
+        import msgpack
+        MSGPACK_AVAILABLE = True
+        print("✓ msgpack imported successfully")
+    except ImportError as e:
+        MSGPACK_AVAILABLE = False
+        print(f"✗ msgpack import failed: {e}")
+
+    try:
+        import brotli
+        BROTLI_AVAILABLE = True
+        print("✓ brotli imported successfully")
+    except ImportError as e:
+        BROTLI_AVAILABLE = False
+        print(f"✗ brotli import failed: {e}")
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Initialize Flask app
-app = Flask(__name__, template_folder="templates", static_folder="static")
-CORS(app)
-
-# Initialize embeddings
-EMBEDDINGS_AVAILABLE = False
-try:
-    embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-    EMBEDDINGS_AVAILABLE = True
-    print("✓ Embeddings model loaded successfully")
-except Exception as e:
-    EMBEDDINGS_AVAILABLE = False
-    print(f"✗ Embeddings model failed to load: {e}")
-    embeddings = None
+with startup_phase("flask"):
+    app = Flask(__name__, template_folder="templates", static_folder="static")
+    CORS(app)
+
+# Defer loading the embeddings model and role data until first use or /api/warmup
+LAZY_STARTUP = os.environ.get("LAZY_STARTUP", "0").lower() in ("1", "true", "yes")
+
+# Number of texts sent to the model per embed_documents call in the batch scoring path
+EMBED_BATCH_SIZE = max(1, int(os.environ.get("EMBED_BATCH_SIZE", 32)))
+
+# Cross-request embedding micro-batching - how long a partial batch waits for more callers
+# and how many texts may be queued before callers block
+EMBED_SCHEDULER = os.environ.get("EMBED_SCHEDULER", "1").lower() in ("1", "true", "yes")
+EMBED_MAX_WAIT_MS = max(0.0, float(os.environ.get("EMBED_MAX_WAIT_MS", 5)))
+EMBED_QUEUE_DEPTH = max(1, int(os.environ.get("EMBED_QUEUE_DEPTH", 4096)))
+
+# Long-resume chunking - embed overlapping token windows (capped per resume) instead of
+# letting the model truncate, and pool the per-chunk similarities with "max" or "mean"
+EMBED_CHUNKING = os.environ.get("EMBED_CHUNKING", "0").lower() in ("1", "true", "yes")
+EMBED_CHUNK_TOKENS = max(16, int(os.environ.get("EMBED_CHUNK_TOKENS", 200)))
+EMBED_CHUNK_OVERLAP = max(0, min(EMBED_CHUNK_TOKENS - 1, int(os.environ.get("EMBED_CHUNK_OVERLAP", 50))))
+EMBED_MAX_CHUNKS = max(1, int(os.environ.get("EMBED_MAX_CHUNKS", 8)))
+EMBED_CHUNK_POOLING = "mean" if os.environ.get("EMBED_CHUNK_POOLING", "max").lower() == "mean" else "max"
+
+# Number of top-ranked resumes included in the final record of /api/filter/stream
+STREAM_TOP_N = max(1, int(os.environ.get("STREAM_TOP_N", 10)))
+
+# Uploads larger than this are spooled to a temporary file instead of kept in memory
+UPLOAD_SPOOL_BYTES = max(0, int(os.environ.get("UPLOAD_SPOOL_BYTES", 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = 64 * 1024
+
+# Per-file upload limit and extraction caps - extraction stops early once a cap is reached
+MAX_RESUME_BYTES = max(1, int(float(os.environ.get("MAX_RESUME_MB", 10)) * 1024 * 1024))
+MAX_PDF_PAGES = max(1, int(os.environ.get("MAX_PDF_PAGES", 50)))
+MAX_RESUME_CHARS = max(1, int(os.environ.get("MAX_RESUME_CHARS", 100000)))
+
+# ZIP uploads - archives are expanded into their resume members, within these limits
+RESUME_EXTENSIONS = (".pdf", ".docx", ".txt")
+ZIP_MAX_MEMBERS = max(1, int(os.environ.get("ZIP_MAX_MEMBERS", 5000)))
+ZIP_MAX_UNCOMPRESSED_BYTES = max(1, int(float(os.environ.get("ZIP_MAX_UNCOMPRESSED_MB", 500)) * 1024 * 1024))
+
+# Near-duplicate detection - resumes whose word 3-gram similarity (estimated Jaccard)
+# reaches DEDUP_THRESHOLD reuse a representative's embedding and scores; 0 disables it
+DEDUP_THRESHOLD = min(1.0, max(0.0, float(os.environ.get("DEDUP_THRESHOLD", 0.9))))
+DEDUP_NUM_PERM = 128
+DEDUP_MIN_SHINGLES = 10
+DEDUP_INDEX_SIZE = max(1, int(os.environ.get("DEDUP_INDEX_SIZE", 10000)))
+
+# Background job API - storage directory, worker threads, queue depth and result paging
+JOB_STORE_DIR = os.environ.get("JOB_STORE_DIR", "jobs")
+JOB_WORKERS = max(1, int(os.environ.get("JOB_WORKERS", 1)))
+JOB_QUEUE_DEPTH = max(1, int(os.environ.get("JOB_QUEUE_DEPTH", 8)))
+JOB_PAGE_SIZE = 50
+JOB_MAX_PAGE_SIZE = 500
+JOB_RETRY_AFTER = 30
+
+# Finished result lists kept in memory for paging - /api/filter with offset/limit and the stream summary.
+# Pre-fork serving with several workers keeps them in RESULT_STORE_DIR instead, so any worker can page them.
+RESULT_STORE_SIZE = max(1, int(os.environ.get("RESULT_STORE_SIZE", 32)))
+RESULT_TTL_SECONDS = max(1, int(os.environ.get("RESULT_TTL_SECONDS", 3600)))
+RESULT_STORE_DIR = os.environ.get("RESULT_STORE_DIR", os.path.join(JOB_STORE_DIR, "results"))
+RESULT_PAGE_SIZE = 50
+QUALIFIED_SCORE = 60
+
+# Admission control - resumes and upload bytes in flight across all requests before new
+# uploads are turned away with 429 and Retry-After (0 disables a limit). The limits are
+# per process: with pre-fork serving each of the SERVE_WORKERS workers admits this much.
+ADMISSION_MAX_RESUMES = max(0, int(os.environ.get("ADMISSION_MAX_RESUMES", 2000)))
+ADMISSION_MAX_BYTES = max(0, int(float(os.environ.get("ADMISSION_MAX_MB", 512)) * 1024 * 1024))
+ADMISSION_RETRY_AFTER = 5
+ADMISSION_ENDPOINTS = ("filter_resumes", "filter_resumes_stream", "create_job", "index_resumes")
+
+# Health and metrics can also be served on their own port by a dedicated listener thread,
+# so they answer while the main server is saturated (0, the default, disables it)
+HEALTH_PORT = max(0, int(os.environ.get("HEALTH_PORT", 0)))
+
+# On-demand profiling - requests carrying X-Profile-Token: <PROFILE_TOKEN> run under
+# cProfile and tracemalloc. The hooks are only installed when a token is set. The token is
+# only accepted as a header, so it never ends up in access logs or browser history.
+PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN", "")
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+PROFILE_TOP_N = max(1, int(os.environ.get("PROFILE_TOP_N", 25)))
+
+# Responses smaller than this are not compressed
+COMPRESS_MIN_BYTES = max(0, int(os.environ.get("COMPRESS_MIN_BYTES", 1024)))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Persistent resume vector index
+CHROMA_DIR = os.environ.get("CHROMA_DIR", "chroma_db")
+CHROMA_COLLECTION = os.environ.get("CHROMA_COLLECTION", "resumes")
+INDEX_MAX_K = 1000
+
+# Resume cache settings - LRU capacity and optional SQLite file for the persistent tier
+RESUME_CACHE_SIZE = max(1, int(os.environ.get("RESUME_CACHE_SIZE", 1024)))
+RESUME_CACHE_DB = os.environ.get("RESUME_CACHE_DB", "")
+
+# SQLite feature store used by /api/rescore and /api/roles - opt in with a path, since it
+# keeps the text of every uploaded resume and grows without bound ("" disables it)
+FEATURE_STORE_DB = os.environ.get("FEATURE_STORE_DB", "")
+
+# Two-stage ranking - shortlist the top SHORTLIST_TOP_M resumes per role with a BM25 index
+# over resume words and matched skill terms before embedding (0 scores every resume)
+SHORTLIST_TOP_M = max(0, int(os.environ.get("SHORTLIST_TOP_M", 0)))
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Embedding backend - "huggingface" (PyTorch sentence-transformers) or "onnx" (ONNX Runtime)
+EMBEDDING_BACKEND = os.environ.get("EMBEDDING_BACKEND", "huggingface").lower()
+ONNX_MODEL_DIR = os.environ.get("ONNX_MODEL_DIR", os.path.join("models", "all-MiniLM-L6-v2-onnx"))
+ONNX_QUANTIZE = os.environ.get("ONNX_QUANTIZE", "1").lower() in ("1", "true", "yes")
+ONNX_THREADS = max(0, int(os.environ.get("ONNX_THREADS", 0)))  # 0 lets ONNX Runtime decide
+ONNX_MAX_LENGTH = 256  # all-MiniLM-L6-v2 truncates at 256 word pieces
+
+# Document extraction pool - worker processes (0 parses in the request thread) and per-document timeout
+EXTRACT_WORKERS = max(0, int(os.environ.get("EXTRACT_WORKERS", min(4, os.cpu_count() or 1))))
+EXTRACT_TIMEOUT = float(os.environ.get("EXTRACT_TIMEOUT", 30))
+# Uploads read and extracted together - bounds the document bytes held for one batch
+EXTRACT_WINDOW = max(1, EXTRACT_WORKERS) * 4
+# Uploads taken through extract -> embed -> score together by the batch path; each window's
+# resume texts are released before the next is read, so a large request is not held whole
+SCORE_WINDOW = max(1, int(os.environ.get("SCORE_WINDOW", 256)))
+
+# Fraction of per-resume debug log lines that are emitted (they are only formatted when sampled)
+LOG_SAMPLE_RATE = min(1.0, max(0.0, float(os.environ.get("LOG_SAMPLE_RATE", 0.05))))
+
+def log_sampled(message: str, *args):
+    """Log a per-resume debug line for a sample of calls, formatting it lazily"""
+    if logger.isEnabledFor(logging.DEBUG) and random.random() < LOG_SAMPLE_RATE:
+        logger.debug(message, *args)
+
+# Minimal Prometheus-style metrics, rendered in the text exposition format at /metrics
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in labels)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + "}"
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        lines.extend(f"{self.name}{_format_labels(key)} {value}" for key, value in values)
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            # Counts are stored per bucket and accumulated on render
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+                    break
+            series["sum"] += value
+            series["count"] += 1
+
+    def render(self) -> list:
+        with self._lock:
+            series_items = sorted((key, dict(series, counts=list(series["counts"]))) for key, series in self._series.items())
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for key, series in series_items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series["counts"]):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(key + (('le', repr(float(bound))),))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(key + (('le', '+Inf'),))} {series['count']}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {series['sum']}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {series['count']}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        metric = Counter(name, help_text)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, buckets: tuple) -> Histogram:
+        metric = Histogram(name, help_text, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, func):
+        """Register a function returning extra exposition lines, evaluated at scrape time"""
+        self._collectors.append(func)
+        return func
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            lines.extend(collect())
+        return "\n".join(lines) + "\n"
+
+METRICS = MetricsRegistry()
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+STAGE_SECONDS = METRICS.histogram("resume_stage_seconds", "Time spent in each pipeline stage.", LATENCY_BUCKETS)
+EMBED_SECONDS = METRICS.histogram("resume_embed_seconds", "Time per embedding model call.", LATENCY_BUCKETS)
+EMBED_BATCH_SIZES = METRICS.histogram("resume_embed_batch_size", "Texts per embedding model call.", (1, 2, 4, 8, 16, 32, 64, 128, 256))
+FILES_TOTAL = METRICS.counter("resume_files_total", "Uploaded resume files by type.")
+PARSE_ERRORS_TOTAL = METRICS.counter("resume_parse_errors_total", "Resume files that could not be parsed, by type.")
+
+# Time a pipeline stage into the stage histogram
+@contextmanager
+def timed_stage(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=name)
+
+# Extraction reports failures as text, so recognise those when counting parse errors
+EXTRACTION_ERROR_PREFIXES = ("Error", "Unsupported file format", "PDF processing not available", "DOCX processing not available")
+
+def record_parsed_file(filename: str, text: str = None, failed: bool = False):
+    file_type = filename.rsplit(".", 1)[-1].lower() if "." in filename else "unknown"
+    if file_type not in ("pdf", "docx", "txt"):
+        file_type = "other"
+    FILES_TOTAL.inc(type=file_type)
+    if failed or (text or "").startswith(EXTRACTION_ERROR_PREFIXES):
+        PARSE_ERRORS_TOTAL.inc(type=file_type)
+
+# Embedding backends. A backend exposes embed_documents/embed_query (the interface
+# LangChain vector stores expect) and a ``name`` that namespaces cached vectors.
+class EmbeddingBackend:
+    name = ""
+    tokenizer = None  # a fast Hugging Face tokenizer gives token-bounded chunks
+
+    def embed_documents(self, texts: list) -> list:
+        raise NotImplementedError
+
+    def embed_query(self, text: str) -> list:
+        return self.embed_documents([text])[0]
+
+    def after_fork(self, threads: int):
+        """Adjust the backend in a freshly forked serving worker"""
+
+    def token_spans(self, text: str) -> list:
+        """Character (start, end) span of each token; whitespace-separated words without a fast tokenizer"""
+        if self.tokenizer is not None and getattr(self.tokenizer, "is_fast", False):
+            encoded = self.tokenizer(text, add_special_tokens=False, return_offsets_mapping=True, verbose=False)
+            return [tuple(span) for span in encoded["offset_mapping"]]
+        return [match.span() for match in re.finditer(r"\S+", text)]
+
+# Reference backend: sentence-transformers on PyTorch through langchain_huggingface
+class HuggingFaceBackend(EmbeddingBackend):
+    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME):
+        from langchain_huggingface import HuggingFaceEmbeddings
+        self.model = HuggingFaceEmbeddings(model_name=model_name)
+        self.name = f"huggingface:{model_name}"
+        client = getattr(self.model, "_client", None) or getattr(self.model, "client", None)
+        self.tokenizer = getattr(client, "tokenizer", None)
+
+    def embed_documents(self, texts: list) -> list:
+        return self.model.embed_documents(texts)
+
+# ONNX Runtime backend with optional dynamic int8 quantization. The model is exported
+# to ONNX_MODEL_DIR on first use and loaded from there afterwards.
+class OnnxBackend(EmbeddingBackend):
+    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME, model_dir: str = ONNX_MODEL_DIR,
+                 quantize: bool = ONNX_QUANTIZE, threads: int = ONNX_THREADS):
+        from transformers import AutoTokenizer
+        
+        model_path = os.path.join(model_dir, "model_int8.onnx" if quantize else "model.onnx")
+        if not os.path.exists(model_path):
+            export_onnx_model(model_name, model_dir, quantize)
+        
+        self.model_path = model_path
+        self.session = self._new_session(threads)
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.name = f"onnx{'-int8' if quantize else ''}:{model_name}"
+
+    def _new_session(self, threads: int):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        return ort.InferenceSession(self.model_path, options, providers=["CPUExecutionProvider"])
+
+    def after_fork(self, threads: int):
+        # The parent's intra-op threads do not exist in the child, so run on a new session.
+        # The inherited one is kept referenced: destroying it would try to join those threads.
+        self._parent_session = self.session
+        self.session = self._new_session(threads)
+
+    def embed_documents(self, texts: list) -> list:
+        if not texts:
+            return []
+        encoded = self.tokenizer(list(texts), padding=True, truncation=True,
+                                 max_length=ONNX_MAX_LENGTH, return_tensors="np")
+        feeds = {name: value.astype(np.int64) for name, value in encoded.items() if name in self.input_names}
+        token_embeddings = self.session.run(None, feeds)[0]
+        
+        # Mean pooling over real tokens followed by L2 normalization, as in sentence-transformers
+        mask = encoded["attention_mask"][..., None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled.tolist()
+
+# Export the transformer to ONNX (and a dynamically int8-quantized copy) in model_dir
+def export_onnx_model(model_name: str, model_dir: str, quantize: bool):
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+    
+    logger.info(f"Exporting {model_name} to ONNX in {model_dir}")
+    os.makedirs(model_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    tokenizer.save_pretrained(model_dir)
+    model = AutoModel.from_pretrained(model_name).eval()
+    
+    # Fix the input order with keyword arguments; transformer forward() signatures vary by version
+    class TokenEmbeddings(torch.nn.Module):
+        def __init__(self, encoder):
+            super().__init__()
+            self.encoder = encoder
+
+        def forward(self, input_ids, attention_mask, token_type_ids):
+            return self.encoder(input_ids=input_ids, attention_mask=attention_mask,
+                                token_type_ids=token_type_ids)[0]
+    
+    fp32_path = os.path.join(model_dir, "model.onnx")
+    if not os.path.exists(fp32_path):
+        sample = tokenizer(["export sample"], return_tensors="pt")
+        input_names = ["input_ids", "attention_mask", "token_type_ids"]
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+        # Newer torch defaults to the dynamo exporter (extra onnxscript dependency); use the TorchScript one
+        export_options = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+        with torch.no_grad():
+            torch.onnx.export(
+                TokenEmbeddings(model), tuple(sample[name] for name in input_names), fp32_path,
+                input_names=input_names, output_names=["last_hidden_state"],
+                dynamic_axes=dynamic_axes, opset_version=14, **export_options
+            )
+    
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(fp32_path, os.path.join(model_dir, "model_int8.onnx"), weight_type=QuantType.QInt8)
+
+EMBEDDING_BACKENDS = {
+    "huggingface": HuggingFaceBackend,
+    "onnx": OnnxBackend
+}
+
+def create_embedding_backend(name: str) -> EmbeddingBackend:
+    if name not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{name}' (expected one of: {', '.join(EMBEDDING_BACKENDS)})")
+    return EMBEDDING_BACKENDS[name]()
+
+# Embedding backend - constructed on first use (or at import unless LAZY_STARTUP is set)
+_embeddings = None
+_embeddings_state = "not_loaded"  # not_loaded | loaded | failed
+_embeddings_lock = threading.Lock()
+
+def get_embeddings() -> Optional[EmbeddingBackend]:
+    """Return the configured embedding backend, loading it on first call; None if it cannot be loaded"""
+    global _embeddings, _embeddings_state
+    if _embeddings_state == "not_loaded":
+        with _embeddings_lock:
+            if _embeddings_state == "not_loaded":
+                with startup_phase("embeddings_model"):
+                    try:
+                        _embeddings = create_embedding_backend(EMBEDDING_BACKEND)
+                        _embeddings_state = "loaded"
+                        print(f"✓ Embeddings model loaded successfully ({_embeddings.name})")
+                    except Exception as e:
+                        _embeddings_state = "failed"
+                        print(f"✗ Embeddings model failed to load: {e}")
+    return _embeddings
+
+def embeddings_available() -> bool:
+    return get_embeddings() is not None
+
+# Compare a backend against the reference backend on sample texts
+def check_embedding_parity(backend_name: str = None, reference_name: str = "huggingface", texts: list = None) -> dict:
+    """Report the cosine drift (1 - cosine similarity) of a backend against the reference"""
+    texts = texts or list(JOB_DESCRIPTIONS.values()) + [
+        "Software engineer with 5 years of experience in Python, Django, Docker and AWS.",
+        "Data analyst skilled in SQL, Tableau and Power BI with 3 years of experience.",
+        "Product manager who led roadmap planning, user research and A/B testing.",
+        "Full stack developer building React and Node.js applications with MongoDB."
+    ]
+    report = {"texts": len(texts)}
+    vectors = {}
+    for label, name in (("backend", backend_name or EMBEDDING_BACKEND), ("reference", reference_name)):
+        backend = create_embedding_backend(name)
+        start = time.perf_counter()
+        vectors[label] = np.array(backend.embed_documents(texts), dtype=float)
+        report[label] = {"name": backend.name, "seconds": round(time.perf_counter() - start, 4)}
+    
+    a, b = vectors["backend"], vectors["reference"]
+    cosines = (a * b).sum(axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+    drift = 1.0 - cosines
+    report.update(mean_drift=float(drift.mean()), max_drift=float(drift.max()), min_cosine=float(cosines.min()))
+    return report
+
+# Content-addressed cache for extracted resume text and resume embeddings.
+# Entries are keyed by the SHA-256 of the uploaded file bytes and kept in a
+# bounded in-memory LRU; an optional SQLite file keeps them across restarts.
+class ResumeCache:
+    def __init__(self, max_entries: int, db_path: str = ""):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self.counters = {
+            "text_hits": 0, "text_misses": 0,
+            "embedding_hits": 0, "embedding_misses": 0,
+            "disk_hits": 0, "evictions": 0
+        }
+        if db_path:
+            try:
+                self._db = sqlite3.connect(db_path, check_same_thread=False)
+                self._db.execute("CREATE TABLE IF NOT EXISTS resume_text (key TEXT PRIMARY KEY, text TEXT NOT NULL)")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS resume_embedding ("
+                    "key TEXT NOT NULL, model TEXT NOT NULL, vector BLOB NOT NULL, "
+                    "PRIMARY KEY (key, model))"
+                )
+                self._db.commit()
+                logger.info(f"Resume cache persisted to {db_path}")
+            except Exception as e:
+                logger.error(f"Could not open resume cache database {db_path}: {e}")
+                self._db = None
+
+    @staticmethod
+    def key_for(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()
+
+    def _entry(self, key: str) -> dict:
+        # Caller holds the lock
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = {"text": None, "embeddings": {}}
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters["evictions"] += 1
+        else:
+            self._entries.move_to_end(key)
+        return entry
+
+    def get_text(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry["text"] is not None:
+                self._entries.move_to_end(key)
+                self.counters["text_hits"] += 1
+                return entry["text"]
+            if self._db is not None:
+                row = self._db.execute("SELECT text FROM resume_text WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._entry(key)["text"] = row[0]
+                    self.counters["text_hits"] += 1
+                    self.counters["disk_hits"] += 1
+                    return row[0]
+            self.counters["text_misses"] += 1
+            return None
+
+    def put_text(self, key: str, text: str):
+        with self._lock:
+            self._entry(key)["text"] = text
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO resume_text (key, text) VALUES (?, ?)", (key, text))
+                self._db.commit()
+
+    def get_embedding(self, key: str, model: str) -> Optional[np.ndarray]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and model in entry["embeddings"]:
+                self._entries.move_to_end(key)
+                self.counters["embedding_hits"] += 1
+                return entry["embeddings"][model]
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT vector FROM resume_embedding WHERE key = ? AND model = ?", (key, model)
+                ).fetchone()
+                if row is not None:
+                    vector = np.frombuffer(row[0], dtype=np.float32).astype(float)
+                    self._entry(key)["embeddings"][model] = vector
+                    self.counters["embedding_hits"] += 1
+                    self.counters["disk_hits"] += 1
+                    return vector
+            self.counters["embedding_misses"] += 1
+            return None
+
+    def peek_embedding(self, key: str, model: str) -> Optional[np.ndarray]:
+        """Like get_embedding, but leaves the hit/miss counters and LRU order untouched"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and model in entry["embeddings"]:
+                return entry["embeddings"][model]
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT vector FROM resume_embedding WHERE key = ? AND model = ?", (key, model)
+                ).fetchone()
+                if row is not None:
+                    return np.frombuffer(row[0], dtype=np.float32).astype(float)
+            return None
+
+    def put_embeddings(self, items: list, model: str):
+        """Store (key, vector) pairs for a model in one transaction"""
+        with self._lock:
+            for key, vector in items:
+                self._entry(key)["embeddings"][model] = vector
+            if self._db is not None:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO resume_embedding (key, model, vector) VALUES (?, ?, ?)",
+                    [(key, model, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items]
+                )
+                self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.counters, entries=len(self._entries), max_entries=self.max_entries,
+                        persistent=self._db is not None)
+
+resume_cache = ResumeCache(RESUME_CACHE_SIZE, RESUME_CACHE_DB)
+
+# Expose the cache counters at /metrics
+@METRICS.collector
+def resume_cache_metrics() -> list:
+    stats = resume_cache.stats()
+    return [
+        "# HELP resume_cache_hits_total Resume cache hits by entry kind.",
+        "# TYPE resume_cache_hits_total counter",
+        f'resume_cache_hits_total{{kind="text"}} {stats["text_hits"]}',
+        f'resume_cache_hits_total{{kind="embedding"}} {stats["embedding_hits"]}',
+        "# HELP resume_cache_misses_total Resume cache misses by entry kind.",
+        "# TYPE resume_cache_misses_total counter",
+        f'resume_cache_misses_total{{kind="text"}} {stats["text_misses"]}',
+        f'resume_cache_misses_total{{kind="embedding"}} {stats["embedding_misses"]}',
+        "# HELP resume_cache_disk_hits_total Resume cache hits served from the SQLite store.",
+        "# TYPE resume_cache_disk_hits_total counter",
+        f"resume_cache_disk_hits_total {stats['disk_hits']}",
+        "# HELP resume_cache_evictions_total Entries evicted from the in-memory resume cache.",
+        "# TYPE resume_cache_evictions_total counter",
+        f"resume_cache_evictions_total {stats['evictions']}",
+        "# HELP resume_cache_entries Entries in the in-memory resume cache.",
+        "# TYPE resume_cache_entries gauge",
+        f"resume_cache_entries {stats['entries']}"
+    ]
+
+# Per-resume feature store for re-ranking without re-uploading. Keeps each resume's
+# compressed text, normalized text hash, years of experience, term positions for the
+# skill/keyword vocabulary it was scanned with, and its embedding. Role JD and skill
+# edits made through /api/roles are stored here too.
+class FeatureStore:
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._term_sets = {}
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS resume_features ("
+            "resume_hash TEXT PRIMARY KEY, filename TEXT NOT NULL, text_hash TEXT NOT NULL, "
+            "text BLOB NOT NULL, years_experience INTEGER NOT NULL, experience_score INTEGER NOT NULL, "
+            "term_positions TEXT NOT NULL, terms_version TEXT NOT NULL, model TEXT, embedding BLOB, "
+            "updated REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS term_sets (version TEXT PRIMARY KEY, terms TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS role_overrides (role TEXT PRIMARY KEY, jd_text TEXT NOT NULL, "
+            "skills TEXT NOT NULL, updated REAL NOT NULL);"
+        )
+        self._db.commit()
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        return hashlib.sha256(" ".join(text.lower().split()).encode("utf-8")).hexdigest()
+
+    def register_terms(self, terms) -> str:
+        """Store a term vocabulary and return its version"""
+        terms = sorted(set(terms))
+        version = content_version(*terms)
+        with self._lock:
+            if version not in self._term_sets:
+                self._db.execute("INSERT OR IGNORE INTO term_sets (version, terms) VALUES (?, ?)", (version, json.dumps(terms)))
+                self._db.commit()
+                self._term_sets[version] = frozenset(terms)
+        return version
+
+    def terms(self, version: str) -> frozenset:
+        with self._lock:
+            if version not in self._term_sets:
+                row = self._db.execute("SELECT terms FROM term_sets WHERE version = ?", (version,)).fetchone()
+                self._term_sets[version] = frozenset(json.loads(row[0]) if row else ())
+            return self._term_sets[version]
+
+    def put_features(self, rows: list, model: Optional[str]):
+        """Upsert feature rows; a row without an embedding keeps the one already stored"""
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT INTO resume_features (resume_hash, filename, text_hash, text, years_experience, "
+                "experience_score, term_positions, terms_version, model, embedding, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(resume_hash) DO UPDATE SET filename = excluded.filename, "
+                "text_hash = excluded.text_hash, text = excluded.text, "
+                "years_experience = excluded.years_experience, experience_score = excluded.experience_score, "
+                "term_positions = excluded.term_positions, terms_version = excluded.terms_version, "
+                "model = CASE WHEN excluded.embedding IS NULL THEN resume_features.model ELSE excluded.model END, "
+                "embedding = COALESCE(excluded.embedding, resume_features.embedding), updated = excluded.updated",
+                [
+                    (
+                        row["resume_hash"], row["filename"], self.text_hash(row["text"]),
+                        zlib.compress(row["text"].encode("utf-8")), row["years_experience"],
+                        row["experience_score"], json.dumps(row["term_positions"], separators=(",", ":")),
+                        row["terms_version"], model if row.get("embedding") is not None else None,
+                        np.asarray(row["embedding"], dtype=np.float32).tobytes() if row.get("embedding") is not None else None,
+                        now
+                    )
+                    for row in rows
+                ]
+            )
+            self._db.commit()
+
+    def put_embeddings(self, items: list, model: str):
+        with self._lock:
+            self._db.executemany(
+                "UPDATE resume_features SET model = ?, embedding = ? WHERE resume_hash = ?",
+                [(model, np.asarray(vector, dtype=np.float32).tobytes(), key) for key, vector in items]
+            )
+            self._db.commit()
+
+    def put_term_positions(self, items: list):
+        """Store (resume_hash, term_positions, terms_version) after a rescan for new terms"""
+        with self._lock:
+            self._db.executemany(
+                "UPDATE resume_features SET term_positions = ?, terms_version = ? WHERE resume_hash = ?",
+                [(json.dumps(positions, separators=(",", ":")), version, key) for key, positions, version in items]
+            )
+            self._db.commit()
+
+    def load(self, resume_hashes: list = None) -> list:
+        query = (
+            "SELECT resume_hash, filename, text, years_experience, experience_score, "
+            "term_positions, terms_version, model, embedding FROM resume_features"
+        )
+        with self._lock:
+            if resume_hashes is None:
+                rows = self._db.execute(query + " ORDER BY updated, resume_hash").fetchall()
+            else:
+                rows = []
+                # Stay under SQLite's bound-parameter limit
+                for start in range(0, len(resume_hashes), 500):
+                    chunk = resume_hashes[start:start + 500]
+                    rows.extend(self._db.execute(
+                        query + f" WHERE resume_hash IN ({','.join('?' * len(chunk))})", chunk
+                    ).fetchall())
+        return [
+            {
+                "resume_hash": row[0], "filename": row[1], "text": zlib.decompress(row[2]).decode("utf-8"),
+                "years_experience": row[3], "experience_score": row[4],
+                "term_positions": json.loads(row[5]), "terms_version": row[6], "model": row[7],
+                "embedding": np.frombuffer(row[8], dtype=np.float32).astype(float) if row[8] is not None else None
+            }
+            for row in rows
+        ]
+
+    def save_role_override(self, role: str, jd_text: str, skills: list):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO role_overrides (role, jd_text, skills, updated) VALUES (?, ?, ?, ?)",
+                (role, jd_text, json.dumps(skills), time.time())
+            )
+            self._db.commit()
+
+    def role_overrides(self) -> dict:
+        with self._lock:
+            rows = self._db.execute("SELECT role, jd_text, skills FROM role_overrides").fetchall()
+        return {role: (jd_text, json.loads(skills)) for role, jd_text, skills in rows}
+
+    def role_overrides_version(self) -> tuple:
+        """Changes whenever a role is edited"""
+        with self._lock:
+            return tuple(self._db.execute("SELECT COUNT(*), MAX(updated) FROM role_overrides").fetchone())
+
+    def version(self) -> tuple:
+        """Changes whenever resumes are added or re-ingested"""
+        with self._lock:
+            return tuple(self._db.execute("SELECT COUNT(*), MAX(updated) FROM resume_features").fetchone())
+
+    def stats(self) -> dict:
+        with self._lock:
+            count = self._db.execute("SELECT COUNT(*) FROM resume_features").fetchone()[0]
+        return {"resumes": count, "path": self.db_path}
+
+def open_feature_store(db_path: str) -> Optional[FeatureStore]:
+    if not db_path:
+        return None
+    try:
+        store = FeatureStore(db_path)
+        logger.info(f"Feature store at {db_path}")
+        return store
+    except Exception as e:
+        logger.error(f"Could not open feature store {db_path}: {e}")
+        return None
+
+feature_store = open_feature_store(FEATURE_STORE_DB)
 
 # Define state schema using TypedDict
 class GraphState(TypedDict):
@@ -107,486 +883,2977 @@ class GraphState(TypedDict):
     resume_file: Any
     job_role: str
     detailed_scores: dict
+    resume_hash: str
+
+# Extract clean text from a document given as bytes or a file path (see spool_upload).
+# Runs in extraction worker processes, so it must only depend on its arguments and
+# the module-level parser imports.
+def extract_text(filename: str, file_content) -> tuple:
+    """Return (text, cacheable) for a PDF, DOCX or TXT document, capped at MAX_RESUME_CHARS"""
+    text = ""
+    is_path = isinstance(file_content, str)
+    
+    # Results caused by a missing library must not be cached
+    cacheable = True
+    
+    if filename.lower().endswith('.pdf'):
+        log_sampled("Processing PDF file %s", filename)
+        if PDF_AVAILABLE:
+            try:
+                # Spooled uploads are opened by path so the document is not copied into memory
+                if is_path:
+                    doc = fitz.open(file_content, filetype="pdf")
+                else:
+                    doc = fitz.open(stream=file_content, filetype="pdf")
+                log_sampled("PDF has %d pages", doc.page_count)
+                
+                pages = []
+                chars = 0
+                for page_num in range(min(doc.page_count, MAX_PDF_PAGES)):
+                    page_text = doc[page_num].get_text()
+                    log_sampled("Page %d text length: %d", page_num + 1, len(page_text))
+                    pages.append(page_text)
+                    chars += len(page_text)
+                    if chars >= MAX_RESUME_CHARS:
+                        break
+                if len(pages) < doc.page_count:
+                    logger.info(f"Stopped reading {filename} after {len(pages)} of {doc.page_count} pages")
+                doc.close()
+                text = " ".join(pages)
+            except Exception as pdf_error:
+                logger.error(f"PDF processing error: {pdf_error}")
+                text = f"Error processing PDF: {str(pdf_error)}"
+        else:
+            text = "PDF processing not available - PyMuPDF not installed"
+            cacheable = False
+            logger.error("PyMuPDF not available for PDF processing")
+            
+    elif filename.lower().endswith('.docx'):
+        log_sampled("Processing DOCX file %s", filename)
+        if DOCX_AVAILABLE:
+            try:
+                # docx2txt accepts a path or a file-like object
+                text = docx2txt.process(file_content if is_path else io.BytesIO(file_content))
+                log_sampled("DOCX extracted text length: %d", len(text) if text else 0)
+            except Exception as docx_error:
+                logger.error(f"DOCX processing error with docx2txt: {docx_error}")
+                # Try alternative method with python-docx
+                if PYTHON_DOCX_AVAILABLE:
+                    try:
+                        log_sampled("Trying python-docx as fallback...")
+                        doc = Document(file_content if is_path else io.BytesIO(file_content))
+                        paragraphs = []
+                        chars = 0
+                        for paragraph in doc.paragraphs:
+                            paragraphs.append(paragraph.text)
+                            chars += len(paragraph.text)
+                            if chars >= MAX_RESUME_CHARS:
+                                break
+                        text = "\n".join(paragraphs)
+                        log_sampled("Python-docx extracted text length: %d", len(text))
+                    except Exception as alt_error:
+                        logger.error(f"Python-docx fallback failed: {alt_error}")
+                        text = f"Error processing DOCX: {str(docx_error)}"
+                else:
+                    text = f"Error processing DOCX: {str(docx_error)}"
+        else:
+            text = "DOCX processing not available - docx2txt not installed"
+            cacheable = False
+            logger.error("docx2txt not available for DOCX processing")
+            
+    elif filename.lower().endswith('.txt'):
+        log_sampled("Processing TXT file %s", filename)
+        # A character needs at most 4 bytes, so nothing past this is ever kept
+        byte_cap = MAX_RESUME_CHARS * 4
+        if is_path:
+            with open(file_content, "rb") as f:
+                file_content = f.read(byte_cap)
+        else:
+            file_content = file_content[:byte_cap]
+        try:
+            # Incremental decoding tolerates a character split by the byte cap
+            text = codecs.getincrementaldecoder('utf-8')().decode(file_content, final=False)
+            log_sampled("TXT file text length: %d", len(text))
+        except UnicodeDecodeError:
+            # Try different encodings
+            for encoding in ['latin-1', 'cp1252', 'iso-8859-1']:
+                try:
+                    text = file_content.decode(encoding)
+                    log_sampled("TXT file decoded with %s, length: %d", encoding, len(text))
+                    break
+                except UnicodeDecodeError:
+                    continue
+            else:
+                text = "Error: Could not decode text file"
+                logger.error("Could not decode text file with any encoding")
+        except Exception as txt_error:
+            logger.error(f"TXT processing error: {txt_error}")
+            text = f"Error processing TXT: {str(txt_error)}"
+    else:
+        logger.warning(f"Unsupported file format: {filename}")
+        text = f"Unsupported file format: {filename.split('.')[-1] if '.' in filename else 'unknown'}"
+        
+    # Clean and validate text
+    if text:
+        text = text.strip()
+        # Remove excessive whitespace but preserve some structure
+        text = ' '.join(text.split())
+        text = text[:MAX_RESUME_CHARS]
+        
+    log_sampled("Final extracted text length for %s: %d, preview: %.300r", filename, len(text), text)
+    
+    # More lenient validation
+    if len(text) < 5:
+        logger.warning(f"Very short text extracted from {filename}")
+        if not text or text.startswith("Error"):
+            text = f"Minimal content from {filename}"
+    
+    return text, cacheable
+
+# Read an upload once: enforce the size limit, hash it in chunks and keep it in memory
+# only while it is small. Larger uploads are spooled to a temporary file, and uploads
+# that already live on disk (job files) are used in place.
+def spool_upload(file) -> tuple:
+    """Return (resume_hash, source, temp_path) where source is bytes or a file path.
+
+    Raises ValueError when the upload exceeds MAX_RESUME_BYTES. The caller removes
+    ``temp_path`` (see release_upload) once extraction is done.
+    """
+    limit_mb = f"{MAX_RESUME_BYTES / (1024 * 1024):g}"
+    stream = file.stream
+    try:
+        stream.seek(0, os.SEEK_END)
+        size = stream.tell()
+        stream.seek(0)
+    except (AttributeError, OSError, ValueError):
+        size = None
+    if size is not None and size > MAX_RESUME_BYTES:
+        raise ValueError(f"{file.filename} is {size / (1024 * 1024):.1f} MB, over the {limit_mb} MB per-file limit")
+    
+    digest = hashlib.sha256()
+    on_disk = getattr(stream, "name", None)
+    if isinstance(on_disk, str) and os.path.isfile(on_disk):
+        while True:
+            chunk = stream.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            digest.update(chunk)
+        return digest.hexdigest(), on_disk, None
+    
+    buffer = io.BytesIO()
+    spool = None
+    read = 0
+    try:
+        while True:
+            chunk = stream.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            read += len(chunk)
+            if read > MAX_RESUME_BYTES:
+                raise ValueError(f"{file.filename} is over the {limit_mb} MB per-file limit")
+            digest.update(chunk)
+            if spool is None and read > UPLOAD_SPOOL_BYTES:
+                suffix = os.path.splitext(file.filename or "")[1].lower()
+                spool = tempfile.NamedTemporaryFile(prefix="resume-", suffix=suffix, delete=False)
+                spool.write(buffer.getvalue())
+                buffer = None
+            (spool or buffer).write(chunk)
+    except BaseException:
+        if spool is not None:
+            spool.close()
+            os.unlink(spool.name)
+        raise
+    
+    if spool is None:
+        return digest.hexdigest(), buffer.getvalue(), None
+    spool.close()
+    return digest.hexdigest(), spool.name, spool.name
+
+def release_upload(temp_path: Optional[str]):
+    if temp_path:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+
+# Read-only stream over one ZIP member. The member is decompressed only while it is
+# read; seeking supports rewinding and jumping to the end (the size comes from the
+# archive directory), which is all spool_upload and FileStorage.save need.
+class ZipMemberStream(io.RawIOBase):
+    def __init__(self, archive: zipfile.ZipFile, info: zipfile.ZipInfo):
+        self._archive = archive
+        self._info = info
+        self._member = None
+        self._at_end = False
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._at_end:
+            return 0
+        if self._member is None:
+            self._member = self._archive.open(self._info)
+        data = self._member.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if offset != 0 or whence not in (io.SEEK_SET, io.SEEK_END):
+            raise io.UnsupportedOperation("ZIP member streams can only seek to the start or the end")
+        if self._member is not None:
+            self._member.close()
+            self._member = None
+        self._at_end = whence == io.SEEK_END
+        return self.tell()
+
+    def tell(self) -> int:
+        if self._at_end:
+            return self._info.file_size
+        if self._member is None:
+            return 0
+        return self._member.tell()
+
+    def close(self):
+        if self._member is not None:
+            self._member.close()
+            self._member = None
+        super().close()
+
+# Replace ZIP uploads with one upload per resume member. Only the archive directory
+# is read here, so oversized or zip-bomb archives are rejected before any member is
+# decompressed; members are then streamed one at a time by the extraction stage.
+def expand_uploads(files: list) -> list:
+    """Return the uploads with every .zip replaced by its resume members.
+
+    Raises ValueError when an archive is unreadable, empty or over the ZIP limits.
+    """
+    expanded = []
+    for file in files:
+        if not (file.filename or "").lower().endswith(".zip"):
+            expanded.append(file)
+            continue
+        try:
+            file.seek(0)
+            archive = zipfile.ZipFile(file.stream)
+            entries = archive.infolist()
+        except (zipfile.BadZipFile, OSError) as e:
+            raise ValueError(f"{file.filename} is not a valid ZIP archive: {e}")
+        if len(entries) > ZIP_MAX_MEMBERS:
+            raise ValueError(f"{file.filename} has {len(entries)} entries, over the limit of {ZIP_MAX_MEMBERS}")
+        
+        members = [
+            info for info in entries
+            if not info.is_dir()
+            and not info.filename.startswith("__MACOSX/")
+            and not os.path.basename(info.filename).startswith(".")
+            and info.filename.lower().endswith(RESUME_EXTENSIONS)
+        ]
+        if not members:
+            raise ValueError(f"{file.filename} contains no PDF, DOCX or TXT resumes")
+        uncompressed = sum(info.file_size for info in members)
+        if uncompressed > ZIP_MAX_UNCOMPRESSED_BYTES:
+            raise ValueError(
+                f"{file.filename} expands to {uncompressed / (1024 * 1024):.1f} MB, over the "
+                f"{ZIP_MAX_UNCOMPRESSED_BYTES / (1024 * 1024):g} MB limit"
+            )
+        
+        logger.info(f"Expanded {file.filename} into {len(members)} resumes")
+        expanded.extend(
+            FileStorage(stream=ZipMemberStream(archive, info), filename=info.filename) for info in members
+        )
+    
+    if len(expanded) > ZIP_MAX_MEMBERS:
+        raise ValueError(f"Request has {len(expanded)} resumes, over the limit of {ZIP_MAX_MEMBERS}")
+    return expanded
 
 # Parse resume function with better import handling
 def parse_resume(state: GraphState) -> GraphState:
     file = state["resume_file"]
     filename = file.filename
-    text = ""
     
-    logger.info(f"=== PARSING RESUME: {filename} ===")
-    logger.info(f"PDF_AVAILABLE: {PDF_AVAILABLE}, DOCX_AVAILABLE: {DOCX_AVAILABLE}")
+    if state.get("resume_text"):
+        # Text was already produced by the extraction stage (see extract_documents)
+        return state
+    
+    with timed_stage("parse_resume"):
+        log_sampled("Parsing resume %s", filename)
+        
+        temp_path = None
+        try:
+            resume_hash, file_content, temp_path = spool_upload(file)
+            log_sampled("Read %s (%s)", filename, "spooled to disk" if isinstance(file_content, str) else "in memory")
+            
+            # Skip extraction entirely for files we have already parsed
+            state["resume_hash"] = resume_hash
+            cached_text = resume_cache.get_text(resume_hash)
+            if cached_text is not None:
+                log_sampled("Using cached text for %s", filename)
+                state["resume_text"] = cached_text
+                record_parsed_file(filename, cached_text)
+                return state
+            
+            text, cacheable = extract_text(filename, file_content)
+            state["resume_text"] = text
+            record_parsed_file(filename, text)
+            if cacheable:
+                resume_cache.put_text(resume_hash, text)
+            log_sampled("Parsing complete for %s", filename)
+            
+        except Exception as e:
+            logger.error(f"Parsing error for {filename}: {str(e)}")
+            import traceback
+            logger.error(f"Traceback: {traceback.format_exc()}")
+            state["resume_text"] = f"Error parsing {filename}: {str(e)}"
+            record_parsed_file(filename, failed=True)
+        finally:
+            release_upload(temp_path)
+            
+    return state
+
+# Extraction worker entry point - enforces the per-document timeout inside the worker
+def _extract_worker(filename: str, file_content: bytes, timeout: float) -> tuple:
+    def on_timeout(signum, frame):
+        raise TimeoutError(f"Extraction exceeded {timeout}s")
+    
+    if not hasattr(signal, "setitimer"):
+        # No interval timers (Windows) - rely on the parent-side timeout only
+        return extract_text(filename, file_content)
+    
+    previous = signal.signal(signal.SIGALRM, on_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return extract_text(filename, file_content)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+# Shared process pool for document extraction, created on first use
+_extract_pool = None
+_extract_pool_lock = threading.Lock()
+
+def _new_extract_pool(max_workers: int) -> concurrent.futures.ProcessPoolExecutor:
+    # Fork keeps worker start-up cheap: children inherit the already imported parsers
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    return concurrent.futures.ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
+
+def get_extract_pool() -> concurrent.futures.ProcessPoolExecutor:
+    global _extract_pool
+    with _extract_pool_lock:
+        if _extract_pool is None:
+            _extract_pool = _new_extract_pool(EXTRACT_WORKERS)
+            logger.info(f"Started extraction pool with {EXTRACT_WORKERS} workers")
+        return _extract_pool
+
+def _terminate_pool(pool: concurrent.futures.ProcessPoolExecutor):
+    """Shut a pool down without waiting, killing workers that are stuck on a document"""
+    global _extract_pool
+    with _extract_pool_lock:
+        if _extract_pool is pool:
+            _extract_pool = None
+    # ProcessPoolExecutor has no public way to kill a busy worker
+    processes = list((getattr(pool, "_processes", None) or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+
+def _extract_isolated(filename: str, file_content: bytes):
+    """Extract one document in its own single-worker pool; returns the result or the exception"""
+    pool = _new_extract_pool(1)
+    try:
+        future = pool.submit(_extract_worker, filename, file_content, EXTRACT_TIMEOUT)
+        return future.result(timeout=EXTRACT_TIMEOUT + 5)
+    except concurrent.futures.TimeoutError:
+        return TimeoutError(f"Extraction of {filename} timed out after {EXTRACT_TIMEOUT}s")
+    except Exception as e:
+        return e
+    finally:
+        _terminate_pool(pool)
+
+def extract_in_pool(documents: list) -> list:
+    """Extract (filename, bytes) documents in worker processes.
+
+    Returns one (text, cacheable) tuple or exception per document, in input order.
+    Documents caught in a crashed or hung pool are retried one by one in isolation,
+    so a single bad file cannot fail the others.
+    """
+    results = [None] * len(documents)
+    if not documents:
+        return results
+    
+    pool = get_extract_pool()
+    futures = [pool.submit(_extract_worker, filename, content, EXTRACT_TIMEOUT) for filename, content in documents]
+    
+    # Parent-side guard for workers stuck in native code, which the in-worker alarm cannot interrupt
+    rounds = -(-len(documents) // EXTRACT_WORKERS)
+    deadline = time.monotonic() + EXTRACT_TIMEOUT * (rounds + 1)
+    retry = []
+    for i, future in enumerate(futures):
+        try:
+            results[i] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except (concurrent.futures.TimeoutError, concurrent.futures.BrokenExecutor):
+            retry.append(i)
+        except Exception as e:
+            results[i] = e
+    
+    if retry:
+        logger.warning(f"Extraction pool failed on {len(retry)} documents - retrying them in isolation")
+        _terminate_pool(pool)
+        for i in retry:
+            results[i] = _extract_isolated(*documents[i])
+    return results
+
+# Extraction stage for the batch path: read, hash and extract every upload.
+# Files go through in windows of EXTRACT_WINDOW so only one window of document
+# bytes is held at a time, however large the batch is.
+def extract_documents(files: list) -> list:
+    """Return one {"text", "resume_hash", "error"} dict per file, in upload order"""
+    extracted = []
+    for start in range(0, len(files), EXTRACT_WINDOW):
+        extracted.extend(extract_window(files[start:start + EXTRACT_WINDOW]))
+    
+    for file, item in zip(files, extracted):
+        record_parsed_file(file.filename, item["text"], failed=item["error"] is not None)
+    return extracted
+
+def extract_window(files: list) -> list:
+    extracted = []
+    pending = []
+    temp_paths = []
+    for file in files:
+        item = {"text": None, "resume_hash": "", "error": None}
+        extracted.append(item)
+        try:
+            item["resume_hash"], file_content, temp_path = spool_upload(file)
+            temp_paths.append(temp_path)
+            item["text"] = resume_cache.get_text(item["resume_hash"])
+            if item["text"] is None:
+                pending.append((item, file.filename, file_content))
+        except Exception as e:
+            logger.error(f"Error reading {file.filename}: {e}")
+            item["error"] = str(e)
+    
+    try:
+        with timed_stage("extract"):
+            if EXTRACT_WORKERS > 0 and not profiling_active():
+                outcomes = extract_in_pool([(filename, content) for _, filename, content in pending])
+            else:
+                outcomes = []
+                for _, filename, content in pending:
+                    try:
+                        outcomes.append(extract_text(filename, content))
+                    except Exception as e:
+                        outcomes.append(e)
+    finally:
+        for temp_path in temp_paths:
+            release_upload(temp_path)
+    
+    for (item, filename, _), outcome in zip(pending, outcomes):
+        if isinstance(outcome, BaseException):
+            logger.error(f"Extraction failed for {filename}: {outcome}")
+            item["error"] = str(outcome) or type(outcome).__name__
+            continue
+        item["text"], cacheable = outcome
+        if cacheable:
+            resume_cache.put_text(item["resume_hash"], item["text"])
+    return extracted
+
+# Near-duplicate detection. Each resume gets a MinHash signature over its word
+# 3-grams; LSH banding finds candidate matches in a bounded in-memory index, and a
+# candidate counts as a duplicate when the signatures agree on at least
+# DEDUP_THRESHOLD of their positions (an estimate of the Jaccard similarity).
+MINHASH_PRIME = (1 << 61) - 1
+
+def lsh_bands(num_perm: int, threshold: float) -> tuple:
+    """Pick (bands, rows) whose LSH threshold (1/bands)^(1/rows) is closest to ``threshold``"""
+    return min(
+        ((bands, num_perm // bands) for bands in range(1, num_perm + 1)),
+        key=lambda shape: abs((1 / shape[0]) ** (1 / shape[1]) - threshold)
+    )
+
+class NearDuplicateIndex:
+    def __init__(self, threshold: float, num_perm: int, max_entries: int, seed: int = 1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.max_entries = max_entries
+        self.bands, self.rows = lsh_bands(num_perm, threshold)
+        rng = np.random.default_rng(seed)
+        # a < 2^31 and 32-bit shingle hashes keep a * x + b inside uint64
+        self._a = rng.integers(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 31, size=num_perm, dtype=np.uint64)
+        self._buckets = {}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash signature of the text, or None when it is too short to compare"""
+        tokens = re.findall(r"\w+", text.lower())
+        shingles = {" ".join(tokens[i:i + 3]) for i in range(len(tokens) - 2)}
+        if len(shingles) < DEDUP_MIN_SHINGLES:
+            return None
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+        return ((np.outer(self._a, hashes) + self._b[:, None]) % MINHASH_PRIME).min(axis=1)
+
+    def _band_keys(self, signature: np.ndarray) -> list:
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+
+    def match_or_add(self, key: str, signature: np.ndarray, info: dict) -> Optional[dict]:
+        """Return the info of the best indexed near-duplicate, or index this resume and return None.
+
+        A resume that is already indexed under ``key`` is not its own duplicate: its info is
+        replaced, so later near-duplicates point at this occurrence, and None is returned.
+        """
+        band_keys = self._band_keys(signature)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._entries[key]["info"] = info
+                return None
+            candidates = {candidate for band_key in band_keys for candidate in self._buckets.get(band_key, ())}
+            best, best_similarity = None, self.threshold
+            for candidate in candidates:
+                similarity = float(np.mean(self._entries[candidate]["signature"] == signature))
+                if similarity >= best_similarity:
+                    best, best_similarity = candidate, similarity
+            if best is not None:
+                self._entries.move_to_end(best)
+                return self._entries[best]["info"]
+            
+            self._entries[key] = {"signature": signature, "bands": band_keys, "info": info}
+            for band_key in band_keys:
+                self._buckets.setdefault(band_key, []).append(key)
+            while len(self._entries) > self.max_entries:
+                old_key, old = self._entries.popitem(last=False)
+                for band_key in old["bands"]:
+                    bucket = self._buckets.get(band_key)
+                    if bucket is not None:
+                        bucket.remove(old_key)
+                        if not bucket:
+                            del self._buckets[band_key]
+            return None
+
+near_duplicate_index = NearDuplicateIndex(DEDUP_THRESHOLD, DEDUP_NUM_PERM, DEDUP_INDEX_SIZE)
+DUPLICATES_SKIPPED = METRICS.counter("resume_duplicates_skipped_total", "Near-duplicate resumes that were not scored because an earlier resume in the batch was.")
+
+# Per-request fingerprinting state, so a batch fingerprinted in several windows still
+# links duplicates across them
+def new_dedup_batch() -> dict:
+    return {"id": uuid.uuid4().hex, "size": 0, "first_by_hash": {}, "representatives": {}}
+
+# Fingerprint stage: link near-duplicates to a representative resume
+def find_near_duplicates(filenames: list, extracted: list, batch: dict = None) -> list:
+    """Return, per extracted item, None or the representative it duplicates.
+
+    A representative is {"index": i} for an earlier resume in this batch, or
+    {"resume_hash", "filename"} for a resume seen in an earlier request whose
+    embedding is still cached. Pass the same ``batch`` (see new_dedup_batch) for every
+    window of a request; indices then count from the start of the request.
+    """
+    duplicates = [None] * len(extracted)
+    if DEDUP_THRESHOLD <= 0:
+        return duplicates
+    batch = batch or new_dedup_batch()
+    offset = batch["size"]
+    batch["size"] += len(extracted)
+    model_id = scoring_model_id() if embeddings_available() else None
+    with timed_stage("fingerprint"):
+        for i, (filename, item) in enumerate(zip(filenames, extracted)):
+            if item["error"] is not None or item["text"].startswith(EXTRACTION_ERROR_PREFIXES):
+                continue
+            index = offset + i
+            # Byte-identical copies in this batch always share the first copy's scoring
+            first = batch["first_by_hash"].setdefault(item["resume_hash"], index)
+            if first != index:
+                duplicates[i] = {"index": batch["representatives"].get(first, first)}
+                continue
+            signature = near_duplicate_index.signature(item["text"])
+            if signature is None:
+                continue
+            info = {"batch": batch["id"], "index": index, "filename": filename, "resume_hash": item["resume_hash"]}
+            match = near_duplicate_index.match_or_add(item["resume_hash"], signature, info)
+            if match is None:
+                continue
+            if match["batch"] == batch["id"]:
+                duplicates[i] = {"index": match["index"]}
+                batch["representatives"][index] = match["index"]
+            elif model_id and resume_cache.peek_embedding(match["resume_hash"], model_id) is not None:
+                duplicates[i] = {"resume_hash": match["resume_hash"], "filename": match["filename"]}
+    return duplicates
+
+# Let a near-duplicate of an earlier request reuse the representative's cached vector by
+# copying it under the resume's own hash, so cache writes never land on another resume's
+# key. Returns False when that vector has been evicted since fingerprinting; the resume
+# is then embedded from its own text like any other.
+def reuse_duplicate_embedding(resume_hash: str, duplicate: dict) -> bool:
+    model_id = scoring_model_id()
+    if resume_cache.peek_embedding(resume_hash, model_id) is not None:
+        return True
+    vector = resume_cache.peek_embedding(duplicate["resume_hash"], model_id)
+    if vector is None:
+        return False
+    resume_cache.put_embeddings([(resume_hash, vector)], model_id)
+    return True
+
+# Comprehensive job descriptions for each supported role
+JOB_DESCRIPTIONS = {
+    "software-engineer": """
+    We are looking for an experienced Software Engineer with strong programming skills.
+    Required skills: Python, Java, JavaScript, React, Node.js, SQL, Git, Agile methodologies.
+    Experience with cloud platforms (AWS, Azure), containerization (Docker), and CI/CD pipelines preferred.
+    Strong problem-solving skills and ability to work in a collaborative team environment.
+    Bachelor's degree in Computer Science or related field with 3+ years of experience.
+    """,
+    "data-analyst": """
+    We are seeking a skilled Data Analyst to join our analytics team.
+    Required skills: SQL, Python, R, Excel, Tableau, Power BI, statistical analysis.
+    Experience with data visualization, data mining, and business intelligence tools.
+    Knowledge of machine learning concepts and experience with pandas, numpy, matplotlib.
+    Strong analytical thinking and ability to derive insights from complex datasets.
+    Bachelor's degree in Statistics, Mathematics, or related field with 2+ years of experience.
+    """,
+    "fullstack-developer": """
+    We are hiring a Full Stack Developer to build end-to-end web applications.
+    Required skills: JavaScript, React, Node.js, Python, HTML, CSS, MongoDB, PostgreSQL.
+    Experience with RESTful APIs, Git version control, Docker, and cloud deployment.
+    Knowledge of modern frameworks, responsive design, and agile development practices.
+    Bachelor's degree in Computer Science with 2+ years of full-stack development experience.
+    """,
+    "product-manager": """
+    We are looking for a Product Manager to drive product strategy and development.
+    Required skills: Product roadmap planning, user research, market analysis, Agile/Scrum.
+    Experience with product analytics tools, A/B testing, and customer feedback analysis.
+    Strong communication skills and ability to work cross-functionally with engineering and design teams.
+    Knowledge of user experience principles and product lifecycle management.
+    MBA or Bachelor's degree with 4+ years of product management experience.
+    """
+}
+
+# Skill sets for different roles
+ROLE_SKILLS = {
+    "data-analyst": [
+        "python", "sql", "r", "excel", "tableau", "power bi", "pandas", "numpy",
+        "matplotlib", "seaborn", "statistics", "analytics", "data visualization",
+        "machine learning", "data mining", "business intelligence", "reporting",
+        "dashboard", "etl", "database", "statistical analysis"
+    ],
+    "software-engineer": [
+        "python", "java", "javascript", "react", "node.js", "sql", "git",
+        "html", "css", "docker", "kubernetes", "aws", "azure", "mongodb",
+        "postgresql", "rest api", "microservices", "agile", "scrum", "ci/cd"
+    ],
+    "fullstack-developer": [
+        "javascript", "react", "node.js", "python", "html", "css", "mongodb", 
+        "postgresql", "git", "docker", "rest api", "express", "vue", "angular",
+        "bootstrap", "responsive design", "api", "database", "frontend", "backend"
+    ],
+    "product-manager": [
+        "product management", "roadmap", "agile", "scrum", "user research",
+        "market analysis", "a/b testing", "analytics", "stakeholder management",
+        "product strategy", "user experience", "wireframing", "requirements",
+        "project management", "leadership", "communication"
+    ]
+}
+
+DEFAULT_ROLE = "software-engineer"
+
+# Common words filtered out when extracting keywords from a job description
+COMMON_WORDS = {"the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for", "of", "with", "by", "is", "are", "was", "were", "be", "been", "have", "has", "had", "will", "would", "could", "should", "may", "might", "can", "must"}
+
+# Load JD function - reads the job description from the role profile registry
+def load_jd(state: GraphState) -> GraphState:
+    job_role = state.get("job_role", DEFAULT_ROLE)
+    with timed_stage("load_jd"):
+        state["jd_text"] = get_role_profile(job_role).jd_text
+    log_sampled("Loaded job description for role: %s", job_role)
+    return state
+
+# One timed model forward pass
+def run_embedding_batch(model: EmbeddingBackend, batch: list) -> list:
+    call_start = time.perf_counter()
+    vectors = model.embed_documents(batch)
+    EMBED_SECONDS.observe(time.perf_counter() - call_start, backend=model.name)
+    EMBED_BATCH_SIZES.observe(len(batch), backend=model.name)
+    return vectors
+
+EMBED_QUEUE_SECONDS = METRICS.histogram(
+    "resume_embed_queue_wait_seconds", "Time an embedding request waits before its first batch runs.", LATENCY_BUCKETS
+)
+EMBED_REQUESTS_PER_BATCH = METRICS.histogram(
+    "resume_embed_requests_per_batch", "Caller requests merged into one embedding batch.", (1, 2, 4, 8, 16, 32, 64)
+)
+
+# Shared embedding scheduler. Concurrent callers queue their texts; a single worker
+# thread flushes a batch once it holds EMBED_BATCH_SIZE texts or the oldest request
+# has waited EMBED_MAX_WAIT_MS, runs one forward pass and resolves each caller's future.
+# Large requests are split across batches and small ones from different callers share one.
+class EmbeddingScheduler:
+    def __init__(self, max_batch: int, max_wait: float, max_depth: int):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.max_depth = max_depth
+        self._pending = deque()
+        self._pending_texts = 0
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+
+    def submit(self, texts: list) -> concurrent.futures.Future:
+        """Queue texts for embedding; the future resolves to one vector per text"""
+        future = concurrent.futures.Future()
+        if not texts:
+            future.set_result([])
+            return future
+        request = {
+            "texts": list(texts), "vectors": [None] * len(texts), "next": 0, "done": 0,
+            "future": future, "enqueued": time.perf_counter()
+        }
+        with self._cond:
+            # Backpressure: wait for the worker to drain a full queue
+            while self._pending_texts >= self.max_depth:
+                self._cond.wait()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="embedding-scheduler", daemon=True)
+                self._thread.start()
+            self._pending.append(request)
+            self._pending_texts += len(texts)
+            self._cond.notify_all()
+        return future
+
+    def embed(self, texts: list) -> list:
+        return self.submit(texts).result()
+
+    def pending(self) -> int:
+        with self._cond:
+            return self._pending_texts
+
+    def stop(self):
+        """Let the worker thread drain the queue and exit; the next submit starts a new one"""
+        with self._cond:
+            thread = self._thread
+            self._stopping = True
+            self._cond.notify_all()
+        if thread is not None:
+            thread.join()
+        with self._cond:
+            self._stopping = False
+
+    def reset(self):
+        """Drop the queue and lock inherited across fork; the worker thread is not inherited"""
+        self._pending = deque()
+        self._pending_texts = 0
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+
+    def _take_batch(self) -> Optional[list]:
+        """Block until a batch is due and return it as (request, index) pairs, or None to stop"""
+        with self._cond:
+            while not self._pending:
+                if self._stopping:
+                    return None
+                self._cond.wait()
+            deadline = self._pending[0]["enqueued"] + self.max_wait
+            while self._pending_texts < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            
+            batch = []
+            while self._pending and len(batch) < self.max_batch:
+                request = self._pending[0]
+                take = min(self.max_batch - len(batch), len(request["texts"]) - request["next"])
+                if request["next"] == 0:
+                    EMBED_QUEUE_SECONDS.observe(time.perf_counter() - request["enqueued"])
+                batch.extend((request, i) for i in range(request["next"], request["next"] + take))
+                request["next"] += take
+                if request["next"] == len(request["texts"]):
+                    self._pending.popleft()
+            self._pending_texts -= len(batch)
+            self._cond.notify_all()
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            requests = list({id(request): request for request, _ in batch}.values())
+            # Requests whose earlier part failed are already resolved
+            live = [(request, i) for request, i in batch if not request["future"].done()]
+            if not live:
+                continue
+            EMBED_REQUESTS_PER_BATCH.observe(len(requests))
+            try:
+                vectors = run_embedding_batch(get_embeddings(), [request["texts"][i] for request, i in live])
+            except Exception as e:
+                for request in requests:
+                    if not request["future"].done():
+                        request["future"].set_exception(e)
+                continue
+            for (request, i), vector in zip(live, vectors):
+                request["vectors"][i] = vector
+                request["done"] += 1
+                if request["done"] == len(request["texts"]):
+                    request["future"].set_result(request["vectors"])
+
+embedding_scheduler = EmbeddingScheduler(EMBED_BATCH_SIZE, EMBED_MAX_WAIT_MS / 1000, EMBED_QUEUE_DEPTH)
+
+@METRICS.collector
+def embedding_scheduler_metrics() -> list:
+    return [
+        "# HELP resume_embed_queue_depth Texts waiting in the embedding scheduler queue.",
+        "# TYPE resume_embed_queue_depth gauge",
+        f"resume_embed_queue_depth {embedding_scheduler.pending()}",
+        "# HELP resume_embed_queue_limit Texts the embedding scheduler queues before callers block.",
+        "# TYPE resume_embed_queue_limit gauge",
+        f"resume_embed_queue_limit {embedding_scheduler.max_depth}",
+        "# HELP resume_embed_max_wait_seconds Longest time a partial embedding batch waits for more callers.",
+        "# TYPE resume_embed_max_wait_seconds gauge",
+        f"resume_embed_max_wait_seconds {embedding_scheduler.max_wait}"
+    ]
+
+# Set while the current thread serves a profiled request, so that extraction and the
+# forward pass run on this thread where cProfile can see them
+_profiling = threading.local()
+
+def profiling_active() -> bool:
+    return getattr(_profiling, "active", False)
+
+# Embed texts with as few model forward passes as possible
+def embed_texts(texts: list, batch_size: int = None) -> np.ndarray:
+    """Embed texts in batched embed_documents calls and return one row per text.
+
+    With the scheduler enabled, batches are shared with concurrent callers and sized
+    by EMBED_BATCH_SIZE; ``batch_size`` only applies to direct calls.
+    """
+    model = get_embeddings()
+    if EMBED_SCHEDULER and not profiling_active():
+        return np.array(embedding_scheduler.embed(texts), dtype=float)
+    batch_size = batch_size or EMBED_BATCH_SIZE
+    vectors = []
+    for start in range(0, len(texts), batch_size):
+        vectors.extend(run_embedding_batch(model, texts[start:start + batch_size]))
+    return np.array(vectors, dtype=float)
+
+# Embed resumes, reusing cached embeddings for files seen before
+def embed_resumes(resume_texts: list, cache_keys: list = None, batch_size: int = None) -> np.ndarray:
+    """Return one embedding row per resume; only cache misses go through the model"""
+    cache_keys = cache_keys or [None] * len(resume_texts)
+    # Cached vectors are namespaced by backend so switching backends never mixes them
+    model_id = get_embeddings().name
+    vectors = [None] * len(resume_texts)
+    for i, key in enumerate(cache_keys):
+        if key:
+            vectors[i] = resume_cache.get_embedding(key, model_id)
+    
+    missing = [i for i, vector in enumerate(vectors) if vector is None]
+    if missing:
+        computed = embed_texts([resume_texts[i] for i in missing], batch_size)
+        for i, vector in zip(missing, computed):
+            vectors[i] = vector
+        resume_cache.put_embeddings(
+            [(cache_keys[i], vectors[i]) for i in missing if cache_keys[i]], model_id
+        )
     
+    logger.info(f"Embedded {len(missing)} of {len(resume_texts)} resumes ({len(resume_texts) - len(missing)} cached)")
+    return np.array(vectors, dtype=float) if vectors else np.zeros((0, 0))
+
+# Cache namespace of resume chunk embeddings; the chunking settings change the vectors
+def chunk_model_id(model: EmbeddingBackend) -> str:
+    return f"{model.name}:chunks:{EMBED_CHUNK_TOKENS}:{EMBED_CHUNK_OVERLAP}:{EMBED_MAX_CHUNKS}"
+
+# Cache namespace of the resume embeddings that resume_similarity_matrix scores with
+def scoring_model_id() -> str:
+    model = get_embeddings()
+    return chunk_model_id(model) if EMBED_CHUNKING else model.name
+
+# Split text into overlapping windows of at most ``window`` tokens
+def chunk_text(text: str, spans: list, window: int, overlap: int, max_chunks: int) -> list:
+    """Return up to ``max_chunks`` windows starting every ``window - overlap`` tokens"""
+    if len(spans) <= window:
+        return [text]
+    step = window - overlap
+    chunks = []
+    for start in range(0, len(spans), step):
+        end = min(start + window, len(spans))
+        chunks.append(text[spans[start][0]:spans[end - 1][1]])
+        if end == len(spans) or len(chunks) == max_chunks:
+            break
+    return chunks
+
+EMBED_CHUNKS = METRICS.histogram("resume_embed_chunks", "Chunks embedded per resume in chunking mode.", (1, 2, 4, 8, 16, 32))
+
+# Embed every chunk of every resume in shared batches, reusing cached chunk embeddings
+def embed_resume_chunks(resume_texts: list, cache_keys: list = None) -> list:
+    """Return one (chunks x dim) matrix of unit vectors per resume (flattened when read back from SQLite)"""
+    cache_keys = cache_keys or [None] * len(resume_texts)
+    model = get_embeddings()
+    model_id = chunk_model_id(model)
+    matrices = [resume_cache.get_embedding(key, model_id) if key else None for key in cache_keys]
+
+    missing = [i for i, matrix in enumerate(matrices) if matrix is None]
+    if missing:
+        chunked = [
+            chunk_text(resume_texts[i], model.token_spans(resume_texts[i]),
+                       EMBED_CHUNK_TOKENS, EMBED_CHUNK_OVERLAP, EMBED_MAX_CHUNKS)
+            for i in missing
+        ]
+        vectors = embed_texts([chunk for chunks in chunked for chunk in chunks])
+        vectors /= np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        offset = 0
+        for i, chunks in zip(missing, chunked):
+            matrices[i] = vectors[offset:offset + len(chunks)]
+            offset += len(chunks)
+            EMBED_CHUNKS.observe(len(chunks))
+        resume_cache.put_embeddings(
+            [(cache_keys[i], matrices[i]) for i in missing if cache_keys[i]], model_id
+        )
+    return matrices
+
+# Pool per-chunk cosine similarities into one similarity per resume and JD
+def pooled_chunk_similarities(chunk_matrices: list, jd_matrix: np.ndarray) -> np.ndarray:
+    """Return a resumes x JDs matrix, all chunks scored in one matrix product"""
+    if not chunk_matrices:
+        return np.zeros((0, len(jd_matrix)))
+    matrices = [np.asarray(matrix, dtype=float).reshape(-1, jd_matrix.shape[1]) for matrix in chunk_matrices]
+    counts = np.array([len(matrix) for matrix in matrices])
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    similarities = compute_similarity_matrix(np.vstack(matrices), jd_matrix)
+    if EMBED_CHUNK_POOLING == "mean":
+        return np.add.reduceat(similarities, offsets, axis=0) / counts[:, None]
+    return np.maximum.reduceat(similarities, offsets, axis=0)
+
+# Similarity of each resume against each JD vector, whole-resume or chunked
+def resume_similarity_matrix(resume_texts: list, cache_keys: list, jd_matrix: np.ndarray) -> np.ndarray:
+    if EMBED_CHUNKING:
+        return pooled_chunk_similarities(embed_resume_chunks(resume_texts, cache_keys), jd_matrix)
+    return compute_similarity_matrix(embed_resumes(resume_texts, cache_keys), jd_matrix)
+
+# Cosine similarity of every resume against one JD as a single matrix-vector product
+def compute_similarities(resume_matrix: np.ndarray, jd_vector: np.ndarray) -> np.ndarray:
+    """Return the cosine similarity of each resume row with the JD vector (0 for zero vectors)"""
+    similarities = np.zeros(len(resume_matrix))
+    jd_norm = np.linalg.norm(jd_vector)
+    if len(resume_matrix) == 0 or jd_norm == 0:
+        return similarities
+    resume_norms = np.linalg.norm(resume_matrix, axis=1)
+    valid = resume_norms > 0
+    similarities[valid] = (resume_matrix[valid] @ jd_vector) / (resume_norms[valid] * jd_norm)
+    return similarities
+
+# Compiled multi-term matcher. All terms are folded into one trie-shaped regex with
+# word boundaries, so a single pass over the text finds every term and each position
+# only walks the trie (cost independent of the number of terms).
+class TermMatcher:
+    def __init__(self, terms):
+        self.terms = list(dict.fromkeys(term.lower() for term in terms if term))
+        self.pattern = None
+        if self.terms:
+            trie = {}
+            for term in self.terms:
+                node = trie
+                for ch in term:
+                    node = node.setdefault(ch, {})
+                node[""] = True
+            # Lookahead match so terms starting inside another term (e.g. "api" in "rest api") are found too
+            self.pattern = re.compile(r"(?<!\w)(?=(" + self._trie_regex(trie) + r")(?!\w))")
+        # Terms that are a word-bounded prefix of a longer term share its start position
+        self._prefixes = {
+            term: [other for other in self.terms
+                   if other != term and term.startswith(other) and not term[len(other)].isalnum() and term[len(other)] != "_"]
+            for term in self.terms
+        }
+
+    @classmethod
+    def _trie_regex(cls, node: dict) -> str:
+        branches = [re.escape(ch) + cls._trie_regex(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Greedy optional group: the longest term wins, backtracking to shorter ones at word boundaries
+        return "(?:" + pattern + ")?" if "" in node else pattern
+
+    def find(self, text_lower: str) -> dict:
+        """Map each term found in lower-cased text to the list of its start positions"""
+        positions = {}
+        if self.pattern is None:
+            return positions
+        for match in self.pattern.finditer(text_lower):
+            start = match.start()
+            term = match.group(1)
+            positions.setdefault(term, []).append(start)
+            for prefix in self._prefixes[term]:
+                positions.setdefault(prefix, []).append(start)
+        return positions
+
+    def counts(self, text_lower: str) -> dict:
+        return {term: len(starts) for term, starts in self.find(text_lower).items()}
+
+# Matchers are cached per term list; role profiles build theirs when the registry is (re)built
+@functools.lru_cache(maxsize=64)
+def compile_term_matcher(terms: tuple) -> TermMatcher:
+    return TermMatcher(terms)
+
+# Per-role data derived once from the job description and skill list
+@dataclass
+class RoleProfile:
+    role: str
+    jd_text: str
+    jd_vector: Optional[np.ndarray]  # L2-normalized JD embedding, None without embeddings
+    keywords: list  # deduplicated JD keywords used for keyword scoring
+    skills: list
+    term_matcher: TermMatcher  # finds skills and keywords in one pass
+    jd_version: str  # content hashes that tell stored features which components are stale
+    skills_version: str
+
+def content_version(*parts) -> str:
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()[:16]
+
+# Extract the deduplicated keyword list used for keyword scoring from a JD
+def extract_jd_keywords(jd_text: str) -> list:
+    jd_keywords = []
+    for word in jd_text.lower().split():
+        cleaned_word = re.sub(r'[^\w]', '', word)
+        if len(cleaned_word) > 3 and cleaned_word not in COMMON_WORDS:
+            jd_keywords.append(cleaned_word)
+    
+    # Remove duplicates (keeping first occurrence) and get top keywords
+    return list(dict.fromkeys(jd_keywords))[:20]  # Top 20 keywords
+
+# Cosine similarity of every resume against every JD as a single matrix product
+def compute_similarity_matrix(resume_matrix: np.ndarray, jd_matrix: np.ndarray) -> np.ndarray:
+    """Return a resumes x JDs cosine similarity matrix (0 where either vector is zero)"""
+    if len(resume_matrix) == 0 or len(jd_matrix) == 0:
+        return np.zeros((len(resume_matrix), len(jd_matrix)))
+    resume_norms = np.linalg.norm(resume_matrix, axis=1, keepdims=True)
+    jd_norms = np.linalg.norm(jd_matrix, axis=1, keepdims=True)
+    resume_unit = np.divide(resume_matrix, resume_norms, out=np.zeros_like(resume_matrix), where=resume_norms > 0)
+    jd_unit = np.divide(jd_matrix, jd_norms, out=np.zeros_like(jd_matrix), where=jd_norms > 0)
+    return resume_unit @ jd_unit.T
+
+# Normalize a vector to unit length, leaving zero vectors untouched
+def normalize_vector(vector: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+# Build role profiles, embedding all job descriptions in one batch
+def build_role_profiles(role_jds: dict, role_skills: dict) -> dict:
+    jd_vectors = [None] * len(role_jds)
+    if role_jds and embeddings_available():
+        try:
+            jd_vectors = [normalize_vector(v) for v in embed_texts(list(role_jds.values()))]
+        except Exception as e:
+            logger.error(f"Error embedding job descriptions: {e}")
+    
+    profiles = {}
+    for (role, jd_text), jd_vector in zip(role_jds.items(), jd_vectors):
+        keywords = extract_jd_keywords(jd_text)
+        skills = list(role_skills.get(role) or role_skills.get(DEFAULT_ROLE, {}))
+        profiles[role] = RoleProfile(
+            role=role,
+            jd_text=jd_text,
+            jd_vector=jd_vector,
+            keywords=keywords,
+            skills=skills,
+            term_matcher=TermMatcher(skills + keywords),
+            jd_version=content_version(jd_text),
+            skills_version=content_version(*skills)
+        )
+    return profiles
+
+# Role profile registry - built lazily on first use, rebuilt only by reload_role_profiles
+_role_profiles = None
+_role_profiles_lock = threading.RLock()
+
+def reload_role_profiles() -> dict:
+    """(Re)build every role profile and swap the registry"""
+    global _role_profiles
+    with _role_profiles_lock, startup_phase("role_profiles"):
+        # Roles edited through /api/roles survive restarts in the feature store
+        if feature_store is not None:
+            for role, (jd_text, skills) in feature_store.role_overrides().items():
+                JOB_DESCRIPTIONS[role] = jd_text
+                ROLE_SKILLS[role] = skills
+        _role_profiles = build_role_profiles(JOB_DESCRIPTIONS, ROLE_SKILLS)
+        logger.info(f"Built role profiles for: {', '.join(_role_profiles)}")
+        return _role_profiles
+
+def get_role_profiles() -> dict:
+    if _role_profiles is None:
+        with _role_profiles_lock:
+            if _role_profiles is None:
+                reload_role_profiles()
+    return _role_profiles
+
+def update_role_profile(role: str, jd_text: str, skills: list) -> RoleProfile:
+    """Replace one role's JD and skills; the JD is only re-embedded when its text changed"""
+    global _role_profiles
+    with _role_profiles_lock:
+        current = get_role_profiles().get(role)
+        if current is not None and current.jd_text == jd_text:
+            profile = dataclasses.replace(
+                current,
+                skills=list(skills),
+                term_matcher=TermMatcher(list(skills) + current.keywords),
+                skills_version=content_version(*skills)
+            )
+        else:
+            profile = build_role_profiles({role: jd_text}, {role: skills})[role]
+        JOB_DESCRIPTIONS[role] = jd_text
+        ROLE_SKILLS[role] = list(skills)
+        _role_profiles = dict(_role_profiles, **{role: profile})
+        return profile
+
+# Apply role edits saved by other pre-fork workers; returns the roles that changed
+_role_overrides_version = None
+
+def sync_role_overrides() -> list:
+    global _role_overrides_version
+    version = feature_store.role_overrides_version()
+    if version == _role_overrides_version:
+        return []
+    changed = []
+    with _role_profiles_lock:
+        profiles = get_role_profiles()
+        for role, (jd_text, skills) in feature_store.role_overrides().items():
+            current = profiles.get(role)
+            if current is None or (current.jd_text, current.skills) != (jd_text, skills):
+                update_role_profile(role, jd_text, skills)
+                changed.append(role)
+        _role_overrides_version = version
+    if changed:
+        logger.info(f"Applied role edits from the feature store: {', '.join(changed)}")
+    return changed
+
+def get_role_profile(job_role: str) -> RoleProfile:
+    """Return the profile for a role, falling back to the default role"""
+    profiles = get_role_profiles()
+    return profiles.get(job_role, profiles[DEFAULT_ROLE])
+
+# Resolve the profile to score against, deriving an ad hoc one for custom JD text
+def resolve_role_profile(jd_text: str, job_role: str) -> RoleProfile:
+    profile = get_role_profile(job_role)
+    if jd_text != profile.jd_text:
+        profile = build_role_profiles({profile.role: jd_text}, {profile.role: profile.skills})[profile.role]
+    return profile
+
+# Words that indicate experience when no explicit number of years is given
+EXPERIENCE_KEYWORDS = [
+    "years", "year", "experience", "experienced", "exp", "months", "month",
+    "internship", "intern", "work", "worked", "employment", "job", "position"
+]
+
+# Patterns for extracting years of experience
+YEAR_PATTERNS = [
+    re.compile(pattern) for pattern in (
+        r'(\d+)\s*\+?\s*years?\s+(?:of\s+)?experience',
+        r'(\d+)\s*years?\s+experience',
+        r'experience\s*:?\s*(\d+)\s*years?',
+        r'(\d+)\s*years?\s+in',
+        r'(\d+)\s*yr\s+',
+        r'(\d+)\s*-\s*(\d+)\s*years?'
+    )
+]
+
+# Extract years of experience and the experience score from lower-cased resume text
+def extract_experience(resume_lower: str) -> tuple:
+    years_found = []
+    for pattern in YEAR_PATTERNS:
+        for match in pattern.findall(resume_lower):
+            if isinstance(match, tuple):
+                years_found.extend([int(x) for x in match if x.isdigit()])
+            elif match.isdigit():
+                years_found.append(int(match))
+    
+    if years_found:
+        years_experience = max(years_found)
+        # Score based on experience (0-100 scale, assuming 10+ years = 100)
+        experience_score = min(100, (years_experience / 10) * 100)
+    else:
+        # Check for experience indicators without explicit years
+        exp_indicators = sum(1 for keyword in EXPERIENCE_KEYWORDS if keyword in resume_lower)
+        experience_score = min(100, exp_indicators * 10)
+        years_experience = max(1, exp_indicators // 2)  # Rough estimate
+    
+    return int(years_experience), int(round(experience_score))
+
+# Enhanced scoring function with detailed breakdown
+def compute_detailed_scores(resume_text: str, jd_text: str, job_role: str = "software-engineer", similarity: float = None) -> dict:
+    """Compute detailed scoring breakdown for resume analysis.
+
+    A precomputed cosine ``similarity`` (from the batch path) skips the embedding step.
+    """
+    return score_against_profile(resume_text, resolve_role_profile(jd_text, job_role), similarity)
+
+# Score one resume against a role profile
+def score_against_profile(resume_text: str, profile: RoleProfile, similarity: float = None) -> dict:
+    # Initialize scores
+    scores = {
+        "overall_score": 0.0,
+        "experience_score": 0,
+        "skills_score": 0,
+        "keywords_score": 0,
+        "job_match": 0.0,
+        "years_experience": 0,
+        "identified_skills": [],
+        "resume_summary": resume_text[:200] + "..." if len(resume_text) > 200 else resume_text
+    }
+    
+    try:
+        # 1. SEMANTIC SIMILARITY (Overall Score)
+        if similarity is None and profile.jd_vector is not None and embeddings_available():
+            log_sampled("Computing semantic similarity...")
+            similarity = resume_similarity_matrix([resume_text], None, profile.jd_vector[None, :])[0, 0]
+            log_sampled("Computed similarity: %.6f", similarity)
+        elif similarity is None:
+            logger.warning("Embeddings not available - using fallback scoring")
+        
+        if similarity is not None and np.isfinite(similarity):
+            scores["overall_score"] = max(0.0, float(similarity) * 100)
+            scores["job_match"] = max(0.0, float(similarity) * 100)
+            log_sampled("Final overall score: %.2f", scores["overall_score"])
+        
+        # 2. EXPERIENCE EXTRACTION AND SCORING
+        resume_lower = resume_text.lower()
+        scores["years_experience"], scores["experience_score"] = extract_experience(resume_lower)
+        
+        # 3. SKILLS SCORING
+        # Get skills for the specific role
+        relevant_skills = profile.skills
+        
+        # Find every skill and JD keyword in one pass over the resume
+        term_positions = profile.term_matcher.find(resume_lower)
+        scores["term_positions"] = term_positions
+        scores["scanned_terms"] = profile.term_matcher.terms
+        
+        # Count skills found in resume
+        found_skills = [skill for skill in relevant_skills if skill.lower() in term_positions]
+        
+        scores["identified_skills"] = found_skills
+        # Skills score: percentage of required skills found
+        scores["skills_score"] = min(100, int((len(found_skills) / len(relevant_skills)) * 100))
+        
+        # 4. KEYWORDS SCORING
+        # Count matches of the JD keywords precomputed in the role profile
+        jd_keywords = profile.keywords
+        keyword_matches = sum(1 for keyword in jd_keywords if keyword in term_positions)
+        scores["keywords_score"] = min(100, int((keyword_matches / len(jd_keywords)) * 100)) if jd_keywords else 0
+        
+        log_sampled("Detailed scores: %s", scores)
+        
+        return scores
+        
+    except Exception as e:
+        logger.error(f"Error computing detailed scores: {e}")
+        import traceback
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return scores
+
+# Batch scoring: embed every resume in shared forward passes, then score each one
+def compute_batch_scores(resume_texts: list, jd_text: str, job_role: str = "software-engineer", batch_size: int = None, cache_keys: list = None) -> list:
+    """Compute detailed scores for many resumes against the same job description.
+
+    ``cache_keys`` (file hashes, aligned with ``resume_texts``) let repeated files skip the model.
+    """
+    profile = resolve_role_profile(jd_text, job_role)
+    similarities = [None] * len(resume_texts)
+    if resume_texts and profile.jd_vector is not None and embeddings_available():
+        try:
+            if EMBED_CHUNKING:
+                similarities = resume_similarity_matrix(resume_texts, cache_keys, profile.jd_vector[None, :])[:, 0]
+            else:
+                resume_matrix = embed_resumes(resume_texts, cache_keys, batch_size)
+                similarities = compute_similarities(resume_matrix, profile.jd_vector)
+        except Exception as e:
+            logger.error(f"Batch embedding error: {e}")
+    
+    return [
+        score_against_profile(resume_text, profile, similarity)
+        for resume_text, similarity in zip(resume_texts, similarities)
+    ]
+
+# Simple wrapper for chain compatibility
+def simple_compute_score(input_data):
+    """Simple wrapper for chain compatibility"""
+    resume_text = input_data.get("resume", "")
+    jd_text = input_data.get("jd", "")
+    detailed = compute_detailed_scores(resume_text, jd_text)
+    return {"score": detailed["overall_score"]}
+
+# Build the chain (langchain is imported on first use)
+_chain = None
+
+def get_chain():
+    global _chain
+    if _chain is None:
+        from langchain_core.runnables import RunnableLambda
+        from operator import itemgetter
+        _chain = (
+            {"resume": itemgetter("resume"), "jd": itemgetter("jd")}
+            | RunnableLambda(simple_compute_score)
+        )
+    return _chain
+
+# Semantic match node - now with detailed scoring
+def semantic_match(state: GraphState) -> GraphState:
+    try:
+        resume_text = state["resume_text"]
+        jd_text = state["jd_text"]
+        job_role = state.get("job_role", "software-engineer")
+        
+        log_sampled("Computing detailed scores for resume length: %d, JD length: %d", len(resume_text), len(jd_text))
+        
+        # Compute detailed scores
+        with timed_stage("semantic_match"):
+            detailed_scores = compute_detailed_scores(resume_text, jd_text, job_role)
+        
+        # Set the main score for backward compatibility
+        state["score"] = detailed_scores["overall_score"]
+        
+        # Store detailed scores in state
+        state["detailed_scores"] = detailed_scores
+        
+        # Get filename safely
+        filename = "unknown"
+        try:
+            if hasattr(state.get("resume_file"), "filename"):
+                filename = state["resume_file"].filename
+        except:
+            pass
+            
+        log_sampled(
+            "Final detailed scores for %s: Overall=%.2f, Experience=%s, Skills=%s, Keywords=%s", filename,
+            detailed_scores["overall_score"], detailed_scores["experience_score"],
+            detailed_scores["skills_score"], detailed_scores["keywords_score"]
+        )
+        
+    except Exception as e:
+        logger.error(f"Semantic matching error: {str(e)}")
+        import traceback
+        logger.error(f"Semantic matching traceback: {traceback.format_exc()}")
+        state["score"] = 0.0
+        state["detailed_scores"] = empty_detailed_scores("Error processing resume")
+        
+    return state
+
+# Batch semantic match - scores already parsed states with shared embedding batches
+def semantic_match_batch(states: list) -> list:
+    """Score parsed states in place, embedding all resumes for the same JD together"""
+    groups = {}
+    for state in states:
+        key = (state["jd_text"], state.get("job_role", "software-engineer"))
+        groups.setdefault(key, []).append(state)
+    
+    for (jd_text, job_role), group in groups.items():
+        try:
+            with timed_stage("semantic_match_batch"):
+                batch_scores = compute_batch_scores(
+                    [s["resume_text"] for s in group], jd_text, job_role,
+                    cache_keys=[s.get("resume_hash") for s in group]
+                )
+        except Exception as e:
+            logger.error(f"Batch semantic matching error: {str(e)}")
+            batch_scores = [empty_detailed_scores("Error processing resume") for _ in group]
+        
+        for state, detailed_scores in zip(group, batch_scores):
+            state["score"] = detailed_scores["overall_score"]
+            state["detailed_scores"] = detailed_scores
+    
+    logger.info(f"Batch scored {len(states)} resumes")
+    return states
+
+# Multi-role scoring - embed each resume once and score it against every selected role
+def semantic_match_multi_role(states: list, roles: list) -> list:
+    """Score parsed states in place against all roles.
+
+    Each state gets the scores of its best-fit role plus ``role_scores`` for every role.
+    """
+    profiles = [get_role_profile(role) for role in roles]
+    texts = [s["resume_text"] for s in states]
+    similarity_matrix = None
+    if texts and embeddings_available() and all(p.jd_vector is not None for p in profiles):
+        try:
+            with timed_stage("semantic_match_multi_role"):
+                similarity_matrix = resume_similarity_matrix(
+                    texts, [s.get("resume_hash") for s in states], np.stack([p.jd_vector for p in profiles])
+                )
+        except Exception as e:
+            logger.error(f"Multi-role embedding error: {e}")
+    
+    for i, state in enumerate(states):
+        role_scores = {}
+        for j, profile in enumerate(profiles):
+            similarity = similarity_matrix[i, j] if similarity_matrix is not None else None
+            role_scores[profile.role] = score_against_profile(state["resume_text"], profile, similarity)
+        best_role = max(role_scores, key=lambda role: (
+            role_scores[role]["overall_score"], role_scores[role]["skills_score"], role_scores[role]["keywords_score"]
+        ))
+        state["job_role"] = best_role
+        state["score"] = role_scores[best_role]["overall_score"]
+        state["detailed_scores"] = role_scores[best_role]
+        state["role_scores"] = role_scores
+    
+    logger.info(f"Scored {len(states)} resumes against {len(roles)} roles")
+    return states
+
+# Default (zero) detailed scores used when a resume cannot be scored
+def empty_detailed_scores(resume_summary: str) -> dict:
+    return {
+        "overall_score": 0.0,
+        "experience_score": 0,
+        "skills_score": 0,
+        "keywords_score": 0,
+        "job_match": 0.0,
+        "years_experience": 0,
+        "identified_skills": [],
+        "resume_summary": resume_summary
+    }
+
+# Build and compile the graphs with StateGraph on first use
+_graphs = {}
+_graphs_lock = threading.Lock()
+
+def _compile_graphs():
+    from langgraph.graph import StateGraph, END
+    
+    graph = StateGraph(GraphState)
+    graph.add_node("parse_resume", parse_resume)
+    graph.add_node("load_jd", load_jd)
+    graph.add_node("semantic_match", semantic_match)
+    graph.set_entry_point("parse_resume")
+    graph.add_edge("parse_resume", "load_jd")
+    graph.add_edge("load_jd", "semantic_match")
+    graph.add_edge("semantic_match", END)
+    
+    # Preparation graph for the batch path - scoring runs afterwards via semantic_match_batch
+    prepare_graph = StateGraph(GraphState)
+    prepare_graph.add_node("parse_resume", parse_resume)
+    prepare_graph.add_node("load_jd", load_jd)
+    prepare_graph.set_entry_point("parse_resume")
+    prepare_graph.add_edge("parse_resume", "load_jd")
+    prepare_graph.add_edge("load_jd", END)
+    
+    return {"app": graph.compile(), "prepare": prepare_graph.compile()}
+
+def _get_graph(name: str):
+    if not _graphs:
+        with _graphs_lock:
+            if not _graphs:
+                with startup_phase("graphs"):
+                    _graphs.update(_compile_graphs())
+    return _graphs[name]
+
+def get_app_graph():
+    return _get_graph("app")
+
+def get_prepare_graph():
+    return _get_graph("prepare")
+
+# Lazily created module attributes kept for code that imports them from app
+def __getattr__(name):
+    if name == "app_graph":
+        return get_app_graph()
+    if name == "app_prepare_graph":
+        return get_prepare_graph()
+    if name == "chain":
+        return get_chain()
+    if name == "embeddings":
+        return get_embeddings()
+    if name == "EMBEDDINGS_AVAILABLE":
+        return embeddings_available()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Build the API result for a scored state
+def build_result(filename: str, final_state: dict) -> dict:
+    score = final_state.get("score", 0.0)
+    resume_text = final_state.get("resume_text", "")
+    detailed_scores = final_state.get("detailed_scores", {})
+    
+    log_sampled("Final state for %s: score=%s, text_length=%d", filename, score, len(resume_text))
+    
+    # Ensure score is valid
+    if not isinstance(score, (int, float)) or np.isnan(score) or np.isinf(score):
+        logger.warning(f"Invalid final score for {filename}: {score}")
+        score = 0.0
+    
+    # Prepare enhanced result with detailed breakdown
+    return {
+        "Resume": filename,
+        "Score": round(float(score), 2),
+        "Text": (resume_text[:200] + "...") if len(resume_text) > 200 else resume_text,
+        "Status": "Success" if resume_text and resume_text != "Error parsing file" else "Error",
+        
+        # Detailed scoring breakdown for frontend
+        "ExperienceScore": detailed_scores.get("experience_score", 0),
+        "SkillsScore": detailed_scores.get("skills_score", 0),
+        "KeywordsScore": detailed_scores.get("keywords_score", 0),
+        "JobMatch": round(detailed_scores.get("job_match", 0.0), 1),
+        "YearsExperience": detailed_scores.get("years_experience", 0),
+        "IdentifiedSkills": detailed_scores.get("identified_skills", []),
+        "ResumeSummary": detailed_scores.get("resume_summary", resume_text[:200] + "..." if resume_text else "")
+    }
+
+# Best-fit role and the per-role score breakdown for multi-role results
+def build_role_fields(final_state: dict) -> dict:
+    return {
+        "BestRole": final_state.get("job_role"),
+        "RoleScores": {
+            role: {
+                "Score": round(float(scores["overall_score"]), 2),
+                "ExperienceScore": scores["experience_score"],
+                "SkillsScore": scores["skills_score"],
+                "KeywordsScore": scores["keywords_score"],
+                "IdentifiedSkills": scores["identified_skills"]
+            }
+            for role, scores in final_state.get("role_scores", {}).items()
+        }
+    }
+
+# Build the API result for a file that could not be processed
+def build_error_result(filename: str, error: str = None) -> dict:
+    return {
+        "Resume": filename,
+        "Score": 0.0,
+        "Text": error or "Error processing file",
+        "Status": "Error",
+        "ExperienceScore": 0,
+        "SkillsScore": 0,
+        "KeywordsScore": 0,
+        "JobMatch": 0.0,
+        "YearsExperience": 0,
+        "IdentifiedSkills": [],
+        "ResumeSummary": error or "Error processing file"
+    }
+
+# Build the API result for a resume the lexical prefilter did not shortlist
+def build_filtered_result(filename: str, lexical_score: float) -> dict:
+    return dict(
+        build_error_result(filename, "Not shortlisted by the lexical prefilter"),
+        Status="Filtered", LexicalScore=round(lexical_score, 3)
+    )
+
+# Run the extract -> load JD -> batch score pipeline over a group of uploads
+def process_uploads(files: list, job_role, progress=None, shortlist: int = 0) -> list:
+    """Return one API result per file, in upload order.
+
+    ``job_role`` may be a list of roles (see parse_roles); each result then carries
+    its BestRole and per-role RoleScores.
+    ``progress(stage, count)`` is called after the "parsed", "embedded" and "scored" stages.
+    With ``shortlist`` set, only the lexical top-``shortlist`` resumes per role are embedded
+    and scored; the others are returned with Status "Filtered".
+    Files go through in windows of SCORE_WINDOW, so only one window of resume texts is
+    held at a time. A shortlist ranks the whole batch, which is then a single window.
+    """
+    roles = job_role if isinstance(job_role, list) else None
+    if roles:
+        job_role = roles[0]
+    
+    # Every resume in the batch is scored against the same JD, so load it once
+    with timed_stage("load_jd"):
+        jd_text = get_role_profile(job_role).jd_text
+    
+    dedup_batch = new_dedup_batch()
+    window = max(1, len(files)) if shortlist else SCORE_WINDOW
+    results = []
+    for start in range(0, len(files), window):
+        process_upload_window(
+            files[start:start + window], job_role, roles, jd_text, shortlist, dedup_batch, results, progress
+        )
+    return results
+
+# One window of process_uploads: extract, fingerprint, shortlist, embed and score its files
+def process_upload_window(files: list, job_role: str, roles: Optional[list], jd_text: str, shortlist: int,
+                          dedup_batch: dict, results: list, progress=None):
+    """Append one result per file to ``results``, which holds the earlier windows' results"""
+    # Extract every file first (in worker processes) so that all resumes can be embedded together
+    extracted = extract_documents(files)
+    # Near-duplicates of an earlier resume in the batch are not scored at all; those of a
+    # previously seen resume are scored with its cached embedding (see reuse_duplicate_embedding)
+    duplicates = find_near_duplicates([file.filename for file in files], extracted, dedup_batch)
+    kept, dropped = shortlist_batch(extracted, duplicates, roles or [job_role], shortlist)
+    if progress:
+        progress("parsed", len(files))
+    
+    prepared = []
+    for i, (file, item) in enumerate(zip(files, extracted)):
+        try:
+            log_sampled("Processing file %d/%d: %s", i + 1, len(files), file.filename)
+            
+            if item["error"] is not None or (duplicates[i] and "index" in duplicates[i]) or i in dropped:
+                prepared.append((file, None, item["error"]))
+                continue
+            
+            if duplicates[i] and not reuse_duplicate_embedding(item["resume_hash"], duplicates[i]):
+                duplicates[i] = None
+            
+            # Create initial state with the extracted text and the batch's JD
+            state = GraphState(
+                resume_text=item["text"], 
+                jd_text=jd_text, 
+                score=0.0, 
+                resume_file=file, 
+                job_role=job_role,
+                detailed_scores={},
+                resume_hash=item["resume_hash"]
+            )
+            prepared.append((file, state, None))
+            
+        except Exception as file_error:
+            logger.error(f"Error processing {file.filename}: {str(file_error)}")
+            prepared.append((file, None, None))
+    
+    # Embed and score all parsed resumes in shared batches
+    if roles:
+        semantic_match_multi_role([state for _, state, _ in prepared if state is not None], roles)
+    else:
+        semantic_match_batch([state for _, state, _ in prepared if state is not None])
+    try:
+        store_features(files, extracted, [scored_features(state) for _, state, _ in prepared])
+    except Exception as e:
+        logger.error(f"Could not store resume features: {e}")
+    if progress:
+        progress("embedded", len(files))
+    
+    for i, (file, final_state, error) in enumerate(prepared):
+        try:
+            duplicate = duplicates[i]
+            if duplicate and "index" in duplicate:
+                # Representatives always come first, so their result already exists
+                representative = results[duplicate["index"]]
+                results.append(dict(representative, Resume=file.filename, DuplicateOf=representative["Resume"]))
+                DUPLICATES_SKIPPED.inc()
+                continue
+            if i in dropped:
+                results.append(build_filtered_result(file.filename, dropped[i]))
+                continue
+            if final_state is None:
+                results.append(build_error_result(file.filename, error))
+                continue
+            result = build_result(file.filename, final_state)
+            if roles:
+                result.update(build_role_fields(final_state))
+            if i in kept:
+                result["LexicalScore"] = round(kept[i], 3)
+            if duplicate:
+                # Scored, so not counted as skipped; DuplicateOf marks results copied from another resume
+                result["NearDuplicateOf"] = duplicate["filename"]
+            results.append(result)
+            log_sampled("Processed %s with score: %s", file.filename, result["Score"])
+        except Exception as file_error:
+            logger.error(f"Error processing {file.filename}: {str(file_error)}")
+            results.append(build_error_result(file.filename))
+    if progress:
+        progress("scored", len(files))
+
+# Multi-role selection: role=* for every role, or a comma-separated or repeated role field
+def parse_roles(role_values: list) -> Optional[list]:
+    """Return the roles to score against, or None for an ordinary single-role request"""
+    if role_values == ["*"]:
+        return list(get_role_profiles())
+    if len(role_values) == 1 and "," not in role_values[0]:
+        return None
+    roles = [role.strip() for value in role_values for role in value.split(",") if role.strip()]
+    return list(dict.fromkeys(roles))
+
+# Tracks the resumes and upload bytes being worked on across all requests. A request
+# that would push either total over its limit is refused, except when nothing else
+# holds that resource, so a single oversized upload is not turned away forever.
+class AdmissionController:
+    def __init__(self, max_resumes: int, max_bytes: int):
+        self.max_resumes = max_resumes
+        self.max_bytes = max_bytes
+        self.resumes = 0
+        self.bytes = 0
+        self.rejected = {"resumes": 0, "bytes": 0, "embedding_queue": 0}
+        self._lock = threading.Lock()
+
+    def admit(self, resumes: int = 0, nbytes: int = 0) -> Optional[str]:
+        """Reserve the work and return None, or return the name of the exhausted limit"""
+        with self._lock:
+            if self.max_resumes and self.resumes and self.resumes + resumes > self.max_resumes:
+                reason = "resumes"
+            elif self.max_bytes and self.bytes and self.bytes + nbytes > self.max_bytes:
+                reason = "bytes"
+            else:
+                self.resumes += resumes
+                self.bytes += nbytes
+                return None
+            self.rejected[reason] += 1
+            return reason
+
+    def release(self, resumes: int, nbytes: int):
+        with self._lock:
+            self.resumes -= resumes
+            self.bytes -= nbytes
+
+    def count_rejection(self, reason: str):
+        with self._lock:
+            self.rejected[reason] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "resumes": self.resumes, "max_resumes": self.max_resumes,
+                "bytes": self.bytes, "max_bytes": self.max_bytes,
+                "rejected": dict(self.rejected)
+            }
+
+admission = AdmissionController(ADMISSION_MAX_RESUMES, ADMISSION_MAX_BYTES)
+
+@METRICS.collector
+def admission_metrics() -> list:
+    stats = admission.stats()
+    return [
+        "# HELP resume_inflight_resumes Resumes admitted and not yet finished.",
+        "# TYPE resume_inflight_resumes gauge",
+        f"resume_inflight_resumes {stats['resumes']}",
+        "# HELP resume_inflight_bytes Upload bytes admitted and not yet finished.",
+        "# TYPE resume_inflight_bytes gauge",
+        f"resume_inflight_bytes {stats['bytes']}",
+        "# HELP resume_requests_rejected_total Upload requests shed by admission control, by exhausted limit.",
+        "# TYPE resume_requests_rejected_total counter"
+    ] + [f'resume_requests_rejected_total{{reason="{reason}"}} {count}' for reason, count in stats["rejected"].items()]
+
+def overloaded_response(message: str, status: int):
+    response = jsonify({"error": message})
+    response.headers["Retry-After"] = str(ADMISSION_RETRY_AFTER)
+    return response, status
+
+# Shed upload requests from the Content-Length header, before the multipart body is read
+@app.before_request
+def admit_request():
+    if request.method != "POST" or request.endpoint not in ADMISSION_ENDPOINTS:
+        return None
+    if EMBED_SCHEDULER and embedding_scheduler.pending() >= EMBED_QUEUE_DEPTH:
+        admission.count_rejection("embedding_queue")
+        return overloaded_response("Embedding queue is full, please retry later", 503)
+    
+    nbytes = request.content_length or 0
+    if admission.admit(nbytes=nbytes):
+        return overloaded_response("Too many uploads in progress, please retry later", 429)
+    g.admission = [0, nbytes]
+    return None
+
+# Reserve the resumes of an admitted request once the uploads are known,
+# returning an error response when over the limit
+def admit_resumes(count: int):
+    if admission.admit(resumes=count):
+        return overloaded_response("Too many resumes in progress, please retry later", 429)
+    g.setdefault("admission", [0, 0])[0] += count
+    return None
+
+# Release the request's reservation (streamed responses take theirs over until the stream closes)
+@app.teardown_request
+def release_admission(exc):
+    reservation = g.pop("admission", None)
+    if reservation:
+        admission.release(*reservation)
+
+# Validate an upload request, returning (files, job_role, error_response).
+# For multi-role requests job_role is the list of roles. ZIP uploads are expanded
+# into their members unless ``expand`` is False.
+def validate_filter_request(expand: bool = True):
+    if 'resumes' not in request.files:
+        return None, None, (jsonify({"error": "No resumes uploaded"}), 400)
+    
+    if 'role' not in request.form:
+        return None, None, (jsonify({"error": "No role specified"}), 400)
+
+    files = request.files.getlist('resumes')
+    job_role = request.form['role']
+    
+    if not files or all(f.filename == '' for f in files):
+        return None, None, (jsonify({"error": "No files selected"}), 400)
+    
+    roles = parse_roles(request.form.getlist('role'))
+    if roles is not None:
+        unknown = [role for role in roles if role not in get_role_profiles()]
+        if unknown or not roles:
+            return None, None, (jsonify({"error": f"Unknown roles: {', '.join(unknown) or 'none given'}"}), 400)
+        job_role = roles
+    
+    if expand:
+        try:
+            files = expand_uploads(files)
+        except ValueError as e:
+            return None, None, (jsonify({"error": str(e)}), 400)
+    
+    return files, job_role, None
+
+# Bounded in-memory store of finished result lists, so clients can page through a
+# large batch instead of receiving every result in one response. Sets are dropped
+# oldest first once there are more than max_sets or they are older than ttl seconds.
+class ResultStore:
+    RESULT_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+    def __init__(self, max_sets: int, ttl: float):
+        self.max_sets = max_sets
+        self.ttl = ttl
+        self._sets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float):
+        while self._sets:
+            oldest = next(iter(self._sets.values()))
+            if len(self._sets) <= self.max_sets and now - oldest["created_at"] < self.ttl:
+                break
+            self._sets.popitem(last=False)
+
+    def put(self, results: list, **meta) -> str:
+        result_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._sets[result_id] = dict(meta, results=results, created_at=now)
+            self._expire(now)
+        return result_id
+
+    def get(self, result_id: str) -> Optional[dict]:
+        if not self.RESULT_ID_PATTERN.match(result_id):
+            return None
+        with self._lock:
+            self._expire(time.time())
+            return self._sets.get(result_id)
+
+# ResultStore kept as JSON files in a directory, so pre-fork workers can page result
+# sets stored by each other. The same max_sets and ttl limits apply across all workers.
+class SharedResultStore(ResultStore):
+    def __init__(self, max_sets: int, ttl: float, directory: str):
+        super().__init__(max_sets, ttl)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, result_id: str) -> str:
+        return os.path.join(self.directory, f"{result_id}.json")
+
+    def _expire(self, now: float):
+        sets = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                sets.append((os.path.getmtime(os.path.join(self.directory, name)), name))
+            except OSError:
+                continue  # expired by another worker meanwhile
+        sets.sort()
+        for i, (modified, name) in enumerate(sets):
+            if len(sets) - i <= self.max_sets and now - modified < self.ttl:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+    def put(self, results: list, **meta) -> str:
+        result_id = uuid.uuid4().hex
+        path = self._path(result_id)
+        # Write-then-rename so other workers never read a partial set
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(dict(meta, results=results, created_at=time.time()), f)
+        os.replace(path + ".tmp", path)
+        self._expire(time.time())
+        return result_id
+
+    def get(self, result_id: str) -> Optional[dict]:
+        if not self.RESULT_ID_PATTERN.match(result_id):
+            return None
+        try:
+            with open(self._path(result_id), encoding="utf-8") as f:
+                result_set = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - result_set["created_at"] >= self.ttl:
+            return None
+        return result_set
+
+result_store = ResultStore(RESULT_STORE_SIZE, RESULT_TTL_SECONDS)
+
+RESULT_SORT_KEYS = {
+    "score": lambda result: result["Score"],
+    "experience": lambda result: result["YearsExperience"],
+    "name": lambda result: result["Resume"].lower()
+}
+RESULT_FORMATS = ("json", "columnar", "msgpack")
+
+# Fields left out of compact payloads - Text repeats the start of ResumeSummary
+COMPACT_DROP_FIELDS = ("Text",)
+
+# One page of results in sorted order, picked with a heap instead of sorting every result
+def select_page(results: list, offset: int, limit: int, sort: str = "score", descending: bool = True) -> list:
+    select = heapq.nlargest if descending else heapq.nsmallest
+    return select(offset + limit, results, key=RESULT_SORT_KEYS[sort])[offset:]
+
+# Score statistics over a whole result set, for clients that only hold one page
+def summarize_results(results: list) -> dict:
+    scores = [result["Score"] for result in results]
+    return {
+        "total": len(scores),
+        "top_score": max(scores, default=0.0),
+        "avg_score": round(sum(scores) / len(scores), 2) if scores else 0.0,
+        "qualified": sum(1 for score in scores if score >= QUALIFIED_SCORE)
+    }
+
+# Columnar layout: one list per field instead of one object per result
+def to_columns(results: list) -> dict:
+    fields = dict.fromkeys(field for result in results for field in result if field not in COMPACT_DROP_FIELDS)
+    return {field: [result.get(field) for result in results] for field in fields}
+
+# Read offset/limit/sort/order/format from the request, raising ValueError on bad values
+def get_result_view_args(values) -> dict:
+    try:
+        offset = max(0, int(values.get("offset", 0)))
+        limit = max(1, min(int(values.get("limit", RESULT_PAGE_SIZE)), JOB_MAX_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("offset and limit must be integers") from None
+    sort = values.get("sort", "score")
+    order = values.get("order", "asc" if sort == "name" else "desc")
+    result_format = values.get("format", "json")
+    if sort not in RESULT_SORT_KEYS:
+        raise ValueError(f"sort must be one of: {', '.join(RESULT_SORT_KEYS)}")
+    if order not in ("asc", "desc"):
+        raise ValueError("order must be asc or desc")
+    if result_format not in RESULT_FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(RESULT_FORMATS)}")
+    if result_format == "msgpack" and not MSGPACK_AVAILABLE:
+        raise ValueError("MessagePack responses need the msgpack package")
+    return {"offset": offset, "limit": limit, "sort": sort, "order": order, "format": result_format}
+
+# Encode a result payload as JSON objects, JSON columns or MessagePack columns
+def render_results(payload: dict, results: list, result_format: str) -> Response:
+    if result_format == "json":
+        return jsonify(dict(payload, results=results))
+    body = dict(payload, format="columnar", columns=to_columns(results))
+    if result_format == "msgpack":
+        return Response(msgpack.packb(body, use_bin_type=True), mimetype="application/msgpack")
+    return jsonify(body)
+
+# Score rows for multi-role results - rows follow the results, columns follow "roles"
+def build_score_matrix(results: list, roles: list) -> list:
+    return [
+        [result.get("RoleScores", {}).get(role, {}).get("Score", 0.0) for role in roles]
+        for result in results
+    ]
+
+# Flask route for file upload and analysis with better error handling.
+# With offset or limit the full ranking is kept server-side and only that page is
+# returned, along with a result_id for fetching further pages from /api/results.
+@app.route('/api/filter', methods=['POST'])
+def filter_resumes():
+    try:
+        logger.info("Received filter request")
+        
+        # Validate request
+        files, job_role, error_response = validate_filter_request()
+        if error_response:
+            return error_response
+        
+        try:
+            view = get_result_view_args(request.values)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        try:
+            shortlist = max(0, int(request.values.get("shortlist", SHORTLIST_TOP_M)))
+        except ValueError:
+            return jsonify({"error": "shortlist must be a non-negative integer"}), 400
+        paged = "offset" in request.values or "limit" in request.values
+        
+        error_response = admit_resumes(len(files))
+        if error_response:
+            return error_response
+        
+        logger.info(f"Processing {len(files)} files for role: {job_role}")
+        
+        results = process_uploads(files, job_role, shortlist=shortlist)
+        
+        logger.info(f"Successfully processed {len(results)} files")
+        response = {
+            "total": len(results),
+            "duplicates_skipped": sum(1 for result in results if result.get("DuplicateOf"))
+        }
+        if shortlist:
+            response["shortlist"] = {"m": shortlist, "filtered": sum(1 for result in results if result["Status"] == "Filtered")}
+        if paged:
+            response.update(
+                result_id=result_store.put(results, role=job_role),
+                offset=view["offset"],
+                limit=view["limit"],
+                stats=summarize_results(results)
+            )
+            results = select_page(results, view["offset"], view["limit"], view["sort"], view["order"] == "desc")
+        else:
+            # Sort results by score in descending order
+            results.sort(key=lambda x: x["Score"], reverse=True)
+        
+        if isinstance(job_role, list):
+            response["roles"] = job_role
+            response["score_matrix"] = build_score_matrix(results, job_role)
+        return render_results(response, results, view["format"]), 200
+        
+    except Exception as e:
+        logger.error(f"API error: {str(e)}")
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+
+# Split uploads for streaming: the first resume alone, then doubling up to EMBED_BATCH_SIZE
+def iter_stream_chunks(files: list):
+    start, size = 0, 1
+    while start < len(files):
+        yield files[start:start + size]
+        start += size
+        size = min(size * 2, EMBED_BATCH_SIZE)
+
+# Copy uploads into files owned by the caller. Flask closes request files when the
+# view returns, before a streamed response body has been produced.
+def detach_uploads(files: list) -> list:
+    detached = []
+    for file in files:
+        spool = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES)
+        file.seek(0)
+        shutil.copyfileobj(file.stream, spool)
+        spool.seek(0)
+        detached.append(FileStorage(stream=spool, filename=file.filename, content_type=file.content_type))
+    return detached
+
+# Streaming variant of /api/filter - NDJSON, one line per scored resume plus a final summary
+@app.route('/api/filter/stream', methods=['POST'])
+def filter_resumes_stream():
+    logger.info("Received streaming filter request")
+    
+    # Archives are expanded after detaching so members are read lazily while streaming
+    files, job_role, error_response = validate_filter_request(expand=False)
+    if error_response:
+        return error_response
+    
+    try:
+        top_n = max(1, int(request.form.get('top_n', STREAM_TOP_N)))
+    except ValueError:
+        return jsonify({"error": "top_n must be an integer"}), 400
+    
+    try:
+        files = expand_uploads(detach_uploads(files))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    error_response = admit_resumes(len(files))
+    if error_response:
+        for file in files:
+            file.close()
+        return error_response
+    logger.info(f"Streaming {len(files)} files for role: {job_role}")
+    
+    def generate():
+        # Keep the running top-N (min-heap on score) for the summary; the full list is
+        # stored for paging through /api/results
+        top = []
+        results = []
+        processed = 0
+        duplicates_skipped = 0
+        try:
+            for chunk in iter_stream_chunks(files):
+                for result in process_uploads(chunk, job_role):
+                    entry = (result["Score"], -processed, result)
+                    if len(top) < top_n:
+                        heapq.heappush(top, entry)
+                    elif entry > top[0]:
+                        heapq.heapreplace(top, entry)
+                    processed += 1
+                    duplicates_skipped += 1 if result.get("DuplicateOf") else 0
+                    results.append(result)
+                    yield json.dumps({"type": "result", "index": processed - 1, "result": result}) + "\n"
+            
+            ranked = [result for _, _, result in sorted(top, key=lambda entry: entry[:2], reverse=True)]
+            yield json.dumps({
+                "type": "summary", "total": processed, "duplicates_skipped": duplicates_skipped, "top": ranked,
+                "result_id": result_store.put(results, role=job_role), "stats": summarize_results(results)
+            }) + "\n"
+            logger.info(f"Successfully streamed {processed} files")
+        except Exception as e:
+            logger.error(f"Streaming API error: {str(e)}")
+            yield json.dumps({"type": "error", "error": f"Server error: {str(e)}", "processed": processed}) + "\n"
+        finally:
+            for file in files:
+                file.close()
+    
+    response = Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+    # Ask reverse proxies not to buffer the stream
+    response.headers["X-Accel-Buffering"] = "no"
+    # Hold the admission reservation until the server has finished sending the stream
+    reservation = g.pop("admission", None)
+    if reservation:
+        response.call_on_close(lambda: admission.release(*reservation))
+    return response
+
+# Background screening jobs. Each job lives in JOB_STORE_DIR/<job id>/ with its
+# uploads, a job.json state file and an append-only results.ndjson, so queued and
+# half-finished jobs are picked up again after a restart.
+class JobManager:
+    JOB_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+    def __init__(self, store_dir: str, workers: int, queue_depth: int):
+        self.store_dir = store_dir
+        self.workers = workers
+        self.queue = queue.Queue(maxsize=queue_depth)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._started = False
+        # Only jobs created before this time are re-queued by start(); pre-fork serving
+        # limits recovery to the previous run and to a single worker
+        self.recover_before = float("inf")
+
+    def start(self):
+        """Start the worker threads and re-queue unfinished jobs (idempotent)"""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        os.makedirs(self.store_dir, exist_ok=True)
+        for i in range(self.workers):
+            threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True).start()
+        self._recover()
+
+    def _job_dir(self, job_id: str) -> str:
+        return os.path.join(self.store_dir, job_id)
+
+    def _persist(self, job: dict):
+        # Write-then-rename so a crash never leaves a truncated job.json behind
+        path = os.path.join(self._job_dir(job["id"]), "job.json")
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(job, f)
+        os.replace(path + ".tmp", path)
+
+    def _update(self, job_id: str, **changes) -> dict:
+        with self._lock:
+            job = self._jobs[job_id]
+            job.update(changes, updated_at=time.time())
+            snapshot = json.loads(json.dumps(job))
+        self._persist(snapshot)
+        return snapshot
+
+    def _load(self, job_id: str) -> Optional[dict]:
+        path = os.path.join(self._job_dir(job_id), "job.json")
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Could not load job {job_id}: {e}")
+            return None
+
+    def _recover(self):
+        for job_id in sorted(os.listdir(self.store_dir)):
+            job = self._load(job_id) if self.JOB_ID_PATTERN.match(job_id) else None
+            if job is None or job["created_at"] >= self.recover_before:
+                continue
+            with self._lock:
+                self._jobs[job_id] = job
+            if job["status"] in ("queued", "running"):
+                try:
+                    self.queue.put_nowait(job_id)
+                    logger.info(f"Re-queued job {job_id} after restart")
+                except queue.Full:
+                    logger.warning(f"Job queue full - job {job_id} stays queued until resubmitted")
+
+    def submit(self, files: list, job_role: str) -> dict:
+        """Persist the uploads and queue a job; raises queue.Full when at capacity"""
+        if self.queue.full():
+            raise queue.Full
+        
+        job_id = uuid.uuid4().hex
+        files_dir = os.path.join(self._job_dir(job_id), "files")
+        os.makedirs(files_dir)
+        for i, file in enumerate(files):
+            file.save(os.path.join(files_dir, f"{i:06d}"))
+        
+        now = time.time()
+        job = {
+            "id": job_id,
+            "role": job_role,
+            "status": "queued",
+            "files": [file.filename for file in files],
+            "progress": {"total": len(files), "parsed": 0, "embedded": 0, "scored": 0},
+            "error": None,
+            "created_at": now,
+            "updated_at": now
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+            snapshot = json.loads(json.dumps(job))
+        self._persist(snapshot)
+        
+        try:
+            self.queue.put_nowait(job_id)
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job_id]
+            shutil.rmtree(self._job_dir(job_id), ignore_errors=True)
+            raise
+        # A worker may already be updating the live job, so callers get the snapshot
+        return snapshot
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                return json.loads(json.dumps(job))
+        # Jobs accepted by another pre-fork worker are only visible on disk
+        return self._load(job_id)
+
+    def results(self, job_id: str) -> list:
+        """Results written so far, in upload order"""
+        path = os.path.join(self._job_dir(job_id), "results.ndjson")
+        if not os.path.exists(path):
+            return []
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def ranking(self, job_id: str) -> list:
+        with open(os.path.join(self._job_dir(job_id), "ranking.json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    def _worker(self):
+        while True:
+            job_id = self.queue.get()
+            try:
+                self._run(job_id)
+            except Exception as e:
+                logger.error(f"Job {job_id} failed: {e}")
+                self._update(job_id, status="failed", error=str(e))
+            finally:
+                self.queue.task_done()
+
+    def _run(self, job_id: str):
+        job = self._update(job_id, status="running")
+        job_dir = self._job_dir(job_id)
+        results_path = os.path.join(job_dir, "results.ndjson")
+        names = job["files"]
+        
+        # Resume after the last result written before a restart
+        done = len(self.results(job_id))
+        counts = {"parsed": done, "embedded": done, "scored": done}
+        
+        def progress(stage, count):
+            counts[stage] += count
+            self._update(job_id, progress=dict(counts, total=len(names)))
+        
+        logger.info(f"Running job {job_id}: {len(names) - done} of {len(names)} files left for role {job['role']}")
+        for start in range(done, len(names), EMBED_BATCH_SIZE):
+            chunk = [
+                FileStorage(stream=open(os.path.join(job_dir, "files", f"{i:06d}"), "rb"), filename=names[i])
+                for i in range(start, min(start + EMBED_BATCH_SIZE, len(names)))
+            ]
+            try:
+                results = process_uploads(chunk, job["role"], progress=progress)
+            finally:
+                for file in chunk:
+                    file.close()
+            with open(results_path, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(result) + "\n" for result in results)
+        
+        ranking = sorted(self.results(job_id), key=lambda x: x["Score"], reverse=True)
+        with open(os.path.join(job_dir, "ranking.json.tmp"), "w", encoding="utf-8") as f:
+            json.dump(ranking, f)
+        os.replace(os.path.join(job_dir, "ranking.json.tmp"), os.path.join(job_dir, "ranking.json"))
+        
+        # Uploads are no longer needed once the ranking is stored
+        shutil.rmtree(os.path.join(job_dir, "files"), ignore_errors=True)
+        self._update(job_id, status="completed")
+        logger.info(f"Job {job_id} completed with {len(ranking)} results")
+
+job_manager = JobManager(JOB_STORE_DIR, JOB_WORKERS, JOB_QUEUE_DEPTH)
+
+# Parse offset/limit pagination arguments from the query string
+def get_page_args(default_limit: int):
+    offset = max(0, int(request.args.get("offset", 0)))
+    limit = max(1, min(int(request.args.get("limit", default_limit)), JOB_MAX_PAGE_SIZE))
+    return offset, limit
+
+# Look up a job by id, returning (job, error_response)
+def lookup_job(job_id: str):
+    job_manager.start()
+    job = job_manager.get(job_id) if JobManager.JOB_ID_PATTERN.match(job_id) else None
+    if job is None:
+        return None, (jsonify({"error": "Job not found"}), 404)
+    return job, None
+
+# Submit a screening job - returns immediately with the job id
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
     try:
-        # Reset file pointer to beginning
-        file.seek(0)
-        file_content = file.read()
-        file_size = len(file_content)
+        files, job_role, error_response = validate_filter_request()
+        if error_response:
+            return error_response
         
-        logger.info(f"File size: {file_size} bytes")
+        job_manager.start()
+        try:
+            job = job_manager.submit(files, job_role)
+        except queue.Full:
+            response = jsonify({"error": "Job queue is full, please retry later"})
+            response.headers["Retry-After"] = str(JOB_RETRY_AFTER)
+            return response, 429
         
-        if filename.lower().endswith('.pdf'):
-            logger.info("Processing PDF file...")
-            if PDF_AVAILABLE:
-                try:
-                    logger.info(f"Read {len(file_content)} bytes from PDF")
-                    doc = fitz.open(stream=file_content, filetype="pdf")
-                    logger.info(f"PDF has {doc.page_count} pages")
-                    
-                    for page_num in range(doc.page_count):
-                        page = doc[page_num]
-                        page_text = page.get_text()
-                        logger.info(f"Page {page_num + 1} text length: {len(page_text)}")
-                        text += page_text + " "
-                    doc.close()
-                except Exception as pdf_error:
-                    logger.error(f"PDF processing error: {pdf_error}")
-                    text = f"Error processing PDF: {str(pdf_error)}"
-            else:
-                text = "PDF processing not available - PyMuPDF not installed"
-                logger.error("PyMuPDF not available for PDF processing")
-                
-        elif filename.lower().endswith('.docx'):
-            logger.info("Processing DOCX file...")
-            if DOCX_AVAILABLE:
-                try:
-                    # Reset file pointer and use BytesIO for docx2txt
-                    file_like = io.BytesIO(file_content)
-                    text = docx2txt.process(file_like)
-                    logger.info(f"DOCX extracted text length: {len(text) if text else 0}")
-                except Exception as docx_error:
-                    logger.error(f"DOCX processing error with docx2txt: {docx_error}")
-                    # Try alternative method with python-docx
-                    if PYTHON_DOCX_AVAILABLE:
-                        try:
-                            logger.info("Trying python-docx as fallback...")
-                            file_like = io.BytesIO(file_content)
-                            doc = Document(file_like)
-                            text = ""
-                            for paragraph in doc.paragraphs:
-                                text += paragraph.text + "\n"
-                            logger.info(f"Python-docx extracted text length: {len(text)}")
-                        except Exception as alt_error:
-                            logger.error(f"Python-docx fallback failed: {alt_error}")
-                            text = f"Error processing DOCX: {str(docx_error)}"
-                    else:
-                        text = f"Error processing DOCX: {str(docx_error)}"
-            else:
-                text = "DOCX processing not available - docx2txt not installed"
-                logger.error("docx2txt not available for DOCX processing")
-                
-        elif filename.lower().endswith('.txt'):
-            logger.info("Processing TXT file...")
-            try:
-                text = file_content.decode('utf-8')
-                logger.info(f"TXT file text length: {len(text)}")
-            except UnicodeDecodeError:
-                # Try different encodings
-                for encoding in ['latin-1', 'cp1252', 'iso-8859-1']:
-                    try:
-                        text = file_content.decode(encoding)
-                        logger.info(f"TXT file decoded with {encoding}, length: {len(text)}")
-                        break
-                    except UnicodeDecodeError:
-                        continue
-                else:
-                    text = "Error: Could not decode text file"
-                    logger.error("Could not decode text file with any encoding")
-            except Exception as txt_error:
-                logger.error(f"TXT processing error: {txt_error}")
-                text = f"Error processing TXT: {str(txt_error)}"
-        else:
-            logger.warning(f"Unsupported file format: {filename}")
-            text = f"Unsupported file format: {filename.split('.')[-1] if '.' in filename else 'unknown'}"
-            
-        # Clean and validate text
-        if text:
-            text = text.strip()
-            # Remove excessive whitespace but preserve some structure
-            text = ' '.join(text.split())
-            
-        logger.info(f"Final extracted text length: {len(text)}")
-        logger.info(f"Text preview (first 300 chars): '{text[:300]}'")
-        
-        # More lenient validation
-        if len(text) < 5:
-            logger.warning(f"Very short text extracted from {filename}")
-            if not text or text.startswith("Error"):
-                text = f"Minimal content from {filename}"
-            
-        state["resume_text"] = text
-        logger.info(f"=== PARSING COMPLETE for {filename} ===")
+        logger.info(f"Queued job {job['id']} with {len(files)} files for role: {job_role}")
+        return jsonify({"job_id": job["id"], "status": job["status"], "total": len(files)}), 202
         
     except Exception as e:
-        logger.error(f"Parsing error for {filename}: {str(e)}")
-        import traceback
-        logger.error(f"Traceback: {traceback.format_exc()}")
-        state["resume_text"] = f"Error parsing {filename}: {str(e)}"
-        
-    return state
+        logger.error(f"Job API error: {str(e)}")
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
 
-# Load JD function with more comprehensive job descriptions
-def load_jd(state: GraphState) -> GraphState:
-    job_role = state.get("job_role", "software-engineer")
-    
-    jds = {
-        "software-engineer": """
-        We are looking for an experienced Software Engineer with strong programming skills.
-        Required skills: Python, Java, JavaScript, React, Node.js, SQL, Git, Agile methodologies.
-        Experience with cloud platforms (AWS, Azure), containerization (Docker), and CI/CD pipelines preferred.
-        Strong problem-solving skills and ability to work in a collaborative team environment.
-        Bachelor's degree in Computer Science or related field with 3+ years of experience.
-        """,
-        "data-analyst": """
-        We are seeking a skilled Data Analyst to join our analytics team.
-        Required skills: SQL, Python, R, Excel, Tableau, Power BI, statistical analysis.
-        Experience with data visualization, data mining, and business intelligence tools.
-        Knowledge of machine learning concepts and experience with pandas, numpy, matplotlib.
-        Strong analytical thinking and ability to derive insights from complex datasets.
-        Bachelor's degree in Statistics, Mathematics, or related field with 2+ years of experience.
-        """,
-        "fullstack-developer": """
-        We are hiring a Full Stack Developer to build end-to-end web applications.
-        Required skills: JavaScript, React, Node.js, Python, HTML, CSS, MongoDB, PostgreSQL.
-        Experience with RESTful APIs, Git version control, Docker, and cloud deployment.
-        Knowledge of modern frameworks, responsive design, and agile development practices.
-        Bachelor's degree in Computer Science with 2+ years of full-stack development experience.
-        """,
-        "product-manager": """
-        We are looking for a Product Manager to drive product strategy and development.
-        Required skills: Product roadmap planning, user research, market analysis, Agile/Scrum.
-        Experience with product analytics tools, A/B testing, and customer feedback analysis.
-        Strong communication skills and ability to work cross-functionally with engineering and design teams.
-        Knowledge of user experience principles and product lifecycle management.
-        MBA or Bachelor's degree with 4+ years of product management experience.
-        """
-    }
+# Job status with progress counts and the best partial results so far
+@app.route('/api/jobs/<job_id>')
+def get_job(job_id):
+    job, error_response = lookup_job(job_id)
+    if error_response:
+        return error_response
     
-    state["jd_text"] = jds.get(job_role, jds["software-engineer"])
-    logger.info(f"Loaded job description for role: {job_role}")
-    return state
+    try:
+        _, limit = get_page_args(JOB_PAGE_SIZE)
+    except ValueError:
+        return jsonify({"error": "offset and limit must be integers"}), 400
+    
+    partial = heapq.nlargest(limit, job_manager.results(job_id), key=lambda x: x["Score"])
+    return jsonify({
+        "job_id": job_id,
+        "role": job["role"],
+        "status": job["status"],
+        "progress": job["progress"],
+        "error": job["error"],
+        "partial_results": partial
+    }), 200
 
-# Enhanced scoring function with detailed breakdown
-def compute_detailed_scores(resume_text: str, jd_text: str, job_role: str = "software-engineer") -> dict:
-    """Compute detailed scoring breakdown for resume analysis"""
+# Page through the final ranking of a completed job
+@app.route('/api/jobs/<job_id>/results')
+def get_job_results(job_id):
+    job, error_response = lookup_job(job_id)
+    if error_response:
+        return error_response
     
-    logger.info(f"=== COMPUTING DETAILED SCORES ===")
-    logger.info(f"EMBEDDINGS_AVAILABLE: {EMBEDDINGS_AVAILABLE}")
+    if job["status"] != "completed":
+        return jsonify({"error": f"Job is {job['status']}", "status": job["status"], "progress": job["progress"]}), 409
     
-    # Initialize scores
-    scores = {
-        "overall_score": 0.0,
-        "experience_score": 0,
-        "skills_score": 0,
-        "keywords_score": 0,
-        "job_match": 0.0,
-        "years_experience": 0,
-        "identified_skills": [],
-        "resume_summary": resume_text[:200] + "..." if len(resume_text) > 200 else resume_text
+    try:
+        offset, limit = get_page_args(JOB_PAGE_SIZE)
+    except ValueError:
+        return jsonify({"error": "offset and limit must be integers"}), 400
+    
+    ranking = job_manager.ranking(job_id)
+    return jsonify({
+        "job_id": job_id,
+        "results": ranking[offset:offset + limit],
+        "offset": offset,
+        "limit": limit,
+        "total": len(ranking)
+    }), 200
+
+# Page through a stored /api/filter or /api/filter/stream result set
+@app.route('/api/results/<result_id>')
+def get_results_page(result_id):
+    result_set = result_store.get(result_id)
+    if result_set is None:
+        return jsonify({"error": "Result set not found or expired"}), 404
+    
+    try:
+        view = get_result_view_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    results = result_set["results"]
+    page = select_page(results, view["offset"], view["limit"], view["sort"], view["order"] == "desc")
+    response = {
+        "result_id": result_id,
+        "offset": view["offset"],
+        "limit": view["limit"],
+        "total": len(results),
+        "stats": summarize_results(results)
     }
+    if isinstance(result_set["role"], list):
+        response["roles"] = result_set["role"]
+        response["score_matrix"] = build_score_matrix(page, result_set["role"])
+    return render_results(response, page, view["format"]), 200
+
+# Persistent resume vector index (Chroma) for ranking the whole candidate pool
+_resume_index = None
+_resume_index_lock = threading.Lock()
+
+def get_resume_index():
+    """Open the persistent Chroma collection on first use"""
+    global _resume_index
+    with _resume_index_lock:
+        if _resume_index is None:
+            from langchain_community.vectorstores import Chroma
+            _resume_index = Chroma(
+                collection_name=CHROMA_COLLECTION,
+                embedding_function=get_embeddings(),
+                persist_directory=CHROMA_DIR,
+                collection_metadata={"hnsw:space": "cosine"}
+            )
+            logger.info(f"Opened resume index '{CHROMA_COLLECTION}' in {CHROMA_DIR}")
+        return _resume_index
+
+# Skills from every role, used to tag indexed resumes independently of a role
+def all_role_skills() -> list:
+    return list(dict.fromkeys(skill for profile in get_role_profiles().values() for skill in profile.skills))
+
+# Parse, embed and store uploads in the resume index (keyed by file hash)
+def index_uploads(files: list) -> list:
+    extracted = extract_documents(files)
+    summaries = [
+        {"Resume": file.filename, "FileHash": item["resume_hash"], "Status": "Error"}
+        for file, item in zip(files, extracted) if item["error"] is not None
+    ]
+    
+    # Chroma rejects repeated ids in one upsert, so byte-identical copies are reported
+    # as duplicates of the first copy instead of being indexed again
+    indexed = []
+    first_by_hash = {}
+    for file, item in zip(files, extracted):
+        if item["error"] is not None:
+            continue
+        first = first_by_hash.setdefault(item["resume_hash"], file)
+        if first is not file:
+            summaries.append({
+                "Resume": file.filename, "FileHash": item["resume_hash"],
+                "Status": "Duplicate", "DuplicateOf": first.filename
+            })
+            continue
+        indexed.append((file, item))
+    if not indexed:
+        return summaries
+    
+    texts = [item["text"] for _, item in indexed]
+    keys = [item["resume_hash"] for _, item in indexed]
+    vectors = embed_resumes(texts, keys)
+    skills = all_role_skills()
+    skill_terms = tuple(skill.lower() for skill in skills)
+    scanned_terms = frozenset(skill_terms)
+    
+    metadatas = []
+    scored = []
+    for (file, item), text in zip(indexed, texts):
+        resume_lower = text.lower()
+        years_experience, experience_score = extract_experience(resume_lower)
+        term_positions = compile_term_matcher(skill_terms).find(resume_lower)
+        identified_skills = [skill for skill in skills if skill.lower() in term_positions]
+        scored.append({
+            "years_experience": years_experience,
+            "experience_score": experience_score,
+            "term_positions": term_positions,
+            "scanned_terms": scanned_terms
+        })
+        metadatas.append({
+            "filename": file.filename,
+            "file_hash": item["resume_hash"],
+            "years_experience": years_experience,
+            # Chroma metadata values must be scalars
+            "skills": ", ".join(identified_skills)
+        })
+        summaries.append({
+            "Resume": file.filename,
+            "FileHash": item["resume_hash"],
+            "Status": "Indexed",
+            "YearsExperience": years_experience,
+            "IdentifiedSkills": identified_skills
+        })
     
     try:
-        # 1. SEMANTIC SIMILARITY (Overall Score)
-        if EMBEDDINGS_AVAILABLE:
-            logger.info("Computing semantic similarity...")
-            resume_embed = embeddings.embed_documents([resume_text])[0]
-            jd_embed = embeddings.embed_documents([jd_text])[0]
-            
-            logger.info(f"Embeddings generated successfully")
-            
-            resume_vector = np.array(resume_embed)
-            jd_vector = np.array(jd_embed)
-            
-            logger.info(f"Vector norms: resume={np.linalg.norm(resume_vector):.6f}, jd={np.linalg.norm(jd_vector):.6f}")
-            
-            if np.linalg.norm(resume_vector) > 0 and np.linalg.norm(jd_vector) > 0:
-                similarity = cosine_similarity([resume_vector], [jd_vector])[0][0]
-                logger.info(f"Computed similarity: {similarity:.6f}")
-                if np.isfinite(similarity):
-                    scores["overall_score"] = max(0.0, similarity * 100)
-                    scores["job_match"] = max(0.0, similarity * 100)
-                    logger.info(f"Final overall score: {scores['overall_score']:.2f}")
-        else:
-            logger.warning("Embeddings not available - using fallback scoring")
-        
-        # 2. EXPERIENCE EXTRACTION AND SCORING
-        experience_keywords = [
-            "years", "year", "experience", "experienced", "exp", "months", "month",
-            "internship", "intern", "work", "worked", "employment", "job", "position"
-        ]
-        
-        resume_lower = resume_text.lower()
-        
-        # Extract years of experience
-        year_patterns = [
-            r'(\d+)\s*\+?\s*years?\s+(?:of\s+)?experience',
-            r'(\d+)\s*years?\s+experience',
-            r'experience\s*:?\s*(\d+)\s*years?',
-            r'(\d+)\s*years?\s+in',
-            r'(\d+)\s*yr\s+',
-            r'(\d+)\s*-\s*(\d+)\s*years?'
-        ]
-        
-        years_found = []
-        for pattern in year_patterns:
-            matches = re.findall(pattern, resume_lower)
-            for match in matches:
-                if isinstance(match, tuple):
-                    years_found.extend([int(x) for x in match if x.isdigit()])
-                elif match.isdigit():
-                    years_found.append(int(match))
-        
-        if years_found:
-            scores["years_experience"] = max(years_found)
-            # Score based on experience (0-100 scale, assuming 10+ years = 100)
-            scores["experience_score"] = min(100, (scores["years_experience"] / 10) * 100)
-        else:
-            # Check for experience indicators without explicit years
-            exp_indicators = sum(1 for keyword in experience_keywords if keyword in resume_lower)
-            scores["experience_score"] = min(100, exp_indicators * 10)
-            scores["years_experience"] = max(1, exp_indicators // 2)  # Rough estimate
-        
-        # 3. SKILLS SCORING
-        # Define skill sets for different roles
-        all_skills = {
-            "data-analyst": [
-                "python", "sql", "r", "excel", "tableau", "power bi", "pandas", "numpy",
-                "matplotlib", "seaborn", "statistics", "analytics", "data visualization",
-                "machine learning", "data mining", "business intelligence", "reporting",
-                "dashboard", "etl", "database", "statistical analysis"
-            ],
-            "software-engineer": [
-                "python", "java", "javascript", "react", "node.js", "sql", "git",
-                "html", "css", "docker", "kubernetes", "aws", "azure", "mongodb",
-                "postgresql", "rest api", "microservices", "agile", "scrum", "ci/cd"
-            ],
-            "fullstack-developer": [
-                "javascript", "react", "node.js", "python", "html", "css", "mongodb", 
-                "postgresql", "git", "docker", "rest api", "express", "vue", "angular",
-                "bootstrap", "responsive design", "api", "database", "frontend", "backend"
-            ],
-            "product-manager": [
-                "product management", "roadmap", "agile", "scrum", "user research",
-                "market analysis", "a/b testing", "analytics", "stakeholder management",
-                "product strategy", "user experience", "wireframing", "requirements",
-                "project management", "leadership", "communication"
-            ]
-        }
-        
-        # Get skills for the specific role
-        relevant_skills = all_skills.get(job_role, all_skills["software-engineer"])
-        
-        # Count skills found in resume
-        found_skills = []
-        for skill in relevant_skills:
-            if skill.lower() in resume_lower:
-                found_skills.append(skill)
+        store_features([file for file, _ in indexed], [item for _, item in indexed], scored)
+    except Exception as e:
+        logger.error(f"Could not store resume features: {e}")
+    
+    # Upsert with our own vectors; add_texts would embed every resume a second time
+    get_resume_index()._collection.upsert(
+        ids=keys,
+        embeddings=[vector.tolist() for vector in vectors],
+        metadatas=metadatas,
+        documents=texts
+    )
+    return summaries
+
+# Ingest resumes into the persistent index
+@app.route('/api/index', methods=['POST'])
+def index_resumes():
+    try:
+        if not embeddings_available():
+            return jsonify({"error": "Embeddings model not available"}), 503
         
-        scores["identified_skills"] = found_skills
-        # Skills score: percentage of required skills found
-        scores["skills_score"] = min(100, int((len(found_skills) / len(relevant_skills)) * 100))
+        files = request.files.getlist('resumes')
+        if not files or all(f.filename == '' for f in files):
+            return jsonify({"error": "No resumes uploaded"}), 400
         
-        # 4. KEYWORDS SCORING
-        # Extract important keywords from job description
-        jd_keywords = []
-        jd_words = jd_text.lower().split()
+        try:
+            files = expand_uploads(files)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         
-        # Filter out common words and extract meaningful keywords
-        common_words = {"the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for", "of", "with", "by", "is", "are", "was", "were", "be", "been", "have", "has", "had", "will", "would", "could", "should", "may", "might", "can", "must"}
+        error_response = admit_resumes(len(files))
+        if error_response:
+            return error_response
         
-        for word in jd_words:
-            cleaned_word = re.sub(r'[^\w]', '', word)
-            if len(cleaned_word) > 3 and cleaned_word not in common_words:
-                jd_keywords.append(cleaned_word)
+        summaries = index_uploads(files)
+        indexed = sum(1 for summary in summaries if summary["Status"] == "Indexed")
+        duplicates = sum(1 for summary in summaries if summary["Status"] == "Duplicate")
+        logger.info(f"Indexed {indexed} of {len(files)} resumes ({duplicates} duplicates)")
+        return jsonify({
+            "results": summaries, "indexed": indexed, "duplicates_skipped": duplicates, "total": len(files)
+        }), 200
         
-        # Remove duplicates and get top keywords
-        jd_keywords = list(set(jd_keywords))[:20]  # Top 20 keywords
+    except Exception as e:
+        logger.error(f"Index API error: {str(e)}")
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+
+# Top-k candidates from the whole index for a role or free-text JD
+@app.route('/api/index/query', methods=['POST'])
+def query_index():
+    try:
+        if not embeddings_available():
+            return jsonify({"error": "Embeddings model not available"}), 503
         
-        # Count keyword matches
-        keyword_matches = sum(1 for keyword in jd_keywords if keyword in resume_lower)
-        scores["keywords_score"] = min(100, int((keyword_matches / len(jd_keywords)) * 100)) if jd_keywords else 0
+        payload = request.get_json(silent=True) or {}
+        job_role = payload.get("role", DEFAULT_ROLE)
+        jd_text = payload.get("jd")
+        try:
+            k = max(1, min(int(payload.get("k", 10)), INDEX_MAX_K))
+            min_years = payload.get("min_years")
+            min_years = int(min_years) if min_years is not None else None
+        except (TypeError, ValueError):
+            return jsonify({"error": "k and min_years must be integers"}), 400
         
-        # Ensure all scores are integers where expected
-        scores["experience_score"] = int(round(scores["experience_score"]))
-        scores["years_experience"] = int(scores["years_experience"])
+        profile = resolve_role_profile(jd_text, job_role) if jd_text else get_role_profile(job_role)
+        if profile.jd_vector is None:
+            return jsonify({"error": "Could not embed job description"}), 500
         
-        logger.info(f"Detailed scores: {scores}")
+        where = {"years_experience": {"$gte": min_years}} if min_years is not None else None
+        matches = get_resume_index().similarity_search_by_vector_with_relevance_scores(
+            embedding=profile.jd_vector.tolist(), k=k, filter=where
+        )
         
-        return scores
+        # Cosine space: distance = 1 - similarity
+        results = [
+            {
+                "Resume": doc.metadata.get("filename", ""),
+                "FileHash": doc.metadata.get("file_hash", ""),
+                "Score": round(max(0.0, (1.0 - distance) * 100), 2),
+                "YearsExperience": doc.metadata.get("years_experience", 0),
+                "IdentifiedSkills": [s for s in doc.metadata.get("skills", "").split(", ") if s]
+            }
+            for doc, distance in matches
+        ]
+        return jsonify({"role": profile.role, "results": results, "total": len(results)}), 200
         
     except Exception as e:
-        logger.error(f"Error computing detailed scores: {e}")
-        import traceback
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error(f"Index query error: {str(e)}")
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+
+# Skill and keyword vocabulary of every role, used when scanning resumes for the feature store
+def feature_terms() -> tuple:
+    return tuple(sorted({
+        term.lower() for profile in get_role_profiles().values() for term in profile.skills + profile.keywords
+    }))
+
+# Okapi BM25 over resume words plus the vocabulary terms found in each resume, so
+# multi-word skills ("rest api") count as single tokens. Used to shortlist resumes
+# before the embedding stage.
+class LexicalIndex:
+    TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+    def __init__(self, documents: list):
+        """``documents`` holds one (lower-cased text, term positions) pair per resume"""
+        postings = {}
+        lengths = []
+        for doc, (text_lower, term_positions) in enumerate(documents):
+            counts = {}
+            for token in self.TOKEN_PATTERN.findall(text_lower):
+                counts[token] = counts.get(token, 0) + 1
+            for term, positions in term_positions.items():
+                counts["term:" + term] = len(positions)
+            lengths.append(sum(counts.values()))
+            for token, count in counts.items():
+                postings.setdefault(token, ([], []))
+                postings[token][0].append(doc)
+                postings[token][1].append(count)
+        self.postings = {token: (np.array(docs), np.array(counts, dtype=float)) for token, (docs, counts) in postings.items()}
+        self.lengths = np.array(lengths, dtype=float)
+        self.avg_length = float(self.lengths.mean()) if lengths else 0.0
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def scores(self, query_tokens: list) -> np.ndarray:
+        scores = np.zeros(len(self.lengths))
+        norms = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths / max(self.avg_length, 1e-9))
+        for token in set(query_tokens):
+            if token not in self.postings:
+                continue
+            docs, counts = self.postings[token]
+            idf = np.log(1 + (len(self.lengths) - len(docs) + 0.5) / (len(docs) + 0.5))
+            scores[docs] += idf * counts * (BM25_K1 + 1) / (counts + norms[docs])
         return scores
 
-# Simple wrapper for chain compatibility
-def simple_compute_score(input_data):
-    """Simple wrapper for chain compatibility"""
-    resume_text = input_data.get("resume", "")
-    jd_text = input_data.get("jd", "")
-    detailed = compute_detailed_scores(resume_text, jd_text)
-    return {"score": detailed["overall_score"]}
+    def top(self, query_tokens: list, m: int, candidates: list = None) -> list:
+        """(document, score) pairs of the m best documents, best first"""
+        return self.rank(self.scores(query_tokens), m, candidates)
 
-# Build the chain
-chain = (
-    {"resume": itemgetter("resume"), "jd": itemgetter("jd")}
-    | RunnableLambda(simple_compute_score)
-)
+    @staticmethod
+    def rank(scores: np.ndarray, m: int, candidates: list = None) -> list:
+        ids = np.arange(len(scores)) if candidates is None else np.asarray(candidates, dtype=int)
+        if len(ids) > m:
+            ids = ids[np.argpartition(-scores[ids], m - 1)[:m]]
+        ids = ids[np.argsort(-scores[ids], kind="stable")]
+        return [(int(doc), float(scores[doc])) for doc in ids]
 
-# Semantic match node - now with detailed scoring
-def semantic_match(state: GraphState) -> GraphState:
-    try:
-        resume_text = state["resume_text"]
-        jd_text = state["jd_text"]
-        job_role = state.get("job_role", "software-engineer")
-        
-        logger.info(f"Computing detailed scores for resume length: {len(resume_text)}, JD length: {len(jd_text)}")
-        
-        # Compute detailed scores
-        detailed_scores = compute_detailed_scores(resume_text, jd_text, job_role)
+# Query tokens for a role: JD words plus its skills and keywords as vocabulary terms
+def role_query_tokens(profile: RoleProfile) -> list:
+    return LexicalIndex.TOKEN_PATTERN.findall(profile.jd_text.lower()) + [
+        "term:" + term.lower() for term in profile.skills + profile.keywords
+    ]
+
+SHORTLIST_FILTERED = METRICS.counter("resume_shortlist_filtered_total", "Resumes dropped by the lexical prefilter before embedding.")
+
+# First ranking stage for an upload batch: BM25-rank the parsed resumes and keep the
+# top_m per role. Returns (kept, dropped), each mapping item index to its best lexical
+# score; both are empty when the batch is not larger than top_m.
+def shortlist_batch(extracted: list, duplicates: list, roles: list, top_m: int) -> tuple:
+    candidates = [
+        i for i, item in enumerate(extracted)
+        if item["error"] is None and not (duplicates[i] and "index" in duplicates[i])
+        and not item["text"].startswith(EXTRACTION_ERROR_PREFIXES)
+    ]
+    if not top_m or len(candidates) <= top_m:
+        return {}, {}
+    
+    with timed_stage("shortlist"):
+        # Term positions are kept on the item for store_features
+        matcher = compile_term_matcher(feature_terms())
+        documents = []
+        for i in candidates:
+            text_lower = extracted[i]["text"].lower()
+            extracted[i]["term_positions"] = matcher.find(text_lower)
+            documents.append((text_lower, extracted[i]["term_positions"]))
+        index = LexicalIndex(documents)
         
-        # Set the main score for backward compatibility
-        state["score"] = detailed_scores["overall_score"]
+        best = {}
+        kept = set()
+        for role in roles:
+            scores = index.scores(role_query_tokens(get_role_profile(role)))
+            for doc, score in enumerate(scores):
+                best[candidates[doc]] = max(best.get(candidates[doc], 0.0), float(score))
+            kept.update(candidates[doc] for doc, _ in index.rank(scores, top_m))
+    
+    SHORTLIST_FILTERED.inc(len(candidates) - len(kept))
+    return (
+        {i: score for i, score in best.items() if i in kept},
+        {i: score for i, score in best.items() if i not in kept}
+    )
+
+# BM25 index over the whole feature store, rebuilt when resumes are added
+_pool_index = None
+_pool_index_lock = threading.Lock()
+
+def get_pool_index() -> tuple:
+    """Return (resume hashes, LexicalIndex) for every stored resume"""
+    global _pool_index
+    version = feature_store.version()
+    with _pool_index_lock:
+        if _pool_index is None or _pool_index[0] != version:
+            with timed_stage("shortlist_index"):
+                features = feature_store.load()
+                index = LexicalIndex([(f["text"].lower(), f["term_positions"]) for f in features])
+            _pool_index = (version, [f["resume_hash"] for f in features], index)
+        return _pool_index[1], _pool_index[2]
+
+# First ranking stage for the stored pool: the top_m resume hashes for a role (optionally
+# among resume_hashes), mapped to their lexical scores, best first
+def shortlist_pool(profile: RoleProfile, top_m: int, resume_hashes: list = None) -> dict:
+    hashes, index = get_pool_index()
+    candidates = None
+    if resume_hashes is not None:
+        wanted = set(resume_hashes)
+        candidates = [doc for doc, resume_hash in enumerate(hashes) if resume_hash in wanted]
+    return {hashes[doc]: score for doc, score in index.top(role_query_tokens(profile), top_m, candidates)}
+
+# Compare shortlisted rankings with the exhaustive one: the share of the exhaustive
+# top-k each shortlist size keeps, and how long each ranking took
+def shortlist_recall_report(profile: RoleProfile, sizes: list, k: int) -> dict:
+    start = time.perf_counter()
+    get_pool_index()
+    index_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    exhaustive, _ = rescore_features(profile)
+    exhaustive_seconds = time.perf_counter() - start
+    top_k = [result["FileHash"] for result in exhaustive[:k]]
+    
+    shortlists = []
+    for top_m in sizes:
+        start = time.perf_counter()
+        shortlisted = shortlist_pool(profile, top_m)
+        results, _ = rescore_features(profile, list(shortlisted))
+        seconds = time.perf_counter() - start
+        ranked = [result["FileHash"] for result in results[:k]]
+        shortlists.append({
+            "m": top_m,
+            "shortlisted": len(shortlisted),
+            "recall_at_k": round(sum(1 for h in top_k if h in shortlisted) / len(top_k), 4) if top_k else 1.0,
+            "top_k_identical": ranked == top_k,
+            "seconds": round(seconds, 4),
+            "speedup": round(exhaustive_seconds / seconds, 2) if seconds > 0 else None
+        })
+    return {
+        "role": profile.role,
+        "pool": len(exhaustive),
+        "k": k,
+        "index_seconds": round(index_seconds, 4),
+        "exhaustive_seconds": round(exhaustive_seconds, 4),
+        "shortlists": shortlists
+    }
+
+# Years and term positions computed while scoring a state, in the form store_features reuses
+def scored_features(state: Optional[dict]) -> Optional[dict]:
+    if state is None:
+        return None
+    all_scores = list(state.get("role_scores", {}).values()) or [state.get("detailed_scores", {})]
+    all_scores = [scores for scores in all_scores if "term_positions" in scores]
+    if not all_scores:
+        return None
+    term_positions, scanned_terms = {}, set()
+    for scores in all_scores:
+        term_positions.update(scores["term_positions"])
+        scanned_terms.update(scores["scanned_terms"])
+    return {
+        "years_experience": all_scores[0]["years_experience"],
+        "experience_score": all_scores[0]["experience_score"],
+        "term_positions": term_positions,
+        "scanned_terms": scanned_terms
+    }
+
+# Persist the features of freshly extracted resumes
+def store_features(files: list, extracted: list, scored: list = None):
+    """``scored`` optionally holds, per item, the years_experience, experience_score,
+    term_positions and scanned_terms already computed for it; only the vocabulary terms
+    outside scanned_terms are scanned again."""
+    scored = scored or [None] * len(files)
+    entries = [
+        (file.filename, item, features) for file, item, features in zip(files, extracted, scored)
+        if item["error"] is None and not item["text"].startswith(EXTRACTION_ERROR_PREFIXES)
+    ]
+    if feature_store is None or not entries:
+        return
+    terms = feature_terms()
+    terms_version = feature_store.register_terms(terms)
+    model_id = get_embeddings().name if embeddings_available() else None
+    rows = []
+    for filename, item, features in entries:
+        resume_lower = item["text"].lower()
+        if features is not None:
+            years_experience, experience_score = features["years_experience"], features["experience_score"]
+        else:
+            years_experience, experience_score = extract_experience(resume_lower)
+        if "term_positions" in item:
+            # The shortlist already scanned the whole vocabulary
+            term_positions = item["term_positions"]
+        else:
+            term_positions = dict(features["term_positions"]) if features is not None else {}
+            scanned_terms = features["scanned_terms"] if features is not None else ()
+            unscanned = tuple(term for term in terms if term not in scanned_terms)
+            if unscanned:
+                term_positions.update(compile_term_matcher(unscanned).find(resume_lower))
+        rows.append({
+            "resume_hash": item["resume_hash"],
+            "filename": filename,
+            "text": item["text"],
+            "years_experience": years_experience,
+            "experience_score": experience_score,
+            "term_positions": term_positions,
+            "terms_version": terms_version,
+            "embedding": resume_cache.peek_embedding(item["resume_hash"], model_id) if model_id else None
+        })
+    feature_store.put_features(rows, model_id)
+
+# Re-score stored resumes against a role profile. Embeddings, years and term positions
+# come from the feature store; the model only runs for resumes stored without a vector
+# for the current backend, and the text is only rescanned for terms it was never scanned for.
+def rescore_features(profile: RoleProfile, resume_hashes: list = None) -> tuple:
+    """Return (results, recomputed) for the stored resumes, results sorted by score"""
+    features = feature_store.load(resume_hashes)
+    recomputed = {"embeddings": 0, "term_scans": 0}
+    if not features:
+        return [], recomputed
+    
+    # Similarity: one matrix-vector product over the stored embeddings
+    similarities = [None] * len(features)
+    if profile.jd_vector is not None and embeddings_available():
+        model_id = get_embeddings().name
+        missing = [i for i, f in enumerate(features) if f["embedding"] is None or f["model"] != model_id]
+        if missing:
+            vectors = embed_texts([features[i]["text"] for i in missing])
+            for i, vector in zip(missing, vectors):
+                features[i]["embedding"] = vector
+            feature_store.put_embeddings([(features[i]["resume_hash"], features[i]["embedding"]) for i in missing], model_id)
+            recomputed["embeddings"] = len(missing)
+        similarities = compute_similarities(np.stack([f["embedding"] for f in features]), profile.jd_vector)
+    
+    # Skills and keywords: look terms up in the stored positions
+    terms = [term.lower() for term in profile.skills + profile.keywords]
+    rescanned = []
+    for feature in features:
+        scanned = feature_store.terms(feature["terms_version"])
+        unscanned = tuple(sorted({term for term in terms if term not in scanned}))
+        if unscanned:
+            feature["term_positions"].update(compile_term_matcher(unscanned).find(feature["text"].lower()))
+            version = feature_store.register_terms(scanned | set(unscanned))
+            rescanned.append((feature["resume_hash"], feature["term_positions"], version))
+    if rescanned:
+        feature_store.put_term_positions(rescanned)
+        recomputed["term_scans"] = len(rescanned)
+    
+    results = []
+    for feature, similarity in zip(features, similarities):
+        positions = feature["term_positions"]
+        found_skills = [skill for skill in profile.skills if skill.lower() in positions]
+        keyword_matches = sum(1 for keyword in profile.keywords if keyword in positions)
+        score = max(0.0, float(similarity) * 100) if similarity is not None and np.isfinite(similarity) else 0.0
+        detailed_scores = {
+            "overall_score": score,
+            "experience_score": feature["experience_score"],
+            "skills_score": min(100, int((len(found_skills) / len(profile.skills)) * 100)) if profile.skills else 0,
+            "keywords_score": min(100, int((keyword_matches / len(profile.keywords)) * 100)) if profile.keywords else 0,
+            "job_match": score,
+            "years_experience": feature["years_experience"],
+            "identified_skills": found_skills,
+            "resume_summary": feature["text"][:200] + "..." if len(feature["text"]) > 200 else feature["text"]
+        }
+        result = build_result(feature["filename"], {
+            "score": score, "resume_text": feature["text"], "detailed_scores": detailed_scores
+        })
+        result["FileHash"] = feature["resume_hash"]
+        results.append(result)
+    
+    results.sort(key=lambda x: x["Score"], reverse=True)
+    return results, recomputed
+
+# Re-rank already ingested resumes for a role without re-uploading them
+@app.route('/api/rescore', methods=['POST'])
+def rescore():
+    try:
+        if feature_store is None:
+            return jsonify({"error": "Feature store is disabled - set FEATURE_STORE_DB to enable it"}), 503
         
-        # Store detailed scores in state
-        state["detailed_scores"] = detailed_scores
+        payload = request.get_json(silent=True) or {}
+        job_role = payload.get("role", DEFAULT_ROLE)
+        if job_role not in get_role_profiles():
+            return jsonify({"error": f"Unknown role: {job_role}"}), 404
+        resume_hashes = payload.get("resume_hashes")
+        if resume_hashes is not None and not isinstance(resume_hashes, list):
+            return jsonify({"error": "resume_hashes must be a list"}), 400
+        shortlist = payload.get("shortlist", SHORTLIST_TOP_M)
+        if not isinstance(shortlist, int) or shortlist < 0:
+            return jsonify({"error": "shortlist must be a non-negative integer"}), 400
         
-        # Get filename safely
-        filename = "unknown"
-        try:
-            if hasattr(state.get("resume_file"), "filename"):
-                filename = state["resume_file"].filename
-        except:
-            pass
-            
-        logger.info(f"Final detailed scores for {filename}: Overall={detailed_scores['overall_score']:.2f}, Experience={detailed_scores['experience_score']}, Skills={detailed_scores['skills_score']}, Keywords={detailed_scores['keywords_score']}")
+        profile = get_role_profile(job_role)
+        start = time.perf_counter()
+        lexical_scores = None
+        if shortlist:
+            # Only the lexical top-M go through similarity and detailed scoring
+            lexical_scores = shortlist_pool(profile, shortlist, resume_hashes)
+            resume_hashes = list(lexical_scores)
+        results, recomputed = rescore_features(profile, resume_hashes)
+        if lexical_scores is not None:
+            for result in results:
+                result["LexicalScore"] = round(lexical_scores[result["FileHash"]], 3)
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage="rescore")
         
-    except Exception as e:
-        logger.error(f"Semantic matching error: {str(e)}")
-        import traceback
-        logger.error(f"Semantic matching traceback: {traceback.format_exc()}")
-        state["score"] = 0.0
-        state["detailed_scores"] = {
-            "overall_score": 0.0,
-            "experience_score": 0,
-            "skills_score": 0,
-            "keywords_score": 0,
-            "job_match": 0.0,
-            "years_experience": 0,
-            "identified_skills": [],
-            "resume_summary": "Error processing resume"
+        response = {
+            "role": profile.role,
+            "jd_version": profile.jd_version,
+            "skills_version": profile.skills_version,
+            "recomputed": recomputed,
+            "results": results,
+            "total": len(results)
         }
+        if lexical_scores is not None:
+            response["shortlist"] = {"m": shortlist, "pool": len(get_pool_index()[0])}
+        return jsonify(response), 200
         
-    return state
+    except Exception as e:
+        logger.error(f"Rescore API error: {str(e)}")
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
 
-# Build and compile the graph with StateGraph
-graph = StateGraph(GraphState)
-graph.add_node("parse_resume", parse_resume)
-graph.add_node("load_jd", load_jd)
-graph.add_node("semantic_match", semantic_match)
-graph.set_entry_point("parse_resume")
-graph.add_edge("parse_resume", "load_jd")
-graph.add_edge("load_jd", "semantic_match")
-graph.add_edge("semantic_match", END)
-app_graph = graph.compile()
-
-# Flask route for file upload and analysis with better error handling
-@app.route('/api/filter', methods=['POST'])
-def filter_resumes():
+# Recall of lexical shortlists against the exhaustive ranking of the stored pool
+@app.route('/api/shortlist/recall', methods=['POST'])
+def shortlist_recall():
     try:
-        logger.info("Received filter request")
-        
-        # Validate request
-        if 'resumes' not in request.files:
-            return jsonify({"error": "No resumes uploaded"}), 400
+        if feature_store is None:
+            return jsonify({"error": "Feature store is disabled - set FEATURE_STORE_DB to enable it"}), 503
         
-        if 'role' not in request.form:
-            return jsonify({"error": "No role specified"}), 400
-
-        files = request.files.getlist('resumes')
-        job_role = request.form['role']
+        payload = request.get_json(silent=True) or {}
+        job_role = payload.get("role", DEFAULT_ROLE)
+        if job_role not in get_role_profiles():
+            return jsonify({"error": f"Unknown role: {job_role}"}), 404
+        sizes = payload.get("m", [SHORTLIST_TOP_M or 100])
+        sizes = sizes if isinstance(sizes, list) else [sizes]
+        k = payload.get("k", 10)
+        if not sizes or not all(isinstance(m, int) and m > 0 for m in sizes + [k]):
+            return jsonify({"error": "m and k must be positive integers"}), 400
         
-        logger.info(f"Processing {len(files)} files for role: {job_role}")
+        return jsonify(shortlist_recall_report(get_role_profile(job_role), sizes, k)), 200
         
-        if not files or all(f.filename == '' for f in files):
-            return jsonify({"error": "No files selected"}), 400
+    except Exception as e:
+        logger.error(f"Shortlist recall API error: {str(e)}")
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+
+# Role JD and skill lists with their content versions
+def role_summary(profile: RoleProfile) -> dict:
+    return {
+        "role": profile.role,
+        "jd": profile.jd_text,
+        "skills": profile.skills,
+        "jd_version": profile.jd_version,
+        "skills_version": profile.skills_version
+    }
+
+@app.route('/api/roles')
+def list_roles():
+    return jsonify({"roles": [role_summary(profile) for profile in get_role_profiles().values()]}), 200
+
+# Edit a role's JD and/or skill list; later scoring and /api/rescore use the new version.
+# Edits are kept across restarts only with the feature store ("persisted" in the response).
+@app.route('/api/roles/<role>', methods=['PUT'])
+def edit_role(role):
+    try:
+        if role not in get_role_profiles():
+            return jsonify({"error": f"Unknown role: {role}"}), 404
         
-        results = []
+        payload = request.get_json(silent=True) or {}
+        current = get_role_profile(role)
+        jd_text = payload.get("jd", current.jd_text)
+        skills = payload.get("skills", current.skills)
+        if not isinstance(jd_text, str) or not jd_text.strip():
+            return jsonify({"error": "jd must be a non-empty string"}), 400
+        if not isinstance(skills, list) or not skills or not all(isinstance(s, str) and s.strip() for s in skills):
+            return jsonify({"error": "skills must be a non-empty list of strings"}), 400
+        skills = list(dict.fromkeys(s.strip() for s in skills))
         
-        for i, file in enumerate(files):
-            try:
-                logger.info(f"Processing file {i+1}/{len(files)}: {file.filename}")
-                
-                # Create initial state with detailed scores
-                state = GraphState(
-                    resume_text="", 
-                    jd_text="", 
-                    score=0.0, 
-                    resume_file=file, 
-                    job_role=job_role,
-                    detailed_scores={}
-                )
-                
-                # Process through the graph
-                final_state = app_graph.invoke(state)
-                
-                # Extract and validate results
-                score = final_state.get("score", 0.0)
-                resume_text = final_state.get("resume_text", "")
-                detailed_scores = final_state.get("detailed_scores", {})
-                
-                logger.info(f"Final state for {file.filename}: score={score}, text_length={len(resume_text)}")
-                
-                # Ensure score is valid
-                if not isinstance(score, (int, float)) or np.isnan(score) or np.isinf(score):
-                    logger.warning(f"Invalid final score for {file.filename}: {score}")
-                    score = 0.0
-                
-                # Prepare enhanced result with detailed breakdown
-                result = {
-                    "Resume": file.filename,
-                    "Score": round(float(score), 2),
-                    "Text": (resume_text[:200] + "...") if len(resume_text) > 200 else resume_text,
-                    "Status": "Success" if resume_text and resume_text != "Error parsing file" else "Error",
-                    
-                    # Detailed scoring breakdown for frontend
-                    "ExperienceScore": detailed_scores.get("experience_score", 0),
-                    "SkillsScore": detailed_scores.get("skills_score", 0),
-                    "KeywordsScore": detailed_scores.get("keywords_score", 0),
-                    "JobMatch": round(detailed_scores.get("job_match", 0.0), 1),
-                    "YearsExperience": detailed_scores.get("years_experience", 0),
-                    "IdentifiedSkills": detailed_scores.get("identified_skills", []),
-                    "ResumeSummary": detailed_scores.get("resume_summary", resume_text[:200] + "..." if resume_text else "")
-                }
-                
-                results.append(result)
-                logger.info(f"Processed {file.filename} with score: {result['Score']}")
-                
-            except Exception as file_error:
-                logger.error(f"Error processing {file.filename}: {str(file_error)}")
-                results.append({
-                    "Resume": file.filename,
-                    "Score": 0.0,
-                    "Text": "Error processing file",
-                    "Status": "Error",
-                    "ExperienceScore": 0,
-                    "SkillsScore": 0,
-                    "KeywordsScore": 0,
-                    "JobMatch": 0.0,
-                    "YearsExperience": 0,
-                    "IdentifiedSkills": [],
-                    "ResumeSummary": "Error processing file"
-                })
-        
-        # Sort results by score in descending order
-        results.sort(key=lambda x: x["Score"], reverse=True)
+        if feature_store is None and WORKER_INFO["workers"] > 1:
+            return jsonify({
+                "error": "Role edits need FEATURE_STORE_DB when serving with more than one worker, "
+                         "otherwise only the worker handling this request would see them"
+            }), 409
         
-        logger.info(f"Successfully processed {len(results)} files")
-        return jsonify({"results": results, "total": len(results)}), 200
+        profile = update_role_profile(role, jd_text, skills)
+        persisted = feature_store is not None
+        if persisted:
+            feature_store.save_role_override(role, jd_text, skills)
+        else:
+            logger.warning(f"Role {role} was edited in memory only and reverts on restart - set FEATURE_STORE_DB to persist role edits")
+        logger.info(f"Updated role {role}: jd_version={profile.jd_version}, skills_version={profile.skills_version}")
+        return jsonify(dict(role_summary(profile), persisted=persisted)), 200
         
     except Exception as e:
-        logger.error(f"API error: {str(e)}")
+        logger.error(f"Role update error: {str(e)}")
         return jsonify({"error": f"Server error: {str(e)}"}), 500
 
 # Route for the main page
@@ -594,12 +3861,382 @@ def filter_resumes():
 def index():
     return render_template('index.html')
 
+# Load the model, role profiles and graphs so the first real request does not pay for them
+def warm_up() -> dict:
+    with startup_phase("warmup"):
+        get_embeddings()
+        get_role_profiles()
+        get_app_graph()
+        get_prepare_graph()
+    return dict(STARTUP_TIMINGS)
+
+# Record time-to-first-request once
+@app.before_request
+def record_first_request():
+    if "first_request" not in STARTUP_TIMINGS:
+        STARTUP_TIMINGS["first_request"] = round(time.perf_counter() - PROCESS_START, 4)
+
+# Pre-fork workers share role edits through the feature store; pick up any made by a sibling
+@app.before_request
+def sync_worker_roles():
+    if WORKER_INFO["workers"] <= 1 or feature_store is None or request.endpoint in ("health_check", "metrics", "static"):
+        return
+    try:
+        sync_role_overrides()
+    except Exception as e:
+        logger.error(f"Could not sync role edits: {e}")
+
+# Warm-up endpoint for lazy start-up mode
+@app.route('/api/warmup', methods=['POST'])
+def warmup():
+    try:
+        timings = warm_up()
+        return jsonify({
+            "status": "ready",
+            "model_loaded": _embeddings_state == "loaded",
+            "embedding_backend": _embeddings.name if _embeddings else None,
+            "startup": timings
+        }), 200
+    except Exception as e:
+        logger.error(f"Warm-up error: {str(e)}")
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+
+# Compress buffered responses with brotli or gzip, whichever the client prefers.
+# Streamed responses (NDJSON) and static files are sent unchanged.
+@app.after_request
+def compress_response(response):
+    if (response.direct_passthrough or response.is_streamed
+            or "Content-Encoding" in response.headers or not 200 <= response.status_code < 300):
+        return response
+    
+    encoding = request.accept_encodings.best_match(["br", "gzip"] if BROTLI_AVAILABLE else ["gzip"])
+    data = response.get_data()
+    if encoding is None or len(data) < COMPRESS_MIN_BYTES:
+        return response
+    
+    if encoding == "br":
+        response.set_data(brotli.compress(data, quality=BROTLI_QUALITY))
+    else:
+        response.set_data(gzip.compress(data, GZIP_LEVEL))
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    return response
+
+# Self time per component, so a profile shows at a glance whether a request went to
+# parsing, the model, numpy, LangGraph, regex scanning or SQLite
+PROFILE_COMPONENTS = (
+    ("pdf", ("fitz", "pymupdf")),
+    ("docx", ("docx2txt", "/docx/", "zipfile", "xml")),
+    ("model", ("torch", "transformers", "sentence_transformers", "tokenizers", "onnxruntime")),
+    ("langgraph", ("langgraph", "langchain")),
+    ("regex", ("re.Pattern", "/re/", "sre_")),
+    ("numpy", ("numpy",)),
+    ("sqlite", ("sqlite3",)),
+    ("flask", ("flask", "werkzeug")),
+    ("app", (os.path.abspath(__file__),))
+)
+
+def profile_component(filename: str, function: str) -> str:
+    location = f"{filename}:{function}"
+    for component, markers in PROFILE_COMPONENTS:
+        if any(marker in location for marker in markers):
+            return component
+    return "other"
+
+# Summarize a finished profile: hottest functions by self time, self time per
+# component, allocation peak and the biggest allocation sites
+def summarize_profile(profiler: cProfile.Profile, snapshot, peak_bytes: int, top_n: int) -> dict:
+    stats = pstats.Stats(profiler).stats
+    components = {}
+    rows = []
+    for (filename, line, function), (_, calls, self_time, cumulative, _) in stats.items():
+        component = profile_component(filename, function)
+        components[component] = components.get(component, 0.0) + self_time
+        rows.append({
+            "function": f"{filename}:{line}({function})" if line else function,
+            "component": component,
+            "calls": calls,
+            "self_seconds": round(self_time, 6),
+            "cumulative_seconds": round(cumulative, 6)
+        })
+    return {
+        "hot_functions": heapq.nlargest(top_n, rows, key=lambda row: row["self_seconds"]),
+        "cumulative": heapq.nlargest(top_n, rows, key=lambda row: row["cumulative_seconds"]),
+        "components": {name: round(seconds, 6) for name, seconds in sorted(components.items(), key=lambda item: -item[1])},
+        "memory": {
+            "peak_mb": round(peak_bytes / (1024 * 1024), 2),
+            "top_allocations": [
+                {"site": str(stat.traceback), "size_kb": round(stat.size / 1024, 1), "count": stat.count}
+                for stat in snapshot.statistics("lineno")[:top_n]
+            ]
+        }
+    }
+
+# tracemalloc is process-wide, so only one request is profiled at a time
+_profile_lock = threading.Lock()
+
+def start_profiling():
+    supplied = request.headers.get("X-Profile-Token")
+    if not supplied or not hmac.compare_digest(supplied.encode(), PROFILE_TOKEN.encode()):
+        return None
+    if not _profile_lock.acquire(blocking=False):
+        g.profile_busy = True
+        return None
+    _profiling.active = True
+    tracemalloc.start()
+    g.profile = {"id": uuid.uuid4().hex, "started": time.perf_counter(), "cache": resume_cache.stats(), "profiler": cProfile.Profile()}
+    g.profile["profiler"].enable()
+    return None
+
+def finish_profiling(response):
+    if g.pop("profile_busy", False):
+        response.headers["X-Profile-Status"] = "busy"
+    profile = g.pop("profile", None)
+    if profile is None:
+        return response
+    
+    try:
+        profile["profiler"].disable()
+        wall_seconds = time.perf_counter() - profile["started"]
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+        _profiling.active = False
+        _profile_lock.release()
+    
+    cache_before, cache_after = profile["cache"], resume_cache.stats()
+    summary = dict(
+        id=profile["id"],
+        endpoint=request.endpoint,
+        status=response.status_code,
+        wall_seconds=round(wall_seconds, 4),
+        streamed=response.is_streamed,
+        cache={key: cache_after[key] - cache_before[key] for key in ("text_hits", "embedding_hits", "text_misses", "embedding_misses")},
+        **summarize_profile(profile["profiler"], snapshot, peak_bytes, PROFILE_TOP_N)
+    )
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profile["profiler"].dump_stats(os.path.join(PROFILE_DIR, f"{profile['id']}.prof"))
+        with open(os.path.join(PROFILE_DIR, f"{profile['id']}.json"), "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    except OSError as e:
+        logger.error(f"Could not save profile {profile['id']}: {e}")
+    logger.info(f"Profiled {request.endpoint} in {wall_seconds:.3f}s - saved as {profile['id']}")
+    
+    response.headers["X-Profile-Id"] = profile["id"]
+    # Buffered JSON bodies carry the summary too; streamed bodies run after this hook,
+    # so their profile only covers the work done before the first chunk
+    if response.is_json and not response.is_streamed:
+        body = response.get_json(silent=True)
+        if isinstance(body, dict):
+            body["profile"] = summary
+            response.set_data(json.dumps(body))
+    return response
+
+# Clean up when the request failed before finish_profiling ran
+def abandon_profiling(exc):
+    profile = g.pop("profile", None)
+    if profile is not None:
+        profile["profiler"].disable()
+        tracemalloc.stop()
+        _profiling.active = False
+        _profile_lock.release()
+
+# Registered after compress_response so the summary is added before compression
+if PROFILE_TOKEN:
+    app.before_request(start_profiling)
+    app.after_request(finish_profiling)
+    app.teardown_request(abandon_profiling)
+
+# Prometheus scrape endpoint
+@app.route('/metrics')
+def metrics():
+    return Response(METRICS.render(), mimetype="text/plain; version=0.0.4")
+
+# Serving worker identity - index is None outside pre-fork serving, where workers is 1
+WORKER_INFO = {"index": None, "threads": None, "workers": 1}
+
+# Memory of this process in MB. PSS divides shared pages (the copy-on-write model
+# weights of pre-fork workers) between the processes that map them.
+def process_memory() -> dict:
+    memory = {"pid": os.getpid()}
+    try:
+        with open("/proc/self/smaps_rollup", encoding="utf-8") as f:
+            fields = {line.split(":")[0]: int(line.split()[1]) for line in f if line.split()[-1:] == ["kB"]}
+    except OSError:
+        return memory
+    memory.update(
+        rss_mb=round(fields.get("Rss", 0) / 1024, 1),
+        pss_mb=round(fields.get("Pss", 0) / 1024, 1),
+        shared_mb=round((fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0)) / 1024, 1),
+        private_mb=round((fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)) / 1024, 1)
+    )
+    return memory
+
 # Health check endpoint
 @app.route('/api/health')
 def health_check():
-    return jsonify({"status": "healthy", "message": "Resume filtering service is running"}), 200
+    # Ready once loading the model has been attempted (a failed load falls back to lexical scoring)
+    return jsonify({
+        "status": "healthy",
+        "message": "Resume filtering service is running",
+        "ready": _embeddings_state != "not_loaded" and _role_profiles is not None,
+        "model_loaded": _embeddings_state == "loaded",
+        "model_state": _embeddings_state,
+        "embedding_backend": _embeddings.name if _embeddings else None,
+        "startup": STARTUP_TIMINGS,
+        "cache": resume_cache.stats(),
+        "feature_store": feature_store.stats() if feature_store is not None else None,
+        "worker": dict(WORKER_INFO, memory=process_memory()),
+        "admission": admission.stats()
+    }), 200
+
+# Health and metrics only, without the main app's request hooks, for the dedicated listener
+health_app = Flask(__name__)
+health_app.add_url_rule('/api/health', view_func=health_check)
+health_app.add_url_rule('/metrics', view_func=metrics)
+
+# Serve health_app from a daemon thread; listener is a socket shared by pre-fork workers
+def start_health_server(port: int, listener: socket.socket = None):
+    from werkzeug.serving import make_server
+    if listener is None and not port:
+        return
+    try:
+        if listener is not None:
+            host, port = listener.getsockname()[:2]
+            server = make_server(host, port, health_app, threaded=True, fd=listener.fileno())
+        else:
+            server = make_server("0.0.0.0", port, health_app, threaded=True)
+    except (OSError, SystemExit) as e:
+        # make_server exits on bind errors; the main server should still start
+        logger.error(f"Could not start the health server on port {port}: {e}")
+        return
+    threading.Thread(target=server.serve_forever, name="health-server", daemon=True).start()
+    logger.info(f"Health and metrics also served on port {port}")
+
+# Size torch's intra-op thread pool for this process
+def set_worker_threads(threads: int):
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(threads)
+
+# Reset per-process state in a freshly forked serving worker
+def after_fork(index: int, threads: int):
+    global resume_cache, feature_store, _extract_pool
+    WORKER_INFO.update(index=index, threads=threads)
+    random.seed()  # otherwise every worker samples the same log lines
+    set_worker_threads(threads)
+    if _embeddings is not None:
+        _embeddings.after_fork(threads)
+    # SQLite connections must not be shared across fork; the embedding scheduler and
+    # the extraction pool start their own thread and processes on first use
+    embedding_scheduler.reset()
+    resume_cache = ResumeCache(RESUME_CACHE_SIZE, RESUME_CACHE_DB)
+    feature_store = open_feature_store(FEATURE_STORE_DB)
+    _extract_pool = None
+    if index > 0:
+        job_manager.recover_before = 0.0
+    job_manager.start()
+
+def run_worker(index: int, listener: socket.socket, threads: int, health_listener: socket.socket = None):
+    from werkzeug.serving import make_server
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    after_fork(index, threads)
+    if health_listener is not None:
+        start_health_server(0, health_listener)
+    host, port = listener.getsockname()[:2]
+    server = make_server(host, port, app, threaded=True, fd=listener.fileno())
+    logger.info(f"Worker {index} (pid {os.getpid()}) serving with {threads} threads")
+    server.serve_forever()
+
+# Production entry point: load the model, role profiles and graphs once, then fork
+# workers that share those pages copy-on-write and accept on one listening socket.
+# Workers that exit are replaced; SIGTERM or SIGINT stops them all.
+def serve_prefork(host: str, port: int, workers: int, threads: int, health_port: int = 0):
+    global result_store
+    WORKER_INFO["workers"] = workers
+    if workers > 1:
+        # The next page of a result set may be requested from any worker
+        result_store = SharedResultStore(RESULT_STORE_SIZE, RESULT_TTL_SECONDS, RESULT_STORE_DIR)
+        if feature_store is None:
+            logger.warning("FEATURE_STORE_DB is not set - role edits are refused with more than one worker")
+    # Load the weights, then keep the JD forward passes single-threaded so no thread
+    # pool exists at fork time; each worker sizes its own afterwards
+    get_embeddings()
+    set_worker_threads(1)
+    warm_up()
+    # Warm-up embedded the JDs through the scheduler; its thread must not exist at fork
+    embedding_scheduler.stop()
+    job_manager.recover_before = time.time()
+    
+    listener = socket.create_server((host, port), backlog=256)
+    health_listener = socket.create_server((host, health_port)) if health_port else None
+    # Move the warmed-up objects out of the collector's reach so collections in the
+    # workers do not write to (and un-share) their pages
+    gc.collect()
+    gc.freeze()
+    
+    children = {}
+    
+    def spawn(index: int):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                run_worker(index, listener, threads, health_listener)
+            except Exception as e:
+                logger.error(f"Worker {index} failed: {e}")
+            finally:
+                os._exit(1)
+        children[pid] = index
+    
+    def stop(signum, frame):
+        raise SystemExit(0)
+    
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    logger.info(f"Pre-fork server on {host}:{port} with {workers} workers x {threads} threads")
+    try:
+        for index in range(workers):
+            spawn(index)
+        while True:
+            pid, status = os.wait()
+            index = children.pop(pid, None)
+            if index is not None:
+                logger.warning(f"Worker {index} (pid {pid}) exited with status {status}, restarting")
+                time.sleep(1)  # do not spin if workers fail straight away
+                spawn(index)
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in children:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+
+# Eager start-up: load everything at import unless LAZY_STARTUP is set (pre-fork
+# serving loads in serve_prefork instead)
+if not LAZY_STARTUP and not SERVE_PREFORK:
+    warm_up()
+STARTUP_TIMINGS["module"] = round(time.perf_counter() - PROCESS_START, 4)
 
 
 if __name__ == "__main__":
+    if sys.argv[1:2] == ["embedding-parity"]:
+        # python app.py embedding-parity [backend] - compare a backend with the PyTorch reference
+        print(json.dumps(check_embedding_parity(*sys.argv[2:3]), indent=2))
+        sys.exit(0)
+    
     port = int(os.environ.get("PORT", 7860))  # Render will provide PORT
+    if SERVE_PREFORK:
+        # python app.py serve - SERVE_WORKERS forked workers sharing one copy of the model
+        serve_prefork("0.0.0.0", port, SERVE_WORKERS, WORKER_THREADS, HEALTH_PORT)
+        sys.exit(0)
+    job_manager.start()
+    start_health_server(HEALTH_PORT)
     app.run(host="0.0.0.0", port=port)
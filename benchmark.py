@@ -0,0 +1,314 @@
+"""Reproducible benchmark for the resume filtering pipeline.
+
+Generates a seeded synthetic corpus of PDF, DOCX and TXT resumes and measures
+parse_resume, compute_detailed_scores, the compiled app_graph and the
+/api/filter endpoint (through the Flask test client) at several batch sizes.
+
+    python benchmark.py --resumes 64 --batch-sizes 1,8,32 --output bench.json
+    python benchmark.py --compare bench_old.json --output bench_new.json
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+# Vocabulary used for the synthetic resumes
+SKILL_POOL = [
+    "python", "java", "javascript", "react", "node.js", "sql", "git", "html", "css", "docker",
+    "kubernetes", "aws", "azure", "mongodb", "postgresql", "rest api", "microservices", "agile",
+    "scrum", "ci/cd", "excel", "tableau", "power bi", "pandas", "numpy", "matplotlib", "etl",
+    "roadmap", "user research", "a/b testing", "stakeholder management", "leadership"
+]
+FILLER_WORDS = [
+    "designed", "built", "maintained", "improved", "delivered", "led", "team", "customers",
+    "platform", "services", "reports", "pipelines", "features", "quality", "performance",
+    "project", "analysis", "stakeholders", "release", "production", "testing", "metrics"
+]
+FORMATS = ("pdf", "docx", "txt")
+
+
+# Synthetic resume text with seeded skills and years of experience
+def generate_resume_text(rng: random.Random, words: int) -> tuple:
+    years = rng.randint(0, 15)
+    skills = rng.sample(SKILL_POOL, rng.randint(3, 10))
+    lines = [
+        f"Candidate {rng.randint(1000, 9999)}",
+        f"Professional with {years} years of experience in {', '.join(skills)}.",
+    ]
+    body = [rng.choice(FILLER_WORDS + skills) for _ in range(max(0, words - 20))]
+    for start in range(0, len(body), 12):
+        lines.append(" ".join(body[start:start + 12]) + ".")
+    return "\n".join(lines), {"years": years, "skills": skills}
+
+
+def make_pdf(text: str, pages: int) -> bytes:
+    import fitz
+    doc = fitz.open()
+    lines = text.split("\n")
+    per_page = max(1, -(-len(lines) // pages))
+    for start in range(0, len(lines), per_page):
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(50, 50, 550, 800), "\n".join(lines[start:start + per_page]), fontsize=9)
+    while doc.page_count < pages:
+        doc.new_page()
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def make_docx(text: str) -> bytes:
+    from docx import Document
+    document = Document()
+    for line in text.split("\n"):
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def generate_corpus(count: int, seed: int, words: int, pages: int, formats: tuple) -> list:
+    """Return [(filename, bytes, metadata)] with formats assigned round-robin"""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(count):
+        text, meta = generate_resume_text(rng, words)
+        file_format = formats[i % len(formats)]
+        if file_format == "pdf":
+            data = make_pdf(text, pages)
+        elif file_format == "docx":
+            data = make_docx(text)
+        else:
+            data = text.encode("utf-8")
+        meta.update(format=file_format, bytes=len(data))
+        corpus.append((f"resume_{seed}_{i:05d}.{file_format}", data, meta))
+    return corpus
+
+
+# Reset the kernel's peak-RSS watermark so the next reading covers one stage only.
+# Linux-only; elsewhere peak_rss_mb keeps reporting the process-lifetime peak.
+def reset_peak_rss() -> bool:
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+# Peak resident set size in MB since the last reset_peak_rss
+def peak_rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(q / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def summarize(latencies: list, resumes: int, elapsed: float) -> dict:
+    return {
+        "calls": len(latencies),
+        "resumes": resumes,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "resumes_per_sec": round(resumes / elapsed, 2) if elapsed > 0 else 0.0,
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+
+def uploads(app_module, documents: list) -> list:
+    return [app_module.FileStorage(stream=io.BytesIO(data), filename=name) for name, data, _ in documents]
+
+
+def reset_state(app_module, store_dir: str):
+    """Give a stage cold caches so it pays for parsing, embedding and scoring every resume"""
+    app_module.resume_cache = app_module.ResumeCache(app_module.RESUME_CACHE_SIZE)
+    # Otherwise repeated uploads of the corpus are skipped as near-duplicates
+    app_module.near_duplicate_index = app_module.NearDuplicateIndex(
+        app_module.DEDUP_THRESHOLD, app_module.DEDUP_NUM_PERM, app_module.DEDUP_INDEX_SIZE
+    )
+    # Keep feature-store writes in the measurement when enabled, but never touch the real store
+    if app_module.FEATURE_STORE_DB:
+        app_module.feature_store = app_module.open_feature_store(
+            os.path.join(store_dir, f"features_{time.perf_counter_ns()}.db")
+        )
+
+
+def begin_stage(app_module, store_dir: str):
+    reset_state(app_module, store_dir)
+    reset_peak_rss()
+
+
+def new_state(app_module, file, job_role: str) -> dict:
+    return app_module.GraphState(
+        resume_text="", jd_text="", score=0.0, resume_file=file,
+        job_role=job_role, detailed_scores={}, resume_hash=""
+    )
+
+
+def bench_parse(app_module, store_dir: str, corpus: list, job_role: str) -> dict:
+    begin_stage(app_module, store_dir)
+    latencies = []
+    start = time.perf_counter()
+    for file in uploads(app_module, corpus):
+        t0 = time.perf_counter()
+        app_module.parse_resume(new_state(app_module, file, job_role))
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, len(corpus), time.perf_counter() - start)
+
+
+def bench_scores(app_module, store_dir: str, texts: list, job_role: str) -> dict:
+    jd_text = app_module.get_role_profile(job_role).jd_text
+    begin_stage(app_module, store_dir)
+    latencies = []
+    start = time.perf_counter()
+    for text in texts:
+        t0 = time.perf_counter()
+        app_module.compute_detailed_scores(text, jd_text, job_role)
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, len(texts), time.perf_counter() - start)
+
+
+def bench_graph(app_module, store_dir: str, corpus: list, job_role: str) -> dict:
+    begin_stage(app_module, store_dir)
+    graph = app_module.get_app_graph()
+    latencies = []
+    start = time.perf_counter()
+    for file in uploads(app_module, corpus):
+        t0 = time.perf_counter()
+        graph.invoke(new_state(app_module, file, job_role))
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, len(corpus), time.perf_counter() - start)
+
+
+def bench_endpoint(app_module, store_dir: str, corpus: list, job_role: str, batch_size: int) -> dict:
+    begin_stage(app_module, store_dir)
+    client = app_module.app.test_client()
+    latencies = []
+    start = time.perf_counter()
+    for offset in range(0, len(corpus), batch_size):
+        batch = corpus[offset:offset + batch_size]
+        data = {"role": job_role, "resumes": [(io.BytesIO(blob), name) for name, blob, _ in batch]}
+        t0 = time.perf_counter()
+        response = client.post("/api/filter", data=data, content_type="multipart/form-data")
+        latencies.append(time.perf_counter() - t0)
+        if response.status_code != 200:
+            raise RuntimeError(f"/api/filter returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+    return summarize(latencies, len(corpus), time.perf_counter() - start)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except Exception:
+        return ""
+
+
+# Print throughput and p95 changes against an earlier report
+def compare_reports(old: dict, new: dict):
+    print(f"\nComparison {old.get('commit', '?')[:10]} -> {new.get('commit', '?')[:10]}")
+    for key, stats in new["stages"].items():
+        before = old.get("stages", {}).get(key)
+        if not before:
+            continue
+        rate_change = (stats["resumes_per_sec"] / before["resumes_per_sec"] - 1) * 100 if before["resumes_per_sec"] else 0.0
+        p95_change = (stats["p95_ms"] / before["p95_ms"] - 1) * 100 if before["p95_ms"] else 0.0
+        print(f"  {key:<24} resumes/s {before['resumes_per_sec']:>9} -> {stats['resumes_per_sec']:<9} ({rate_change:+.1f}%)"
+              f"  p95 {before['p95_ms']:>9} -> {stats['p95_ms']:<9} ({p95_change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=32, help="resumes per stage")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--words", type=int, default=400, help="words per resume")
+    parser.add_argument("--pages", type=int, default=2, help="pages per PDF resume")
+    parser.add_argument("--formats", default=",".join(FORMATS), help="comma-separated subset of pdf,docx,txt")
+    parser.add_argument("--role", default="software-engineer")
+    parser.add_argument("--batch-sizes", default="1,8,32", help="batch sizes for the /api/filter stage")
+    parser.add_argument("--stages", default="parse,scores,graph,endpoint")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="earlier JSON report to compare against")
+    args = parser.parse_args()
+
+    formats = tuple(f for f in args.formats.split(",") if f in FORMATS)
+    stages = set(args.stages.split(","))
+    batch_sizes = [int(size) for size in args.batch_sizes.split(",") if size]
+
+    started = time.perf_counter()
+    import app as app_module
+    import_seconds = time.perf_counter() - started
+    app_module.warm_up()
+
+    corpus = generate_corpus(args.resumes, args.seed, args.words, args.pages, formats)
+    texts = [app_module.extract_text(name, data)[0] for name, data, _ in corpus]
+
+    rss_scope = "stage" if reset_peak_rss() else "process"
+    results = {}
+    with tempfile.TemporaryDirectory() as store_dir:
+        if "parse" in stages:
+            results["parse_resume"] = bench_parse(app_module, store_dir, corpus, args.role)
+        if "scores" in stages:
+            results["compute_detailed_scores"] = bench_scores(app_module, store_dir, texts, args.role)
+        if "graph" in stages:
+            results["app_graph"] = bench_graph(app_module, store_dir, corpus, args.role)
+        if "endpoint" in stages:
+            for batch_size in batch_sizes:
+                results[f"api_filter_batch_{batch_size}"] = bench_endpoint(app_module, store_dir, corpus, args.role, batch_size)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": {
+            "resumes": args.resumes, "seed": args.seed, "words": args.words, "pages": args.pages,
+            "formats": list(formats), "role": args.role, "batch_sizes": batch_sizes,
+            "embedding_backend": app_module.EMBEDDING_BACKEND,
+            "embed_batch_size": app_module.EMBED_BATCH_SIZE,
+            "embed_chunking": app_module.EMBED_CHUNKING,
+            "extract_workers": app_module.EXTRACT_WORKERS
+        },
+        "peak_rss_scope": rss_scope,
+        "import_seconds": round(import_seconds, 3),
+        "startup": app_module.STARTUP_TIMINGS,
+        "stages": results
+    }
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    for key, stats in results.items():
+        print(f"{key:<28} p50={stats['p50_ms']:>9}ms p95={stats['p95_ms']:>9}ms p99={stats['p99_ms']:>9}ms "
+              f"{stats['resumes_per_sec']:>9} resumes/s  peak RSS {stats['peak_rss_mb']} MB")
+    print(f"Report written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare_reports(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
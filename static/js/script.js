@@ -1,7 +1,9 @@
 // ResumeAI - Enhanced JavaScript Functionality with Job Role Integration
 
 // Global variables
-let currentResults = [];
+let currentResults = []; // rows of the page on screen (the top rows while results stream in)
+let resultSetId = null; // server-side result set, paged through /api/results once the stream ends
+let resultStats = emptyResultStats();
 let currentPage = 1;
 let itemsPerPage = 10;
 let sortOrder = { column: "score", direction: "desc" };
@@ -104,14 +106,15 @@ function initializeUploadPage() {
 
   function handleFiles(files) {
     const supportedTypes = [
-      "application/pdf", "application/msword", "application/vnd.openxmlformats-officedocument.wordprocessingml.document", "text/plain"
+      "application/pdf", "application/msword", "application/vnd.openxmlformats-officedocument.wordprocessingml.document", "text/plain",
+      "application/zip", "application/x-zip-compressed"
     ];
 
     for (let i = 0; i < files.length; i++) {
       const file = files[i];
       const fileExtension = file.name.split(".").pop().toLowerCase();
 
-      if (supportedTypes.includes(file.type) || ["pdf", "doc", "docx", "txt"].includes(fileExtension)) {
+      if (supportedTypes.includes(file.type) || ["pdf", "doc", "docx", "txt", "zip"].includes(fileExtension)) {
         const existingFile = uploadedFiles.find((f) => f.name === file.name);
         if (existingFile) {
           showErrorAlert(`File "${file.name}" is already uploaded.`);
@@ -137,14 +140,14 @@ function initializeUploadPage() {
         `;
         fileList.appendChild(listItem);
       } else {
-        showErrorAlert(`Unsupported file type: "${file.name}". Please upload PDF, DOC, DOCX, or TXT files.`);
+        showErrorAlert(`Unsupported file type: "${file.name}". Please upload PDF, DOC, DOCX, TXT or ZIP files.`);
       }
     }
     updateSubmitButtonState();
   }
 
   function getFileIcon(extension) {
-    const icons = { pdf: "fas fa-file-pdf text-danger", doc: "fas fa-file-word text-primary", docx: "fas fa-file-word text-primary", txt: "fas fa-file-alt text-info" };
+    const icons = { pdf: "fas fa-file-pdf text-danger", doc: "fas fa-file-word text-primary", docx: "fas fa-file-word text-primary", txt: "fas fa-file-alt text-info", zip: "fas fa-file-archive text-warning" };
     return icons[extension] || "fas fa-file";
   }
 
@@ -206,42 +209,157 @@ function initializeUploadPage() {
   }
   formData.append("role", selectedJobRole);
 
+  currentResults = [];
+  resultSetId = null;
+  resultStats = emptyResultStats();
+  currentPage = 1;
+  let modalVisible = true;
+  const hideLoadingModal = async () => {
+    if (!modalVisible) return;
+    modalVisible = false;
+    await new Promise(resolve => setTimeout(resolve, 500)); // Delay for error visibility
+    loadingModal.hide();
+  };
+
   try {
-    const response = await fetch("/api/filter", { method: "POST", body: formData });
-    const data = await response.json();
-    if (response.ok) {
-      currentResults = data.results.map(result => ({
-        name: result.Resume.replace(/\.(pdf|doc|docx|txt)$/, ""),
-        score: result.Score,
-        experienceScore: result.ExperienceScore,
-        skillsScore: result.SkillsScore,
-        keywordsScore: result.KeywordsScore,
-        jobMatch: result.JobMatch,
-        yearsExperience: result.YearsExperience,
-        skills: result.IdentifiedSkills,
-        text: result.ResumeSummary,
-        jobRole: selectedJobRole,
-        breakdown: { experience: result.ExperienceScore, skills: result.SkillsScore, keywords: result.KeywordsScore }
-      }));
-      showResultsPreview(currentResults); // Render results first
-      // Add a small delay to ensure UI updates before hiding modal
-      await new Promise(resolve => setTimeout(resolve, 500));
-      loadingModal.hide();
-      showSuccessAlert(`${currentResults.length} resumes analyzed successfully for ${getJobRoleDisplayName(selectedJobRole)}!`);
-    } else {
-      await new Promise(resolve => setTimeout(resolve, 500)); // Delay for error visibility
-      loadingModal.hide();
+    const response = await fetch("/api/filter/stream", { method: "POST", body: formData });
+    if (!response.ok || !response.body) {
+      const data = await response.json().catch(() => ({}));
+      await hideLoadingModal();
       showErrorAlert(data.error || "Analysis failed");
+      return;
+    }
+
+    // Results arrive as NDJSON: one scored resume per line, then a summary line
+    let streamError = null;
+    await readNdjson(response.body, (record) => {
+      if (record.type === "result") {
+        addStreamedResult(toCandidate(record.result));
+        showResultsPreview(resultStats.total === 1);
+        if (document.getElementById("resultsTableBody")) {
+          updateResultsStats();
+          updateResultsTable();
+        }
+        hideLoadingModal(); // Show the first rows as soon as they are ready
+      } else if (record.type === "summary") {
+        resultSetId = record.result_id;
+        resultStats = record.stats;
+        if (document.getElementById("resultsTableBody")) loadResultsPage(currentPage);
+      } else if (record.type === "error") {
+        streamError = record.error;
+      }
+    });
+
+    await hideLoadingModal();
+    if (streamError) {
+      showErrorAlert(streamError);
+    } else {
+      showSuccessAlert(`${resultStats.total} resumes analyzed successfully for ${getJobRoleDisplayName(selectedJobRole)}!`);
     }
   } catch (error) {
-    await new Promise(resolve => setTimeout(resolve, 500)); // Delay for error visibility
-    loadingModal.hide();
+    await hideLoadingModal();
     showErrorAlert("Network error during analysis");
     console.error(error);
   }
 }
 }
 
+// Read a newline-delimited JSON stream, calling onRecord for every parsed line
+async function readNdjson(body, onRecord) {
+  const reader = body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  while (true) {
+    const { value, done } = await reader.read();
+    buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
+    const lines = buffer.split("\n");
+    buffer = lines.pop();
+    lines.filter(line => line.trim()).forEach(line => onRecord(JSON.parse(line)));
+    if (done) break;
+  }
+  if (buffer.trim()) onRecord(JSON.parse(buffer));
+}
+
+// Convert an API result into the row format used by the results views
+function toCandidate(result) {
+  return {
+    name: result.Resume.replace(/\.(pdf|doc|docx|txt)$/, ""),
+    score: result.Score,
+    experienceScore: result.ExperienceScore,
+    skillsScore: result.SkillsScore,
+    keywordsScore: result.KeywordsScore,
+    jobMatch: result.JobMatch,
+    yearsExperience: result.YearsExperience,
+    skills: result.IdentifiedSkills,
+    text: result.ResumeSummary,
+    jobRole: selectedJobRole,
+    breakdown: { experience: result.ExperienceScore, skills: result.SkillsScore, keywords: result.KeywordsScore }
+  };
+}
+
+function emptyResultStats() {
+  return { total: 0, top_score: 0, avg_score: 0, qualified: 0 };
+}
+
+// Count a streamed result and keep only the top page of rows (highest score first)
+function addStreamedResult(candidate) {
+  const score = parseFloat(candidate.score);
+  resultStats.total += 1;
+  resultStats.top_score = resultStats.total === 1 ? score : Math.max(resultStats.top_score, score);
+  resultStats.avg_score += (score - resultStats.avg_score) / resultStats.total;
+  if (score >= 60) resultStats.qualified += 1;
+
+  const index = currentResults.findIndex(r => parseFloat(r.score) < score);
+  if (index === -1) currentResults.push(candidate);
+  else currentResults.splice(index, 0, candidate);
+  currentResults.length = Math.min(currentResults.length, itemsPerPage);
+}
+
+// Convert a columnar page ({field: [values]}) back into one object per result
+function fromColumns(columns) {
+  const fields = Object.keys(columns);
+  const count = fields.length ? columns[fields[0]].length : 0;
+  return Array.from({ length: count }, (_, i) => Object.fromEntries(fields.map(field => [field, columns[field][i]])));
+}
+
+// Fetch one page of the finished result set in the current sort order
+async function loadResultsPage(page) {
+  if (!resultSetId) return;
+  const params = new URLSearchParams({
+    offset: (page - 1) * itemsPerPage,
+    limit: itemsPerPage,
+    sort: sortOrder.column,
+    order: sortOrder.direction,
+    format: "columnar"
+  });
+  try {
+    const response = await fetch(`/api/results/${resultSetId}?${params}`);
+    const data = await response.json();
+    if (!response.ok) {
+      showErrorAlert(data.error || "Could not load results");
+      return;
+    }
+    currentPage = page;
+    currentResults = fromColumns(data.columns).map(toCandidate);
+    resultStats = data.stats;
+    updateResultsStats();
+    updateResultsTable();
+  } catch (error) {
+    showErrorAlert("Network error while loading results");
+    console.error(error);
+  }
+}
+
+// Show another page - fetched from the server once the full result set is available
+function goToPage(page) {
+  if (resultSetId) {
+    loadResultsPage(page);
+  } else {
+    currentPage = page;
+    updateResultsTable();
+  }
+}
+
 function getJobRoleDisplayName(roleKey) {
   const displayNames = {
     "software-engineer": "Software Engineer", "data-analyst": "Data Analyst",
@@ -250,39 +368,34 @@ function getJobRoleDisplayName(roleKey) {
   return displayNames[roleKey] || roleKey.replace("-", " ").replace(/\b\w/g, l => l.toUpperCase());
 }
 
-function showResultsPreview(results) {
+function showResultsPreview(scrollIntoView = true) {
   const resultsPreview = document.getElementById("resultsPreview");
   const resultsStats = document.getElementById("resultsStats");
 
   if (!resultsPreview || !resultsStats) return;
 
-  const scores = results.map(r => parseFloat(r.score));
-  const topScore = Math.max(...scores);
-  const avgScore = scores.reduce((sum, score) => sum + score, 0) / scores.length;
-  const qualifiedCount = scores.filter(score => score >= 60).length;
-
   resultsStats.innerHTML = `
     <div class="col-md-3 mb-3">
       <div class="stat-card">
-        <div class="stat-value">${results.length}</div>
+        <div class="stat-value">${resultStats.total}</div>
         <div class="stat-label">Total Resumes</div>
       </div>
     </div>
     <div class="col-md-3 mb-3">
       <div class="stat-card">
-        <div class="stat-value">${topScore.toFixed(1)}</div>
+        <div class="stat-value">${resultStats.top_score.toFixed(1)}</div>
         <div class="stat-label">Top Score</div>
       </div>
     </div>
     <div class="col-md-3 mb-3">
       <div class="stat-card">
-        <div class="stat-value">${avgScore.toFixed(1)}</div>
+        <div class="stat-value">${resultStats.avg_score.toFixed(1)}</div>
         <div class="stat-label">Average Score</div>
       </div>
     </div>
     <div class="col-md-3 mb-3">
       <div class="stat-card">
-        <div class="stat-value">${qualifiedCount}</div>
+        <div class="stat-value">${resultStats.qualified}</div>
         <div class="stat-label">Qualified (60+)</div>
       </div>
     </div>
@@ -290,7 +403,7 @@ function showResultsPreview(results) {
 
   resultsPreview.style.display = "block";
   resultsPreview.classList.add("animate-fade-in");
-  resultsPreview.scrollIntoView({ behavior: "smooth" });
+  if (scrollIntoView) resultsPreview.scrollIntoView({ behavior: "smooth" });
 }
 
 function viewDetailedResults() {
@@ -316,25 +429,25 @@ function createResultsPage() {
       <div class="row mb-5">
         <div class="col-lg-3 col-md-6 mb-3">
           <div class="stat-card">
-            <div class="stat-value" id="totalFiles">${currentResults.length}</div>
+            <div class="stat-value" id="totalFiles">${resultStats.total}</div>
             <div class="stat-label">Total Resumes</div>
           </div>
         </div>
         <div class="col-lg-3 col-md-6 mb-3">
           <div class="stat-card">
-            <div class="stat-value" id="topScore">${Math.max(...currentResults.map(r => parseFloat(r.score))).toFixed(1)}</div>
+            <div class="stat-value" id="topScore">${resultStats.top_score.toFixed(1)}</div>
             <div class="stat-label">Top Score</div>
           </div>
         </div>
         <div class="col-lg-3 col-md-6 mb-3">
           <div class="stat-card">
-            <div class="stat-value" id="avgScore">${(currentResults.reduce((sum, r) => sum + parseFloat(r.score), 0) / currentResults.length).toFixed(1)}</div>
+            <div class="stat-value" id="avgScore">${resultStats.avg_score.toFixed(1)}</div>
             <div class="stat-label">Average Score</div>
           </div>
         </div>
         <div class="col-lg-3 col-md-6 mb-3">
           <div class="stat-card">
-            <div class="stat-value" id="qualifiedCount">${currentResults.filter(r => parseFloat(r.score) >= 60).length}</div>
+            <div class="stat-value" id="qualifiedCount">${resultStats.qualified}</div>
             <div class="stat-label">Qualified (60+)</div>
           </div>
         </div>
@@ -361,7 +474,23 @@ function createResultsPage() {
   app.appendChild(resultsPage);
 
   initializeResultsPageFunctionality();
-  updateResultsTable();
+  if (resultSetId) loadResultsPage(currentPage);
+  else updateResultsTable();
+}
+
+// Refresh the stat cards on the results page (while streaming and after each page load)
+function updateResultsStats() {
+  if (resultStats.total === 0) return;
+  const stats = {
+    totalFiles: resultStats.total,
+    topScore: resultStats.top_score.toFixed(1),
+    avgScore: resultStats.avg_score.toFixed(1),
+    qualifiedCount: resultStats.qualified
+  };
+  Object.entries(stats).forEach(([id, value]) => {
+    const el = document.getElementById(id);
+    if (el) el.textContent = value;
+  });
 }
 
 function initializeResultsPageFunctionality() {
@@ -384,11 +513,7 @@ function renderTable() {
   if (!tableBody) return;
 
   tableBody.innerHTML = "";
-  const start = (currentPage - 1) * itemsPerPage;
-  const end = start + itemsPerPage;
-  const paginatedResults = currentResults.slice(start, end);
-
-  paginatedResults.forEach((resume) => {
+  currentResults.forEach((resume) => {
     const row = document.createElement("tr");
     row.innerHTML = `
       <td>
@@ -429,7 +554,9 @@ function renderPagination() {
   if (!pagination) return;
 
   pagination.innerHTML = "";
-  const pageCount = Math.ceil(currentResults.length / itemsPerPage);
+  // Only the top page is held while results stream in; the rest is fetched afterwards
+  if (!resultSetId) return;
+  const pageCount = Math.ceil(resultStats.total / itemsPerPage);
 
   if (pageCount <= 1) return;
 
@@ -438,27 +565,36 @@ function renderPagination() {
   if (currentPage === 1) prevItem.classList.add("disabled");
   prevItem.innerHTML = `<a class="page-link" href="#" data-page="${currentPage - 1}"><i class="fas fa-chevron-left"></i></a>`;
   if (currentPage > 1) {
-    prevItem.addEventListener("click", (e) => { e.preventDefault(); currentPage--; updateResultsTable(); });
+    prevItem.addEventListener("click", (e) => { e.preventDefault(); goToPage(currentPage - 1); });
   }
   pagination.appendChild(prevItem);
 
-  for (let i = 1; i <= pageCount; i++) {
+  // Link the first and last pages and a window around the current one
+  const pages = [...new Set([1, ...Array.from({ length: 5 }, (_, k) => currentPage - 2 + k), pageCount])]
+    .filter(i => i >= 1 && i <= pageCount);
+  pages.forEach((i, position) => {
+    if (position > 0 && i > pages[position - 1] + 1) {
+      const gapItem = document.createElement("li");
+      gapItem.classList.add("page-item", "disabled");
+      gapItem.innerHTML = `<span class="page-link">&hellip;</span>`;
+      pagination.appendChild(gapItem);
+    }
     const pageItem = document.createElement("li");
     pageItem.classList.add("page-item");
     if (i === currentPage) pageItem.classList.add("active");
     pageItem.innerHTML = `<a class="page-link" href="#" data-page="${i}">${i}</a>`;
     if (i !== currentPage) {
-      pageItem.addEventListener("click", (e) => { e.preventDefault(); currentPage = i; updateResultsTable(); });
+      pageItem.addEventListener("click", (e) => { e.preventDefault(); goToPage(i); });
     }
     pagination.appendChild(pageItem);
-  }
+  });
 
   const nextItem = document.createElement("li");
   nextItem.classList.add("page-item");
   if (currentPage === pageCount) nextItem.classList.add("disabled");
   nextItem.innerHTML = `<a class="page-link" href="#" data-page="${currentPage + 1}"><i class="fas fa-chevron-right"></i></a>`;
   if (currentPage < pageCount) {
-    nextItem.addEventListener("click", (e) => { e.preventDefault(); currentPage++; updateResultsTable(); });
+    nextItem.addEventListener("click", (e) => { e.preventDefault(); goToPage(currentPage + 1); });
   }
   pagination.appendChild(nextItem);
 }
@@ -488,7 +624,9 @@ function sortTable(column) {
     activeIcon.classList.add(newDirection === "asc" ? "fa-sort-up" : "fa-sort-down");
   }
 
-  updateResultsTable();
+  // Once the full result set is stored, sorting happens server-side across all pages
+  if (resultSetId) loadResultsPage(1);
+  else updateResultsTable();
 }
 
 function showCandidateModal(candidateName) {
@@ -614,6 +752,8 @@ function goBackToUpload() {
   const resultsPreview = document.getElementById("resultsPreview");
   if (resultsPreview) resultsPreview.style.display = "none";
   currentResults = [];
+  resultSetId = null;
+  resultStats = emptyResultStats();
   currentPage = 1;
 }
 
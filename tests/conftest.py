@@ -0,0 +1,61 @@
+import hashlib
+import os
+import re
+import sys
+import tempfile
+
+import numpy as np
+import pytest
+
+# Import the app without loading the embedding model, and keep every store it
+# opens out of the checkout
+_store_dir = tempfile.mkdtemp(prefix="resume-tests-")
+os.environ["LAZY_STARTUP"] = "1"
+os.environ["FEATURE_STORE_DB"] = ""
+os.environ["RESUME_CACHE_DB"] = ""
+os.environ["JOB_STORE_DIR"] = os.path.join(_store_dir, "jobs")
+os.environ["PROFILE_DIR"] = os.path.join(_store_dir, "profiles")
+# Extract in-process so the tests do not fork worker processes
+os.environ["EXTRACT_WORKERS"] = "0"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeBackend:
+    """Bag-of-words vectors, so similar texts get similar embeddings without a model download"""
+    name = "fake"
+    tokenizer = None
+    dimensions = 64
+
+    def __init__(self):
+        self.batches = []
+
+    def embed_documents(self, texts: list) -> list:
+        self.batches.append(len(texts))
+        vectors = []
+        for text in texts:
+            vector = np.zeros(self.dimensions)
+            for word in text.lower().split():
+                vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % self.dimensions] += 1
+            vectors.append(vector.tolist())
+        return vectors
+
+    def embed_query(self, text: str) -> list:
+        return self.embed_documents([text])[0]
+
+    def token_spans(self, text: str) -> list:
+        return [match.span() for match in re.finditer(r"\S+", text)]
+
+
+@pytest.fixture
+def fake_embeddings(monkeypatch):
+    """Score with FakeBackend through the direct (unscheduled) embedding path, with fresh
+    role profiles and caches"""
+    import app
+    backend = FakeBackend()
+    monkeypatch.setattr(app, "get_embeddings", lambda: backend)
+    monkeypatch.setattr(app, "EMBED_SCHEDULER", False)
+    monkeypatch.setattr(app, "_role_profiles", None)
+    monkeypatch.setattr(app, "resume_cache", app.ResumeCache(256))
+    monkeypatch.setattr(app, "near_duplicate_index", app.NearDuplicateIndex(app.DEDUP_THRESHOLD, app.DEDUP_NUM_PERM, 100))
+    return backend
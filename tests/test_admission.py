@@ -0,0 +1,83 @@
+import io
+
+import pytest
+
+import app
+
+
+def test_requests_within_the_limits_are_admitted():
+    controller = app.AdmissionController(max_resumes=10, max_bytes=1000)
+    assert controller.admit(resumes=4, nbytes=400) is None
+    assert controller.admit(resumes=6, nbytes=600) is None
+    assert controller.stats()["resumes"] == 10
+    assert controller.stats()["bytes"] == 1000
+
+
+def test_work_beyond_a_limit_is_shed():
+    controller = app.AdmissionController(max_resumes=10, max_bytes=1000)
+    controller.admit(resumes=8, nbytes=100)
+    assert controller.admit(resumes=3) == "resumes"
+    assert controller.admit(nbytes=901) == "bytes"
+    stats = controller.stats()
+    assert (stats["resumes"], stats["bytes"]) == (8, 100)
+    assert stats["rejected"] == {"resumes": 1, "bytes": 1, "embedding_queue": 0}
+
+
+def test_a_lone_oversized_request_is_admitted():
+    controller = app.AdmissionController(max_resumes=10, max_bytes=1000)
+    assert controller.admit(resumes=50) is None
+    assert controller.admit(resumes=1) == "resumes"
+    controller.release(50, 0)
+    assert controller.admit(nbytes=5000) is None
+
+
+def test_release_frees_capacity():
+    controller = app.AdmissionController(max_resumes=10, max_bytes=0)
+    controller.admit(resumes=10)
+    assert controller.admit(resumes=1) == "resumes"
+    controller.release(10, 0)
+    assert controller.admit(resumes=1) is None
+    assert controller.stats()["resumes"] == 1
+
+
+def test_zero_limits_disable_shedding():
+    controller = app.AdmissionController(max_resumes=0, max_bytes=0)
+    controller.admit(resumes=10 ** 6, nbytes=10 ** 12)
+    assert controller.admit(resumes=10 ** 6, nbytes=10 ** 12) is None
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    controller = app.AdmissionController(max_resumes=10, max_bytes=10 ** 6)
+    monkeypatch.setattr(app, "admission", controller)
+    return controller
+
+
+def post_filter(client):
+    return client.post(
+        "/api/filter",
+        data={"role": "software-engineer", "shortlist": "x", "resumes": [(io.BytesIO(b"python developer"), "a.txt")]},
+        content_type="multipart/form-data"
+    )
+
+
+def test_busy_server_answers_429_with_retry_after(controller):
+    controller.admit(nbytes=10 ** 6)
+    response = post_filter(app.app.test_client())
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == str(app.ADMISSION_RETRY_AFTER)
+
+
+def test_full_embedding_queue_answers_503(controller, monkeypatch):
+    monkeypatch.setattr(app, "EMBED_SCHEDULER", True)
+    monkeypatch.setattr(app.embedding_scheduler, "pending", lambda: app.EMBED_QUEUE_DEPTH)
+    response = post_filter(app.app.test_client())
+    assert response.status_code == 503
+    assert controller.stats()["rejected"]["embedding_queue"] == 1
+
+
+def test_reservation_is_released_after_the_request(controller):
+    # An invalid shortlist fails after the upload bytes were reserved
+    assert post_filter(app.app.test_client()).status_code == 400
+    stats = controller.stats()
+    assert (stats["resumes"], stats["bytes"]) == (0, 0)
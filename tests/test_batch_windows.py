@@ -0,0 +1,47 @@
+import io
+
+from werkzeug.datastructures import FileStorage
+
+import app
+from test_dedup import resume_text
+
+
+def uploads(*files):
+    return [FileStorage(stream=io.BytesIO(text.encode()), filename=name) for name, text in files]
+
+
+def test_batches_are_extracted_and_scored_one_window_at_a_time(fake_embeddings, monkeypatch):
+    monkeypatch.setattr(app, "SCORE_WINDOW", 2)
+    windows = []
+    extract_documents = app.extract_documents
+
+    def record(files):
+        windows.append([file.filename for file in files])
+        return extract_documents(files)
+    monkeypatch.setattr(app, "extract_documents", record)
+    progress = []
+    files = [(f"{i}.txt", resume_text(i)) for i in range(5)]
+    results = app.process_uploads(uploads(*files), "software-engineer", lambda stage, n: progress.append((stage, n)))
+    assert windows == [["0.txt", "1.txt"], ["2.txt", "3.txt"], ["4.txt"]]
+    assert [result["Resume"] for result in results] == [name for name, _ in files]
+    assert [n for stage, n in progress if stage == "scored"] == [2, 2, 1]
+
+
+def test_duplicates_are_linked_across_windows(fake_embeddings, monkeypatch):
+    monkeypatch.setattr(app, "SCORE_WINDOW", 2)
+    text = resume_text(1)
+    results = app.process_uploads(uploads(
+        ("x.txt", text), ("other.txt", resume_text(2)), ("copy.txt", text), ("x-edited.txt", text + " kubernetes")
+    ), "software-engineer")
+    assert [result.get("DuplicateOf") for result in results] == [None, None, "x.txt", "x.txt"]
+    assert results[2]["Score"] == results[3]["Score"] == results[0]["Score"]
+
+
+def test_shortlist_ranks_the_whole_batch_in_one_window(fake_embeddings, monkeypatch):
+    monkeypatch.setattr(app, "SCORE_WINDOW", 2)
+    windows = []
+    extract_documents = app.extract_documents
+    monkeypatch.setattr(app, "extract_documents", lambda files: windows.append(len(files)) or extract_documents(files))
+    results = app.process_uploads(uploads(*[(f"{i}.txt", resume_text(i)) for i in range(5)]), "software-engineer", shortlist=2)
+    assert windows == [5]
+    assert sum(1 for result in results if result["Status"] == "Filtered") == 3
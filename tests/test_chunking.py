@@ -0,0 +1,80 @@
+import re
+
+import numpy as np
+import pytest
+
+import app
+
+
+def spans(text):
+    return [match.span() for match in re.finditer(r"\S+", text)]
+
+
+def words(n, prefix="w"):
+    return " ".join(f"{prefix}{i}" for i in range(n))
+
+
+@pytest.fixture
+def chunking(monkeypatch, fake_embeddings):
+    monkeypatch.setattr(app, "EMBED_CHUNKING", True)
+    monkeypatch.setattr(app, "EMBED_CHUNK_TOKENS", 20)
+    monkeypatch.setattr(app, "EMBED_CHUNK_OVERLAP", 5)
+    monkeypatch.setattr(app, "EMBED_MAX_CHUNKS", 8)
+    return fake_embeddings
+
+
+def test_text_within_the_window_is_one_chunk():
+    text = words(20)
+    assert app.chunk_text(text, spans(text), 20, 5, 8) == [text]
+
+
+def test_windows_overlap_and_cover_the_end():
+    text = words(50)
+    chunks = app.chunk_text(text, spans(text), 20, 5, 8)
+    assert [chunk.split() for chunk in chunks] == [
+        [f"w{i}" for i in range(0, 20)],
+        [f"w{i}" for i in range(15, 35)],
+        [f"w{i}" for i in range(30, 50)],
+    ]
+
+
+def test_chunks_are_capped_per_resume():
+    text = words(500)
+    chunks = app.chunk_text(text, spans(text), 20, 5, 3)
+    assert len(chunks) == 3
+    assert chunks[-1].split()[-1] == "w49"
+
+
+@pytest.mark.parametrize("pooling, expected", [("max", [0.8, 0.5]), ("mean", [0.4, 0.5])])
+def test_pooling_per_resume(monkeypatch, pooling, expected):
+    monkeypatch.setattr(app, "EMBED_CHUNK_POOLING", pooling)
+    jd = np.array([[1.0, 0.0]])
+    first = np.array([[0.8, 0.6], [0.0, 1.0]])
+    second = np.array([[0.5, np.sqrt(0.75)]])
+    similarities = app.pooled_chunk_similarities([first, second], jd)
+    assert similarities.shape == (2, 1)
+    assert similarities[:, 0] == pytest.approx(expected)
+
+
+def test_long_resume_is_embedded_as_chunks_and_cached(chunking):
+    text = words(50)
+    [matrix] = app.embed_resume_chunks([text], ["hash"])
+    assert matrix.shape == (3, chunking.dimensions)
+    assert np.linalg.norm(matrix, axis=1) == pytest.approx([1.0, 1.0, 1.0])
+    embedded = sum(chunking.batches)
+    [cached] = app.embed_resume_chunks([text], ["hash"])
+    assert sum(chunking.batches) == embedded
+    assert np.asarray(cached).reshape(matrix.shape) == pytest.approx(matrix)
+
+
+def test_max_pooling_finds_a_match_beyond_the_token_window(chunking, monkeypatch):
+    jd_text = "python sql docker aws kubernetes"
+    jd = np.array([chunking.embed_query(jd_text)])
+    # The last 20-token window holds only the JD terms, past the first window but
+    # within EMBED_MAX_CHUNKS windows
+    resume = " ".join(["lorem"] * 60 + [jd_text] * 4)
+    chunked = app.resume_similarity_matrix([resume], [None], jd)[0, 0]
+    monkeypatch.setattr(app, "EMBED_CHUNKING", False)
+    whole = app.resume_similarity_matrix([resume], [None], jd)[0, 0]
+    assert chunked == pytest.approx(1.0)
+    assert whole < 0.5
@@ -0,0 +1,152 @@
+import io
+import random
+from types import SimpleNamespace
+
+from werkzeug.datastructures import FileStorage
+
+import pytest
+
+import app
+
+VOCABULARY = [
+    "python", "java", "react", "sql", "docker", "aws", "designed", "built", "maintained", "led",
+    "team", "platform", "services", "pipelines", "features", "quality", "performance", "release",
+    "production", "testing", "metrics", "customers", "reports", "analysis", "project", "agile"
+]
+
+
+def resume_text(seed: int, words: int = 300) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+def extracted(text: str, resume_hash: str) -> dict:
+    return {"text": text, "resume_hash": resume_hash, "error": None}
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """Fresh dedup index and resume cache, with a fake model id for the embedding probe"""
+    monkeypatch.setattr(app, "near_duplicate_index", app.NearDuplicateIndex(0.9, app.DEDUP_NUM_PERM, 100))
+    monkeypatch.setattr(app, "resume_cache", app.ResumeCache(16))
+    monkeypatch.setattr(app, "embeddings_available", lambda: True)
+    monkeypatch.setattr(app, "scoring_model_id", lambda: "test-model")
+    return app.resume_cache
+
+
+def upload(cache, *files):
+    """Run one request's dedup pass, then cache embeddings for the resumes it scored"""
+    names = [name for name, _ in files]
+    items = [item for _, item in files]
+    duplicates = app.find_near_duplicates(names, items)
+    cache.put_embeddings(
+        [(item["resume_hash"], [1.0]) for item, duplicate in zip(items, duplicates) if duplicate is None],
+        "test-model"
+    )
+    return duplicates
+
+
+def test_reupload_is_not_its_own_duplicate(cache):
+    resume = extracted(resume_text(1), "hash-x")
+    assert upload(cache, ("x.txt", resume)) == [None]
+    assert upload(cache, ("x.txt", resume)) == [None]
+
+
+def test_identical_copies_in_one_batch_are_grouped(cache):
+    resume = extracted(resume_text(1), "hash-x")
+    assert upload(cache, ("x.txt", resume), ("y.txt", resume)) == [None, {"index": 0}]
+
+
+def test_identical_copies_are_grouped_after_a_reupload(cache):
+    resume = extracted(resume_text(1), "hash-x")
+    upload(cache, ("x.txt", resume))
+    assert upload(cache, ("x.txt", resume), ("y.txt", resume)) == [None, {"index": 0}]
+
+
+def test_near_duplicates_in_one_batch_point_at_the_first(cache):
+    text = resume_text(1)
+    duplicates = upload(
+        cache,
+        ("other.txt", extracted(resume_text(2), "hash-other")),
+        ("x.txt", extracted(text, "hash-x")),
+        ("x-edited.txt", extracted(text + " kubernetes", "hash-x-edited"))
+    )
+    assert duplicates == [None, None, {"index": 1}]
+
+
+def test_near_duplicate_of_an_earlier_request_reuses_its_embedding(cache):
+    text = resume_text(1)
+    upload(cache, ("x.txt", extracted(text, "hash-x")))
+    duplicates = upload(cache, ("x-edited.txt", extracted(text + " kubernetes", "hash-x-edited")))
+    assert duplicates == [{"resume_hash": "hash-x", "filename": "x.txt"}]
+
+
+def test_earlier_resume_without_a_cached_embedding_is_not_reused(cache):
+    text = resume_text(1)
+    app.find_near_duplicates(["x.txt"], [extracted(text, "hash-x")])
+    assert app.find_near_duplicates(["x-edited.txt"], [extracted(text + " kubernetes", "hash-x-edited")]) == [None]
+
+
+def test_dedup_probe_does_not_count_as_a_cache_hit(cache):
+    text = resume_text(1)
+    upload(cache, ("x.txt", extracted(text, "hash-x")))
+    before = cache.stats()
+    upload(cache, ("x-edited.txt", extracted(text + " kubernetes", "hash-x-edited")))
+    after = cache.stats()
+    assert (after["embedding_hits"], after["embedding_misses"]) == (before["embedding_hits"], before["embedding_misses"])
+
+
+def uploads(*files):
+    return [FileStorage(stream=io.BytesIO(text.encode()), filename=name) for name, text in files]
+
+
+def skipped():
+    return app.DUPLICATES_SKIPPED._values.get((), 0)
+
+
+def test_near_duplicate_of_an_earlier_request_is_scored_not_skipped(fake_embeddings):
+    text = resume_text(1)
+    app.process_uploads(uploads(("x.txt", text)), "software-engineer")
+    embedded, before = sum(fake_embeddings.batches), skipped()
+    [result] = app.process_uploads(uploads(("x-edited.txt", text + " kubernetes")), "software-engineer")
+    assert result["NearDuplicateOf"] == "x.txt"
+    assert "DuplicateOf" not in result
+    assert skipped() == before
+    # The cached vector was reused, under the resume's own hash
+    assert sum(fake_embeddings.batches) == embedded
+    own_hash = app.hashlib.sha256((text + " kubernetes").encode()).hexdigest()
+    assert app.resume_cache.peek_embedding(own_hash, app.scoring_model_id()) is not None
+
+
+def test_evicted_representative_is_not_overwritten(fake_embeddings, monkeypatch):
+    text = resume_text(1)
+    app.process_uploads(uploads(("x.txt", text)), "software-engineer")
+    find_near_duplicates = app.find_near_duplicates
+
+    def evict_after_fingerprinting(*args):
+        duplicates = find_near_duplicates(*args)
+        app.resume_cache._entries.clear()
+        return duplicates
+    monkeypatch.setattr(app, "find_near_duplicates", evict_after_fingerprinting)
+    [result] = app.process_uploads(uploads(("x-edited.txt", text + " kubernetes")), "software-engineer")
+    assert "NearDuplicateOf" not in result
+    representative = app.hashlib.sha256(text.encode()).hexdigest()
+    assert app.resume_cache.peek_embedding(representative, app.scoring_model_id()) is None
+
+
+def test_in_batch_duplicates_count_as_skipped(fake_embeddings):
+    text = resume_text(1)
+    before = skipped()
+    results = app.process_uploads(uploads(("x.txt", text), ("x-edited.txt", text + " kubernetes")), "software-engineer")
+    assert results[1]["DuplicateOf"] == "x.txt"
+    assert skipped() == before + 1
+
+
+def test_scoring_model_id_follows_chunking(monkeypatch):
+    model = SimpleNamespace(name="test-backend")
+    monkeypatch.setattr(app, "get_embeddings", lambda: model)
+    monkeypatch.setattr(app, "EMBED_CHUNKING", False)
+    assert app.scoring_model_id() == "test-backend"
+    monkeypatch.setattr(app, "EMBED_CHUNKING", True)
+    assert app.scoring_model_id() == app.chunk_model_id(model)
+    assert app.scoring_model_id().startswith("test-backend:chunks:")
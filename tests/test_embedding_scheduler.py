@@ -0,0 +1,37 @@
+from types import SimpleNamespace
+
+import pytest
+
+import app
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    model = SimpleNamespace(name="test-backend", embed_documents=lambda texts: [[float(len(t))] for t in texts])
+    monkeypatch.setattr(app, "get_embeddings", lambda: model)
+    scheduler = app.EmbeddingScheduler(max_batch=4, max_wait=0.001, max_depth=64)
+    yield scheduler
+    scheduler.stop()
+
+
+def test_stop_ends_the_worker_thread(scheduler):
+    assert scheduler.embed(["ab", "abc"]) == [[2.0], [3.0]]
+    thread = scheduler._thread
+    scheduler.stop()
+    assert not thread.is_alive()
+
+
+def test_submit_after_stop_starts_a_new_worker(scheduler):
+    scheduler.embed(["a"])
+    scheduler.stop()
+    assert scheduler.embed(["abcd"] * 6) == [[4.0]] * 6
+    assert scheduler._thread.is_alive()
+
+
+def test_reset_drops_inherited_state(scheduler):
+    scheduler.embed(["a"])
+    scheduler.stop()
+    scheduler.reset()
+    assert scheduler.pending() == 0
+    assert scheduler._thread is None
+    assert scheduler.embed(["ab"]) == [[2.0]]
@@ -0,0 +1,47 @@
+from types import SimpleNamespace
+
+import pytest
+
+import app
+
+TERMS = ("python", "rest api", "api", "sql", "kotlin", "roadmap")
+TEXT = "Python developer, 6 years of experience building REST API services on SQL databases."
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    store = app.FeatureStore(str(tmp_path / "features.db"))
+    monkeypatch.setattr(app, "feature_store", store)
+    monkeypatch.setattr(app, "feature_terms", lambda: TERMS)
+    monkeypatch.setattr(app, "embeddings_available", lambda: False)
+    return store
+
+
+def stored(store) -> dict:
+    (feature,) = store.load()
+    return feature
+
+
+def test_scored_features_are_reused_and_completed(store):
+    profile = app.RoleProfile(
+        role="test", jd_text="", jd_vector=None, keywords=["sql"], skills=["python", "kotlin"],
+        term_matcher=app.TermMatcher(["python", "kotlin", "sql"]), jd_version="", skills_version=""
+    )
+    state = {"detailed_scores": app.score_against_profile(TEXT, profile, similarity=0.5)}
+    item = {"text": TEXT, "resume_hash": "hash-a", "error": None}
+    app.store_features([SimpleNamespace(filename="a.txt")], [item], [app.scored_features(state)])
+
+    full_scan = app.TermMatcher(TERMS).find(TEXT.lower())
+    feature = stored(store)
+    assert feature["term_positions"] == full_scan
+    assert set(full_scan) == {"python", "rest api", "api", "sql"}
+    assert (feature["years_experience"], feature["experience_score"]) == app.extract_experience(TEXT.lower())
+
+
+def test_unscored_items_are_scanned_in_full(store):
+    item = {"text": TEXT, "resume_hash": "hash-a", "error": None}
+    app.store_features([SimpleNamespace(filename="a.txt")], [item])
+
+    feature = stored(store)
+    assert feature["term_positions"] == app.TermMatcher(TERMS).find(TEXT.lower())
+    assert feature["years_experience"] == 6
@@ -0,0 +1,49 @@
+import io
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import app
+
+chromadb = pytest.importorskip("chromadb")
+
+
+@pytest.fixture
+def collection(monkeypatch):
+    client = chromadb.EphemeralClient()
+    collection = client.get_or_create_collection("test-resumes", metadata={"hnsw:space": "cosine"})
+    monkeypatch.setattr(app, "get_resume_index", lambda: SimpleNamespace(_collection=collection))
+    monkeypatch.setattr(app, "embeddings_available", lambda: True)
+    monkeypatch.setattr(app, "all_role_skills", lambda: ["python", "sql"])
+    monkeypatch.setattr(app, "embed_resumes", lambda texts, keys=None: np.ones((len(texts), 4)))
+    monkeypatch.setattr(app, "resume_cache", app.ResumeCache(16))
+    yield collection
+    client.delete_collection("test-resumes")
+
+
+def post_index(files):
+    return app.app.test_client().post(
+        "/api/index",
+        data={"resumes": [(io.BytesIO(content), name) for name, content in files]},
+        content_type="multipart/form-data"
+    )
+
+
+def test_identical_uploads_are_indexed_once(collection):
+    resume = b"Python developer with 4 years of SQL experience"
+    response = post_index([("x.txt", resume), ("y.txt", resume), ("z.txt", b"Data analyst, SQL, 2 years")])
+    assert response.status_code == 200
+    body = response.get_json()
+    assert (body["indexed"], body["duplicates_skipped"], body["total"]) == (2, 1, 3)
+    duplicate = next(summary for summary in body["results"] if summary["Status"] == "Duplicate")
+    assert (duplicate["Resume"], duplicate["DuplicateOf"]) == ("y.txt", "x.txt")
+    assert collection.count() == 2
+
+
+def test_reindexing_the_same_resume_updates_it(collection):
+    resume = b"Python developer with 4 years of SQL experience"
+    assert post_index([("x.txt", resume)]).status_code == 200
+    assert post_index([("x-renamed.txt", resume)]).status_code == 200
+    assert collection.count() == 1
+    assert collection.get()["metadatas"][0]["filename"] == "x-renamed.txt"
@@ -0,0 +1,93 @@
+import io
+import json
+import os
+import queue
+import time
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+import app
+
+RESUMES = [
+    ("python.txt", b"Python developer, 6 years of experience with SQL, Docker and AWS"),
+    ("java.txt", b"Java engineer with 3 years of experience in React, SQL and git"),
+    ("analyst.txt", b"Data analyst, 2 years, Excel, Tableau, Power BI and statistics"),
+]
+
+
+def uploads(resumes=RESUMES):
+    return [FileStorage(stream=io.BytesIO(content), filename=name) for name, content in resumes]
+
+
+def wait_for(manager, job_id, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = manager.get(job_id)
+        if job["status"] in ("completed", "failed"):
+            return job
+        time.sleep(0.02)
+    pytest.fail(f"job {job_id} did not finish: {manager.get(job_id)}")
+
+
+def test_submitted_job_runs_to_a_ranking(fake_embeddings, tmp_path):
+    manager = app.JobManager(str(tmp_path), workers=1, queue_depth=4)
+    manager.start()
+    job = manager.submit(uploads(), "software-engineer")
+    assert job["status"] == "queued"
+    assert job["progress"]["total"] == len(RESUMES)
+
+    job = wait_for(manager, job["id"])
+    assert job["status"] == "completed"
+    assert job["progress"]["scored"] == len(RESUMES)
+    results = manager.results(job["id"])
+    assert [result["Resume"] for result in results] == [name for name, _ in RESUMES]
+    ranking = manager.ranking(job["id"])
+    assert [result["Score"] for result in ranking] == sorted((r["Score"] for r in results), reverse=True)
+    # The uploads are dropped once the ranking is stored
+    assert not os.path.exists(tmp_path / job["id"] / "files")
+
+
+def test_full_queue_rejects_the_submission_and_leaves_nothing_behind(tmp_path):
+    manager = app.JobManager(str(tmp_path), workers=1, queue_depth=1)
+    manager.submit(uploads(), "software-engineer")
+    with pytest.raises(queue.Full):
+        manager.submit(uploads(), "software-engineer")
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_restart_requeues_unfinished_jobs_from_disk(fake_embeddings, tmp_path):
+    # Never started, so the job is only on disk when the process "restarts"
+    job = app.JobManager(str(tmp_path), workers=1, queue_depth=4).submit(uploads(), "software-engineer")
+
+    manager = app.JobManager(str(tmp_path), workers=1, queue_depth=4)
+    manager.start()
+    assert wait_for(manager, job["id"])["status"] == "completed"
+    assert len(manager.results(job["id"])) == len(RESUMES)
+
+
+def test_restart_resumes_after_the_results_already_written(fake_embeddings, tmp_path):
+    job = app.JobManager(str(tmp_path), workers=1, queue_depth=4).submit(uploads(), "software-engineer")
+    job_dir = tmp_path / job["id"]
+    # Simulate a crash after the first result was appended
+    with open(job_dir / "job.json", encoding="utf-8") as f:
+        persisted = json.load(f)
+    persisted["status"] = "running"
+    (job_dir / "job.json").write_text(json.dumps(persisted), encoding="utf-8")
+    written = {"Resume": "python.txt", "Score": 99.0, "Status": "Written before restart"}
+    (job_dir / "results.ndjson").write_text(json.dumps(written) + "\n", encoding="utf-8")
+
+    manager = app.JobManager(str(tmp_path), workers=1, queue_depth=4)
+    manager.start()
+    assert wait_for(manager, job["id"])["status"] == "completed"
+    results = manager.results(job["id"])
+    assert results[0] == written
+    assert [result["Resume"] for result in results] == [name for name, _ in RESUMES]
+
+
+def test_recovery_skips_jobs_created_after_the_cutoff(tmp_path):
+    job = app.JobManager(str(tmp_path), workers=1, queue_depth=4).submit(uploads(), "software-engineer")
+    manager = app.JobManager(str(tmp_path), workers=1, queue_depth=4)
+    manager.recover_before = job["created_at"]
+    manager._recover()
+    assert manager.queue.empty()
@@ -0,0 +1,73 @@
+import io
+
+import pytest
+
+import app
+
+RESUMES = [
+    ("python.txt", b"Python developer, 6 years of experience with SQL, Docker, AWS, git and REST APIs"),
+    ("analyst.txt", b"Data analyst, 4 years, Excel, Tableau, Power BI, SQL and statistics"),
+    ("pm.txt", b"Product manager with roadmap, agile and scrum experience, stakeholders, 8 years"),
+]
+
+
+def filter_request(roles, resumes=RESUMES, **form):
+    return app.app.test_client().post(
+        "/api/filter",
+        data=dict(form, role=roles, resumes=[(io.BytesIO(content), name) for name, content in resumes]),
+        content_type="multipart/form-data"
+    )
+
+
+@pytest.mark.parametrize("values, expected", [
+    (["software-engineer"], None),
+    (["software-engineer,data-analyst"], ["software-engineer", "data-analyst"]),
+    (["software-engineer", "data-analyst"], ["software-engineer", "data-analyst"]),
+    ([" data-analyst , data-analyst,"], ["data-analyst"]),
+])
+def test_parse_roles(values, expected):
+    assert app.parse_roles(values) == expected
+
+
+def test_star_selects_every_role(fake_embeddings):
+    assert app.parse_roles(["*"]) == list(app.get_role_profiles())
+
+
+def test_score_matrix_rows_follow_results_and_columns_follow_roles(fake_embeddings):
+    roles = ["software-engineer", "data-analyst", "product-manager"]
+    response = filter_request(",".join(roles))
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["roles"] == roles
+    assert len(body["score_matrix"]) == len(RESUMES)
+    for result, row in zip(body["results"], body["score_matrix"]):
+        assert set(result["RoleScores"]) == set(roles)
+        assert row == [result["RoleScores"][role]["Score"] for role in roles]
+        # The headline score is the best-fit role's
+        assert result["BestRole"] == roles[row.index(max(row))]
+        assert result["Score"] == max(row)
+
+
+def test_each_role_is_scored_with_its_own_skill_list(fake_embeddings):
+    body = filter_request(["software-engineer", "data-analyst", "product-manager"]).get_json()
+    scores = {result["Resume"]: result["RoleScores"] for result in body["results"]}
+    assert scores["python.txt"]["software-engineer"]["IdentifiedSkills"] == ["python", "sql", "git", "docker", "aws"]
+    assert scores["python.txt"]["product-manager"]["IdentifiedSkills"] == []
+    assert scores["analyst.txt"]["data-analyst"]["SkillsScore"] > scores["analyst.txt"]["software-engineer"]["SkillsScore"]
+
+
+def test_paged_multi_role_results_keep_the_matrix(fake_embeddings):
+    roles = ["software-engineer", "data-analyst"]
+    body = filter_request(",".join(roles), limit="2").get_json()
+    assert body["roles"] == roles
+    assert len(body["score_matrix"]) == 2
+    page = app.app.test_client().get(f"/api/results/{body['result_id']}?offset=2&limit=2").get_json()
+    assert page["roles"] == roles
+    assert page["score_matrix"] == [[page["results"][0]["RoleScores"][role]["Score"] for role in roles]]
+
+
+@pytest.mark.parametrize("roles", ["software-engineer,astronaut", ","])
+def test_unknown_roles_are_rejected(fake_embeddings, roles):
+    response = filter_request(roles)
+    assert response.status_code == 400
+    assert "Unknown roles" in response.get_json()["error"]
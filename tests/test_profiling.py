@@ -0,0 +1,30 @@
+import pytest
+
+import app
+
+
+@pytest.fixture(autouse=True)
+def token(monkeypatch):
+    monkeypatch.setattr(app, "PROFILE_TOKEN", "s3cret")
+
+
+def profiling_started(path: str, headers: dict = None) -> bool:
+    with app.app.test_request_context(path, method="POST", headers=headers or {}):
+        app.start_profiling()
+        started = "profile" in app.g
+        app.abandon_profiling(None)
+    return started
+
+
+def test_header_token_starts_profiling():
+    assert profiling_started("/api/filter", {"X-Profile-Token": "s3cret"})
+    assert not app._profile_lock.locked()
+
+
+@pytest.mark.parametrize("path, headers", [
+    ("/api/filter?profile=s3cret", None),
+    ("/api/filter", {"X-Profile": "s3cret"}),
+    ("/api/filter", {"X-Profile-Token": "wrong"}),
+])
+def test_other_ways_of_passing_the_token_are_ignored(path, headers):
+    assert not profiling_started(path, headers)
@@ -0,0 +1,126 @@
+import io
+import os
+
+import pytest
+
+import app
+
+
+def result(name: str, score: float, years: int) -> dict:
+    return {"Resume": name, "Score": score, "YearsExperience": years}
+
+
+RESULTS = [
+    result("carol.pdf", 71.5, 3), result("Alice.txt", 88.0, 9), result("dave.docx", 42.25, 12),
+    result("bob.txt", 88.0, 1), result("erin.pdf", 15.0, 5)
+]
+
+
+@pytest.mark.parametrize("sort, descending", [
+    ("score", True), ("score", False), ("experience", True), ("name", False), ("name", True)
+])
+def test_pages_follow_the_full_sort_order(sort, descending):
+    ordered = sorted(RESULTS, key=app.RESULT_SORT_KEYS[sort], reverse=descending)
+    pages = [app.select_page(RESULTS, offset, 2, sort, descending) for offset in range(0, len(RESULTS), 2)]
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [app.RESULT_SORT_KEYS[sort](r) for page in pages for r in page] == [app.RESULT_SORT_KEYS[sort](r) for r in ordered]
+
+
+def test_page_past_the_end_is_empty():
+    assert app.select_page(RESULTS, 10, 5) == []
+
+
+def test_oldest_sets_are_evicted_beyond_max_sets():
+    store = app.ResultStore(max_sets=2, ttl=3600)
+    first, second, third = (store.put([result(f"{i}.txt", i, 0)], role="software-engineer") for i in range(3))
+    assert store.get(first) is None
+    assert store.get(second)["results"][0]["Resume"] == "1.txt"
+    assert store.get(third)["role"] == "software-engineer"
+
+
+def test_sets_expire_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(app.time, "time", lambda: now[0])
+    store = app.ResultStore(max_sets=8, ttl=60)
+    result_id = store.put(RESULTS)
+    now[0] += 59
+    assert store.get(result_id) is not None
+    now[0] += 1
+    assert store.get(result_id) is None
+
+
+def test_malformed_result_ids_are_not_found():
+    store = app.ResultStore(max_sets=2, ttl=60)
+    store.put(RESULTS)
+    assert store.get("../../etc/passwd") is None
+
+
+def test_shared_sets_are_visible_to_every_worker(tmp_path):
+    # One store per pre-fork worker, over the same directory
+    first, second = (app.SharedResultStore(max_sets=4, ttl=60, directory=str(tmp_path)) for _ in range(2))
+    result_id = first.put(RESULTS, role=["software-engineer", "data-analyst"])
+    result_set = second.get(result_id)
+    assert result_set["results"] == RESULTS
+    assert result_set["role"] == ["software-engineer", "data-analyst"]
+    assert second.get("../../etc/passwd") is None
+    assert second.get("0" * 32) is None
+
+
+def test_shared_sets_are_evicted_oldest_first(tmp_path):
+    store = app.SharedResultStore(max_sets=2, ttl=3600, directory=str(tmp_path))
+    ids = []
+    for i, age in enumerate((20, 10, 0)):
+        ids.append(store.put([result(f"{i}.txt", i, 0)]))
+        # File times are coarse, so spell the write order out
+        modified = os.path.getmtime(tmp_path / f"{ids[-1]}.json") - age
+        os.utime(tmp_path / f"{ids[-1]}.json", (modified, modified))
+    assert store.get(ids[0]) is None
+    assert [store.get(result_id)["results"][0]["Resume"] for result_id in ids[1:]] == ["1.txt", "2.txt"]
+
+
+def test_shared_sets_expire_after_the_ttl(tmp_path, monkeypatch):
+    store = app.SharedResultStore(max_sets=8, ttl=60, directory=str(tmp_path))
+    result_id = store.put(RESULTS)
+    now = app.time.time()
+    monkeypatch.setattr(app.time, "time", lambda: now + 60)
+    assert store.get(result_id) is None
+
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+
+@pytest.mark.parametrize("query", ["limit=ten", "offset=1.5", "offset=&limit=5"])
+def test_results_page_rejects_non_integer_paging(client, monkeypatch, query):
+    store = app.ResultStore(max_sets=2, ttl=60)
+    monkeypatch.setattr(app, "result_store", store)
+    result_id = store.put(RESULTS, role="software-engineer")
+    response = client.get(f"/api/results/{result_id}?{query}")
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "offset and limit must be integers"}
+
+
+def test_results_page_sorts_and_pages(client, monkeypatch):
+    store = app.ResultStore(max_sets=2, ttl=60)
+    monkeypatch.setattr(app, "result_store", store)
+    result_id = store.put(RESULTS, role="software-engineer")
+    response = client.get(f"/api/results/{result_id}?sort=name&offset=1&limit=2")
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [r["Resume"] for r in body["results"]] == ["bob.txt", "carol.pdf"]
+    assert (body["offset"], body["limit"], body["total"]) == (1, 2, len(RESULTS))
+
+
+@pytest.mark.parametrize("field, message", [
+    ("limit", "offset and limit must be integers"),
+    ("shortlist", "shortlist must be a non-negative integer")
+])
+def test_filter_rejects_non_integer_arguments(client, field, message):
+    response = client.post(
+        "/api/filter",
+        data={"role": "software-engineer", field: "many", "resumes": [(io.BytesIO(b"python developer"), "a.txt")]},
+        content_type="multipart/form-data"
+    )
+    assert response.status_code == 400
+    assert response.get_json() == {"error": message}
@@ -0,0 +1,65 @@
+import logging
+
+import pytest
+
+import app
+
+SKILLS = ["python", "rust", "kubernetes"]
+
+
+@pytest.fixture
+def roles(monkeypatch, fake_embeddings):
+    """Role edits rewrite the module-level JD and skill tables, so work on copies"""
+    monkeypatch.setattr(app, "JOB_DESCRIPTIONS", dict(app.JOB_DESCRIPTIONS))
+    monkeypatch.setattr(app, "ROLE_SKILLS", {role: list(skills) for role, skills in app.ROLE_SKILLS.items()})
+    return app.app.test_client()
+
+
+def test_edit_without_a_feature_store_is_flagged_as_not_persisted(roles, caplog):
+    with caplog.at_level(logging.WARNING, logger="app"):
+        response = roles.put("/api/roles/software-engineer", json={"skills": SKILLS})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["persisted"] is False
+    assert "FEATURE_STORE_DB" in caplog.text
+    assert app.get_role_profile("software-engineer").skills == SKILLS
+
+
+def test_edit_is_persisted_and_reapplied_with_a_feature_store(roles, monkeypatch, tmp_path):
+    monkeypatch.setattr(app, "feature_store", app.FeatureStore(str(tmp_path / "features.db")))
+    response = roles.put("/api/roles/software-engineer", json={"jd": "Rust systems engineer", "skills": SKILLS})
+    assert response.get_json()["persisted"] is True
+    assert app.feature_store.role_overrides()["software-engineer"] == ("Rust systems engineer", SKILLS)
+
+    monkeypatch.setattr(app, "JOB_DESCRIPTIONS", dict(app.JOB_DESCRIPTIONS, **{"software-engineer": "original"}))
+    profile = app.reload_role_profiles()["software-engineer"]
+    assert (profile.jd_text, profile.skills) == ("Rust systems engineer", SKILLS)
+
+
+@pytest.mark.parametrize("payload", [{"jd": " "}, {"skills": []}, {"skills": ["python", 3]}])
+def test_invalid_edits_are_rejected(roles, payload):
+    assert roles.put("/api/roles/software-engineer", json=payload).status_code == 400
+
+
+def test_unknown_role_is_not_found(roles):
+    assert roles.put("/api/roles/astronaut", json={"skills": SKILLS}).status_code == 404
+
+
+def test_edits_from_another_worker_are_picked_up(roles, monkeypatch, tmp_path):
+    monkeypatch.setattr(app, "feature_store", app.FeatureStore(str(tmp_path / "features.db")))
+    monkeypatch.setitem(app.WORKER_INFO, "workers", 2)
+    monkeypatch.setattr(app, "_role_overrides_version", None)
+    # Saved by a sibling worker sharing the feature store
+    app.feature_store.save_role_override("data-analyst", app.JOB_DESCRIPTIONS["data-analyst"], SKILLS)
+    body = roles.get("/api/roles").get_json()
+    summary = next(role for role in body["roles"] if role["role"] == "data-analyst")
+    assert summary["skills"] == SKILLS
+    assert app.sync_role_overrides() == []
+
+
+def test_edits_are_refused_across_workers_without_a_feature_store(roles, monkeypatch):
+    monkeypatch.setitem(app.WORKER_INFO, "workers", 2)
+    response = roles.put("/api/roles/software-engineer", json={"skills": SKILLS})
+    assert response.status_code == 409
+    assert "FEATURE_STORE_DB" in response.get_json()["error"]
+    assert app.get_role_profile("software-engineer").skills != SKILLS
@@ -0,0 +1,77 @@
+import io
+
+import pytest
+
+import app
+
+RESUMES = [
+    ("python.txt", b"Python developer, 6 years with Java, SQL, Docker, Kubernetes, AWS, git and REST API"),
+    ("react.txt", b"Frontend engineer, 3 years with JavaScript, React, HTML, CSS and git"),
+    ("analyst.txt", b"Data analyst, 2 years, Excel, Tableau, Power BI and statistics"),
+    ("pm.txt", b"Product manager with roadmap, stakeholder management and user research, 8 years"),
+]
+
+
+def filter_request(resumes=RESUMES, role="software-engineer", **form):
+    return app.app.test_client().post(
+        "/api/filter",
+        data=dict(form, role=role, resumes=[(io.BytesIO(content), name) for name, content in resumes]),
+        content_type="multipart/form-data"
+    )
+
+
+def test_only_the_lexical_top_m_are_embedded_and_scored(fake_embeddings):
+    response = filter_request(shortlist="2")
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["shortlist"] == {"m": 2, "filtered": 2}
+    status = {result["Resume"]: result["Status"] for result in body["results"]}
+    assert status["python.txt"] != "Filtered" and status["react.txt"] != "Filtered"
+    assert status["analyst.txt"] == status["pm.txt"] == "Filtered"
+    for result in body["results"]:
+        if result["Status"] == "Filtered":
+            assert result["Score"] == 0.0
+            assert result["LexicalScore"] >= 0
+    # Role JDs plus the two shortlisted resumes
+    assert sum(fake_embeddings.batches) == len(app.get_role_profiles()) + 2
+
+
+@pytest.mark.parametrize("shortlist", ["0", "4", "10"])
+def test_batches_within_m_are_scored_in_full(fake_embeddings, shortlist):
+    body = filter_request(shortlist=shortlist).get_json()
+    assert not any(result["Status"] == "Filtered" for result in body["results"])
+    assert all("LexicalScore" not in result for result in body["results"])
+    assert sum(fake_embeddings.batches) == len(app.get_role_profiles()) + len(RESUMES)
+
+
+def test_failed_extractions_do_not_take_shortlist_places(fake_embeddings):
+    resumes = RESUMES[:2] + [("broken.pdf", b"not a pdf")]
+    body = filter_request(resumes, shortlist="2").get_json()
+    # Two extractable resumes fit in m=2, so nothing is filtered
+    assert not any(result["Status"] == "Filtered" for result in body["results"])
+
+
+def test_multi_role_keeps_the_top_m_of_every_role(fake_embeddings):
+    body = filter_request(role="software-engineer,product-manager", shortlist="1").get_json()
+    kept = sorted(result["Resume"] for result in body["results"] if result["Status"] != "Filtered")
+    assert kept == ["pm.txt", "python.txt"]
+    assert body["shortlist"] == {"m": 1, "filtered": 2}
+
+
+def test_invalid_shortlist_is_rejected(fake_embeddings):
+    assert filter_request(shortlist="few").status_code == 400
+
+
+def test_pool_shortlist_falls_back_to_the_whole_pool(fake_embeddings, monkeypatch, tmp_path):
+    monkeypatch.setattr(app, "feature_store", app.FeatureStore(str(tmp_path / "features.db")))
+    monkeypatch.setattr(app, "_pool_index", None)
+    filter_request()
+    profile = app.get_role_profile("software-engineer")
+
+    top = app.shortlist_pool(profile, 2)
+    assert len(top) == 2
+    assert list(top.values()) == sorted(top.values(), reverse=True)
+    assert len(app.shortlist_pool(profile, 10)) == len(RESUMES)
+
+    hashes = [feature["resume_hash"] for feature in app.feature_store.load()][:3]
+    assert set(app.shortlist_pool(profile, 10, hashes)) == set(hashes)
@@ -0,0 +1,68 @@
+import io
+import json
+
+import pytest
+
+import app
+
+RESUMES = [
+    ("python.txt", b"Python developer, 6 years of experience with SQL, Docker and AWS"),
+    ("java.txt", b"Java engineer with 3 years of experience in React, SQL and git"),
+    ("analyst.txt", b"Data analyst, 2 years, Excel, Tableau, Power BI and statistics"),
+    ("pm.txt", b"Product manager with roadmap, agile and scrum experience, 8 years"),
+    ("broken.pdf", b"not a pdf"),
+]
+
+
+def stream(files, **form):
+    response = app.app.test_client().post(
+        "/api/filter/stream",
+        data=dict(form, role="software-engineer", resumes=[(io.BytesIO(content), name) for name, content in files]),
+        content_type="multipart/form-data"
+    )
+    return response, [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_one_result_record_per_resume_then_a_summary(fake_embeddings):
+    response, records = stream(RESUMES)
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    *results, summary = records
+    assert [record["type"] for record in results] == ["result"] * len(RESUMES)
+    assert [record["index"] for record in results] == list(range(len(RESUMES)))
+    assert sorted(record["result"]["Resume"] for record in results) == sorted(name for name, _ in RESUMES)
+    for record in results:
+        assert {"Resume", "Score", "Status", "SkillsScore", "YearsExperience"} <= set(record["result"])
+    assert summary["type"] == "summary"
+    assert summary["total"] == len(RESUMES)
+    assert summary["duplicates_skipped"] == 0
+    assert summary["stats"]["total"] == len(RESUMES)
+
+
+def test_summary_ranks_the_top_n_and_keeps_the_set_for_paging(fake_embeddings):
+    _, records = stream(RESUMES, top_n="2")
+    *results, summary = records
+    scores = sorted((record["result"]["Score"] for record in results), reverse=True)
+    assert [result["Score"] for result in summary["top"]] == scores[:2]
+    page = app.app.test_client().get(f"/api/results/{summary['result_id']}?limit=10").get_json()
+    assert page["total"] == len(RESUMES)
+
+
+def test_duplicates_are_reported_in_the_summary(fake_embeddings):
+    content = b" ".join(content for _, content in RESUMES[:4])
+    # Chunks hold 1, then 2 resumes, so the copy is in the same batch as the original
+    _, records = stream([RESUMES[4], ("long.txt", content), ("copy.txt", content)])
+    *results, summary = records
+    assert results[2]["result"]["DuplicateOf"] == "long.txt"
+    assert summary["duplicates_skipped"] == 1
+
+
+@pytest.mark.parametrize("top_n", ["many", "1.5"])
+def test_invalid_top_n_is_rejected_before_streaming(fake_embeddings, top_n):
+    response, _ = stream(RESUMES, top_n=top_n)
+    assert response.status_code == 400
+
+
+def test_chunks_grow_up_to_the_embedding_batch_size(monkeypatch):
+    monkeypatch.setattr(app, "EMBED_BATCH_SIZE", 4)
+    assert [len(chunk) for chunk in app.iter_stream_chunks(list(range(12)))] == [1, 2, 4, 4, 1]
@@ -0,0 +1,54 @@
+import re
+
+import pytest
+
+import app
+
+TERMS = ["java", "javascript", "r", "c", "c++", "c#", "node.js", "sql", "rest api", "api", "machine learning", "power bi"]
+
+
+def reference_positions(terms: list, text_lower: str) -> dict:
+    """Whole-word matches, one regex per term, as skill matching worked before TermMatcher"""
+    positions = {}
+    for term in terms:
+        starts = [m.start() for m in re.finditer(r"(?<!\w)" + re.escape(term) + r"(?!\w)", text_lower)]
+        if starts:
+            positions[term] = starts
+    return positions
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("java and javascript", {"java": [0], "javascript": [9]}),
+    ("javascript only", {"javascript": [0]}),
+    ("javas and ajava", {}),
+    ("r, python and rust", {"r": [0]}),
+    ("react and rails", {}),
+    ("c++ and c#", {"c++": [0], "c": [0, 8], "c#": [8]}),
+    ("node.js backends", {"node.js": [0]}),
+    ("nodejs and node", {}),
+    ("rest api design", {"rest api": [0], "api": [5]}),
+    ("apis and rest", {}),
+    ("machine learning", {"machine learning": [0]}),
+    ("machine-learning", {}),
+])
+def test_terms_match_on_word_boundaries(text, expected):
+    assert app.TermMatcher(TERMS).find(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "Senior engineer: java, javascript, node.js, c++, c#, r and sql. Built rest api services.",
+    "Used power bi and sql daily; machine learning with r. api-first design, c/c++.",
+    "sqlite, javadoc, react, restful apis, powerbi",
+])
+def test_one_pass_agrees_with_per_term_regexes(text):
+    assert app.TermMatcher(TERMS).find(text.lower()) == reference_positions(TERMS, text.lower())
+
+
+def test_terms_are_matched_case_insensitively_and_deduplicated():
+    matcher = app.TermMatcher(["SQL", "sql", "Node.js", ""])
+    assert matcher.terms == ["sql", "node.js"]
+    assert matcher.counts("sql, node.js and more sql") == {"sql": 2, "node.js": 1}
+
+
+def test_empty_term_list_matches_nothing():
+    assert app.TermMatcher([]).find("java") == {}
@@ -0,0 +1,85 @@
+import io
+import zipfile
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+import app
+
+
+def make_zip(members: dict, name: str = "resumes.zip") -> FileStorage:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for filename, content in members.items():
+            archive.writestr(filename, content)
+    buffer.seek(0)
+    return FileStorage(stream=buffer, filename=name)
+
+
+def test_members_replace_the_archive():
+    plain = FileStorage(stream=io.BytesIO(b"Python developer"), filename="plain.txt")
+    archive = make_zip({
+        "a.txt": b"Python developer",
+        "nested/b.pdf": b"%PDF",
+        "notes.md": b"skipped",
+        "__MACOSX/._a.txt": b"skipped",
+        ".hidden.txt": b"skipped",
+    })
+    expanded = app.expand_uploads([plain, archive])
+    assert [file.filename for file in expanded] == ["plain.txt", "a.txt", "nested/b.pdf"]
+    assert expanded[1].stream.read() == b"Python developer"
+
+
+def test_too_many_members_are_rejected(monkeypatch):
+    monkeypatch.setattr(app, "ZIP_MAX_MEMBERS", 3)
+    archive = make_zip({f"{i}.txt": b"resume" for i in range(4)})
+    with pytest.raises(ValueError, match="4 entries, over the limit of 3"):
+        app.expand_uploads([archive])
+
+
+def test_member_limit_covers_the_whole_request(monkeypatch):
+    monkeypatch.setattr(app, "ZIP_MAX_MEMBERS", 3)
+    archives = [make_zip({f"{i}.txt": b"resume" for i in range(2)}, f"{n}.zip") for n in range(2)]
+    with pytest.raises(ValueError, match="Request has 4 resumes"):
+        app.expand_uploads(archives)
+
+
+def test_zip_bomb_is_rejected_before_decompressing(monkeypatch):
+    monkeypatch.setattr(app, "ZIP_MAX_UNCOMPRESSED_BYTES", 1024 * 1024)
+    archive = make_zip({"bomb.txt": b"\0" * (4 * 1024 * 1024)})
+    assert archive.stream.getbuffer().nbytes < 64 * 1024
+
+    def refuse(*args, **kwargs):
+        raise AssertionError("member decompressed")
+    monkeypatch.setattr(zipfile.ZipFile, "open", refuse)
+    with pytest.raises(ValueError, match="expands to 4.0 MB"):
+        app.expand_uploads([archive])
+
+
+def test_oversized_member_is_rejected_from_its_declared_size(monkeypatch):
+    monkeypatch.setattr(app, "MAX_RESUME_BYTES", 1024)
+    [member] = app.expand_uploads([make_zip({"big.txt": b"x" * 4096})])
+    with pytest.raises(ValueError, match="big.txt is .* MB per-file limit"):
+        app.spool_upload(member)
+
+
+@pytest.mark.parametrize("content", [b"not a zip", b""])
+def test_unreadable_archive_is_rejected(content):
+    with pytest.raises(ValueError, match="not a valid ZIP archive"):
+        app.expand_uploads([FileStorage(stream=io.BytesIO(content), filename="broken.zip")])
+
+
+def test_archive_without_resumes_is_rejected():
+    with pytest.raises(ValueError, match="contains no PDF, DOCX or TXT resumes"):
+        app.expand_uploads([make_zip({"notes.md": b"nothing here"})])
+
+
+def test_filter_route_returns_400_for_a_rejected_archive(monkeypatch):
+    monkeypatch.setattr(app, "ZIP_MAX_MEMBERS", 1)
+    response = app.app.test_client().post(
+        "/api/filter",
+        data={"role": "software-engineer", "resumes": [(make_zip({"a.txt": b"a", "b.txt": b"b"}).stream, "resumes.zip")]},
+        content_type="multipart/form-data"
+    )
+    assert response.status_code == 400
+    assert "over the limit of 1" in response.get_json()["error"]